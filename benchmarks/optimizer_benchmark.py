@@ -0,0 +1,218 @@
+"""
+Micro-benchmark of the feature optimizer (optimizeing_features).
+
+A small LightGBM-only predictor is trained once on synthetic HR data and
+cached on disk; every configuration (sampler x batch size x n_trials x number
+of controllable features) is then run on the same fixed samples. The table
+reports trials/sec, model calls per trial, time to the first improvement over
+the original prediction and the final improvement. Runs offline on CPU.
+
+Usage
+    python -m benchmarks.optimizer_benchmark --samplers tpe random qmc \\
+        --batch-sizes 1 8 32 --n-trials 30 100 --n-features 2 4
+"""
+
+import argparse
+import json
+import os.path as osp
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.append(osp.abspath(osp.join(osp.dirname(__file__), "..")))
+
+import optuna  # noqa: E402
+from benchmarks.synthetic import make_dataset  # noqa: E402
+from optimization.optimization import optimizeing_features  # noqa: E402
+
+PREDICTOR_DIR = osp.join(tempfile.gettempdir(), "automl_optimizer_bench")
+TRAIN_ROWS = 5000
+TRAIN_TIME_LIMIT = 60
+TARGET = "Attrition"
+# Controllable features in the order they are added, with their opt_range
+# (equal bounds are a +/- percentage of the current value).
+FEATURE_BOUNDS = {
+    "MonthlyIncome": [20, 20],
+    "WorkLifeBalance": [1, 4],
+    "DistanceFromHome": [1, 29],
+    "YearsAtCompany": [0, 40],
+    "Education": [1, 5],
+    "Age": [18, 60],
+}
+INTEGER_FEATURES = ["WorkLifeBalance", "Education"]
+DROPPED_COLUMNS = ["HireDate", "Comment"]
+
+
+class CallCounter:
+    """
+    Predictor proxy that counts predict and predict_proba calls.
+    """
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.calls = 0
+
+    def predict(self, data):
+        self.calls += 1
+        return self.predictor.predict(data)
+
+    def predict_proba(self, data):
+        self.calls += 1
+        return self.predictor.predict_proba(data)
+
+    def __getattr__(self, name):
+        return getattr(self.predictor, name)
+
+
+def load_predictor(predictor_dir=PREDICTOR_DIR, seed=42):
+    """
+    Load the cached benchmark predictor, training it on first use.
+
+    Parameters
+        predictor_dir : str, optional
+            Directory of the cached predictor, by default PREDICTOR_DIR.
+        seed : int, optional
+            Random seed of the training data, by default 42.
+
+    Returns
+        tuple
+            A tuple containing:
+                - predictor (TabularPredictor): The trained predictor.
+                - data (pd.DataFrame): The training data without the target.
+    """
+    from autogluon.tabular import TabularPredictor
+
+    data = make_dataset(TRAIN_ROWS, n_cols=13, task="binary", missing_ratio=0.0, seed=seed)
+    data = data.drop(columns=DROPPED_COLUMNS)
+    if osp.exists(osp.join(predictor_dir, "predictor.pkl")):
+        predictor = TabularPredictor.load(predictor_dir)
+    else:
+        predictor = TabularPredictor(label=TARGET, path=predictor_dir, verbosity=0).fit(
+            data, hyperparameters={"GBM": {}}, time_limit=TRAIN_TIME_LIMIT
+        )
+        predictor.persist_models()
+    return predictor, data.drop(columns=[TARGET])
+
+
+def run_config(predictor, samples, sampler, batch_size, n_trials, n_features, seed=0):
+    """
+    Run the optimizer with one configuration on every sample.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained predictor.
+        samples : pd.DataFrame
+            Rows to optimize.
+        sampler : str
+            Sampler name.
+        batch_size : int
+            Number of trials scored per model call.
+        n_trials : int
+            Number of trials per sample.
+        n_features : int
+            Number of controllable features (the first ones of FEATURE_BOUNDS).
+        seed : int, optional
+            Random seed of the sampler, by default 0.
+
+    Returns
+        dict
+            Configuration and its measurements: trials_per_s, calls_per_trial,
+            time_to_first_improvement_ms (median over the samples that
+            improved), improved_share and mean_improvement.
+    """
+    feature_bounds = dict(list(FEATURE_BOUNDS.items())[:n_features])
+    counter = CallCounter(predictor)
+    total_time = 0.0
+    first_improvements = []
+    improvements = []
+    for _, row in samples.iterrows():
+        values = []
+        start = time.perf_counter()
+        _, _, original, improvement = optimizeing_features(
+            counter, row, feature_bounds, INTEGER_FEATURES, "binary", "maximize",
+            n_trials=n_trials, target_class=predictor.class_labels[1],
+            sampler=sampler, batch_size=batch_size, seed=seed,
+            callbacks=[lambda study, trial: values.append((time.perf_counter() - start, trial.value))],
+        )
+        total_time += time.perf_counter() - start
+        improvements.append(improvement)
+        first = next((elapsed for elapsed, value in values if value > original), None)
+        if first is not None:
+            first_improvements.append(first * 1000.0)
+
+    n_total = n_trials * len(samples)
+    return {
+        "sampler": sampler,
+        "batch_size": batch_size,
+        "n_trials": n_trials,
+        "n_features": n_features,
+        "trials_per_s": round(n_total / total_time, 2),
+        # The original prediction of every sample is one extra call.
+        "calls_per_trial": round((counter.calls - len(samples)) / n_total, 4),
+        "time_to_first_improvement_ms": (
+            round(statistics.median(first_improvements), 2) if first_improvements else None
+        ),
+        "improved_share": round(len(first_improvements) / len(samples), 3),
+        "mean_improvement": round(statistics.mean(improvements), 5),
+    }
+
+
+def print_table(results):
+    """
+    Print the benchmark results as a table.
+
+    Parameters
+        results : list of dict
+            Results returned by run_config.
+    """
+    print(
+        f"{'sampler':<9}{'batch':>6}{'trials':>8}{'feats':>7}{'trials/s':>10}"
+        f"{'calls/trial':>13}{'ttfi_ms':>10}{'improved':>10}{'improvement':>13}"
+    )
+    for r in results:
+        ttfi = r["time_to_first_improvement_ms"]
+        print(
+            f"{r['sampler']:<9}{r['batch_size']:>6}{r['n_trials']:>8}{r['n_features']:>7}"
+            f"{r['trials_per_s']:>10.1f}{r['calls_per_trial']:>13.3f}"
+            f"{(f'{ttfi:.1f}' if ttfi is not None else '-'):>10}"
+            f"{r['improved_share']:>10.0%}{r['mean_improvement']:>13.4f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feature optimizer micro-benchmark.")
+    parser.add_argument("--samplers", nargs="+", default=["tpe", "random", "qmc"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--n-trials", type=int, nargs="+", default=[30, 100])
+    parser.add_argument("--n-features", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--samples", type=int, default=5, help="Rows optimized per configuration.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--predictor-dir", default=PREDICTOR_DIR)
+    parser.add_argument("--output", default="optimizer_results.json")
+    args = parser.parse_args(argv)
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    warnings.filterwarnings("ignore", category=optuna.exceptions.ExperimentalWarning)
+    predictor, data = load_predictor(args.predictor_dir)
+    samples = data.sample(n=args.samples, random_state=args.seed)
+
+    results = []
+    for sampler in args.samplers:
+        for batch_size in args.batch_sizes:
+            for n_trials in args.n_trials:
+                for n_features in args.n_features:
+                    results.append(run_config(
+                        predictor, samples, sampler, batch_size, n_trials,
+                        min(n_features, len(FEATURE_BOUNDS)), args.seed,
+                    ))
+    print_table(results)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""
+End-to-end benchmark of process_1/process_2/process_3 on synthetic datasets.
+
+Every case (rows x columns x task) runs in a fresh process, so peak RSS is
+measured per case. Per-stage wall time, CPU time and memory are read from the
+run report written by the pipeline and saved to a JSON results file.
+
+Usage
+    python -m benchmarks.pipeline_benchmark run --rows 1000 10000 --cols 20 100 \\
+        --output bench_results.json
+    python -m benchmarks.pipeline_benchmark compare bench_results.json baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import os.path as osp
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone, timedelta
+
+sys.path.append(osp.abspath(osp.join(osp.dirname(__file__), "..")))
+
+from benchmarks.synthetic import BASE_COLUMNS, TASK_TARGETS, write_dataset  # noqa: E402
+
+DEFAULT_ROWS = [1000, 10000, 100000, 1000000]
+DEFAULT_COLS = [20, 100, 500]
+DEFAULT_TIME_TO_TRAIN = 30
+DEFAULT_N_TRIALS = 10
+# A stage regresses when it is slower (or larger) than the baseline by more
+# than the tolerance and by more than the absolute noise floor.
+DEFAULT_TOLERANCE = 0.2
+MIN_WALL_DELTA_S = 0.5
+MIN_RSS_DELTA_MB = 50.0
+STAGE_METRICS = ["wall_s", "cpu_s", "peak_rss_mb", "peak_rss_growth_mb"]
+CONTROLLABLE_FEATURES = ["MonthlyIncome", "WorkLifeBalance"]
+kst = timezone(timedelta(hours=9))
+
+
+def run_case(work_dir, n_rows, n_cols, task, time_to_train, n_trials, missing_ratio, seed):
+    """
+    Run the whole pipeline on one synthetic dataset.
+
+    Parameters
+        work_dir : str
+            Directory for the dataset and the run workspace.
+        n_rows : int
+            Number of rows.
+        n_cols : int
+            Number of columns including the target.
+        task : str
+            Target type; one of "binary", "multiclass" or "regression".
+        time_to_train : int
+            AutoGluon time limit in seconds.
+        n_trials : int
+            Number of optimization trials per sample.
+        missing_ratio : float
+            Share of missing values in every feature column.
+        seed : int
+            Random seed of the generator.
+
+    Returns
+        dict
+            Case result with the keys case, rows, cols, task, status,
+            total_wall_s, stages (metrics per stage) and error.
+    """
+    from process.process import process_1, process_2, process_3
+    from config.config_store import RUN_REPORT_FILENAME
+
+    case = f"{task}-{n_rows}x{n_cols}"
+    result = {"case": case, "rows": n_rows, "cols": n_cols, "task": task, "error": None}
+    data_path = write_dataset(osp.join(work_dir, f"{case}.csv"), n_rows, n_cols, task, missing_ratio, seed)
+    target = TASK_TARGETS[task]
+    controllable = [col for col in CONTROLLABLE_FEATURES if col in BASE_COLUMNS[:max(n_cols - 1, 1)]]
+    model_config_path = None
+
+    start = time.perf_counter()
+    try:
+        model_config_path, user_config_path, dataset = process_1(data_path, run_id=case)
+        model_config_path, user_config_path, model, preprocessed_df, preprocessor = process_2(
+            model_config_path,
+            user_config_path,
+            dataset,
+            config_updates={
+                "target_feature": target,
+                "controllable_feature": controllable,
+                "necessary_feature": [],
+                "limited_feature": -1,
+                "model": {"time_to_train": time_to_train, "model_quality": "medium"},
+            },
+        )
+        if controllable:
+            process_3(
+                model_config_path,
+                user_config_path,
+                model,
+                preprocessed_df,
+                preprocessor,
+                config_updates={
+                    "optimization": {
+                        "direction": "maximize",
+                        "n_trials": n_trials,
+                        "target_class": {"binary": 0, "multiclass": 1}.get(task),
+                        "opt_range": {
+                            col: [20, 20] if col == "MonthlyIncome" else [1, 4] for col in controllable
+                        },
+                    }
+                },
+            )
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    result["total_wall_s"] = round(time.perf_counter() - start, 4)
+
+    result["stages"] = {}
+    if model_config_path:
+        report_path = osp.join(osp.dirname(model_config_path), RUN_REPORT_FILENAME)
+        if osp.exists(report_path):
+            with open(report_path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            for record in report["stages"]:
+                result["stages"][record["stage"]] = {
+                    metric: record[metric] for metric in STAGE_METRICS if metric in record
+                }
+            result["latencies"] = report.get("latencies", {})
+    return result
+
+
+def run_benchmark(rows, cols, tasks, time_to_train, n_trials, missing_ratio, seed, work_dir=None):
+    """
+    Run all benchmark cases, each in a fresh process.
+
+    Parameters
+        rows : list of int
+            Row counts.
+        cols : list of int
+            Column counts.
+        tasks : list of str
+            Target types.
+        time_to_train : int
+            AutoGluon time limit in seconds.
+        n_trials : int
+            Number of optimization trials per sample.
+        missing_ratio : float
+            Share of missing values in every feature column.
+        seed : int
+            Random seed of the generator.
+        work_dir : str, optional
+            Directory for datasets and workspaces; a temporary directory that
+            is removed afterwards by default.
+
+    Returns
+        dict
+            Results with the keys meta (environment) and cases (list of case results).
+    """
+    cleanup = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="automl_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    cases = []
+    try:
+        for task in tasks:
+            for n_rows in rows:
+                for n_cols in cols:
+                    print(f"[bench] {task} {n_rows} rows x {n_cols} cols ...", flush=True)
+                    with ctx.Pool(1) as pool:
+                        result = pool.apply(
+                            run_case,
+                            (work_dir, n_rows, n_cols, task, time_to_train, n_trials, missing_ratio, seed),
+                        )
+                    print(f"[bench] {result['case']}: {result['status']} in {result['total_wall_s']:.1f}s", flush=True)
+                    cases.append(result)
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(kst).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "time_to_train": time_to_train,
+            "n_trials": n_trials,
+            "missing_ratio": missing_ratio,
+            "seed": seed,
+        },
+        "cases": cases,
+    }
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare benchmark results with a baseline and list the regressions.
+
+    Wall time and peak RSS of every stage present in both results are
+    compared; a stage regresses when it exceeds the baseline by more than
+    tolerance (relative) and by more than MIN_WALL_DELTA_S or
+    MIN_RSS_DELTA_MB (absolute). Cases that succeeded in the baseline and
+    fail now are regressions as well.
+
+    Parameters
+        current : dict
+            Results returned by run_benchmark.
+        baseline : dict
+            Stored baseline results.
+        tolerance : float, optional
+            Allowed relative slowdown, by default DEFAULT_TOLERANCE.
+
+    Returns
+        list of dict
+            One entry per regression with the keys case, stage, metric,
+            baseline and current.
+    """
+    limits = {"wall_s": MIN_WALL_DELTA_S, "peak_rss_mb": MIN_RSS_DELTA_MB}
+    baseline_cases = {case["case"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in current["cases"]:
+        base = baseline_cases.get(case["case"])
+        if base is None:
+            continue
+        if base["status"] == "ok" and case["status"] != "ok":
+            regressions.append({
+                "case": case["case"], "stage": None, "metric": "status",
+                "baseline": base["status"], "current": case["status"],
+            })
+            continue
+        for name, metrics in case["stages"].items():
+            base_metrics = base["stages"].get(name)
+            if base_metrics is None:
+                continue
+            for metric, min_delta in limits.items():
+                if metric not in metrics or metric not in base_metrics:
+                    continue
+                old, new = base_metrics[metric], metrics[metric]
+                if new > old * (1 + tolerance) and new - old > min_delta:
+                    regressions.append({
+                        "case": case["case"], "stage": name, "metric": metric,
+                        "baseline": old, "current": new,
+                    })
+    return regressions
+
+
+def print_results(results):
+    """
+    Print the top-level stage timings of every case as a table.
+
+    Parameters
+        results : dict
+            Results returned by run_benchmark.
+    """
+    print(f"{'case':<28}{'status':<8}{'total_s':>10}{'process_1':>11}{'process_2':>11}{'process_3':>11}{'rss_mb':>9}")
+    for case in results["cases"]:
+        stages = case["stages"]
+        walls = [stages.get(name, {}).get("wall_s") for name in ["process_1", "process_2", "process_3"]]
+        peak = max([metrics.get("peak_rss_mb", 0) for metrics in stages.values()] or [0])
+        print(
+            f"{case['case']:<28}{case['status']:<8}{case['total_wall_s']:>10.1f}"
+            + "".join(f"{wall:>11.1f}" if wall is not None else f"{'-':>11}" for wall in walls)
+            + f"{peak:>9.0f}"
+        )
+
+
+def print_regressions(regressions):
+    """
+    Print the regressions found by compare_results.
+
+    Parameters
+        regressions : list of dict
+            Regressions returned by compare_results.
+    """
+    if not regressions:
+        print("No regressions against the baseline.")
+        return
+    print(f"{len(regressions)} regression(s) against the baseline:")
+    for r in regressions:
+        change = ""
+        if isinstance(r["baseline"], (int, float)) and r["baseline"]:
+            change = f" ({(r['current'] / r['baseline'] - 1):+.0%})"
+        print(f"  {r['case']} {r['stage'] or ''} {r['metric']}: {r['baseline']} -> {r['current']}{change}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=osp.dirname(osp.abspath(__file__)), capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end AutoML pipeline benchmark.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark cases.")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    run_parser.add_argument("--cols", type=int, nargs="+", default=DEFAULT_COLS)
+    run_parser.add_argument("--tasks", nargs="+", default=["binary"], choices=list(TASK_TARGETS))
+    run_parser.add_argument("--time-to-train", type=int, default=DEFAULT_TIME_TO_TRAIN)
+    run_parser.add_argument("--n-trials", type=int, default=DEFAULT_N_TRIALS)
+    run_parser.add_argument("--missing-ratio", type=float, default=0.05)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--work-dir", default=None, help="Keep datasets and workspaces here.")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument("--baseline", default=None, help="Compare with this results file.")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare a results file with a baseline.")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run_benchmark(
+            args.rows, args.cols, args.tasks, args.time_to_train, args.n_trials,
+            args.missing_ratio, args.seed, args.work_dir,
+        )
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print_results(results)
+        print(f"Results saved: {args.output}")
+        baseline_path = args.baseline
+    else:
+        with open(args.results, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        print_results(results)
+        baseline_path = args.baseline
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        print_regressions(regressions)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+TASK_TARGETS = {
+    "binary": "Attrition",
+    "multiclass": "JobLevel",
+    "regression": "PerformanceScore",
+}
+DEPARTMENTS = ["Sales", "Research & Development", "Human Resources"]
+EDUCATION_FIELDS = ["Life Sciences", "Medical", "Marketing", "Technical Degree", "Other"]
+BUSINESS_TRAVEL = ["Non-Travel", "Travel_Rarely", "Travel_Frequently"]
+COMMENT_WORDS = [
+    "pay", "workload", "manager", "team", "commute", "promotion", "training",
+    "overtime", "flexible", "remote", "stress", "growth", "benefits", "culture",
+]
+# HR attrition-like base columns; filler columns are added after them.
+BASE_COLUMNS = [
+    "Age", "MonthlyIncome", "WorkLifeBalance", "OverTime", "Department",
+    "Education", "EducationField", "DistanceFromHome", "BusinessTravel",
+    "YearsAtCompany", "HireDate", "Comment",
+]
+
+
+def make_dataset(n_rows, n_cols=20, task="binary", missing_ratio=0.05, seed=42):
+    """
+    Generate a seeded synthetic dataset shaped like the HR attrition data.
+
+    The first columns mirror the HR data (numeric, ordinal, categorical, a
+    hire date and a free-text comment); further numeric and categorical
+    filler columns are added until the dataset has n_cols columns including
+    the target. The target depends on a few of the base columns, so the
+    trained model has a signal to learn.
+
+    Parameters
+        n_rows : int
+            Number of rows.
+        n_cols : int, optional
+            Number of columns including the target, by default 20.
+        task : str, optional
+            Target type; one of "binary", "multiclass" or "regression",
+            by default "binary".
+        missing_ratio : float, optional
+            Share of missing values in every feature column, by default 0.05.
+        seed : int, optional
+            Random seed, by default 42.
+
+    Returns
+        pd.DataFrame
+            The dataset; the target column is TASK_TARGETS[task].
+    """
+    if task not in TASK_TARGETS:
+        raise ValueError(f"Unsupported task type: {task}")
+    rng = np.random.default_rng(seed)
+
+    age = rng.integers(18, 61, n_rows)
+    years = np.minimum(rng.exponential(6.0, n_rows).astype(int), age - 18)
+    income = np.round(rng.lognormal(8.5, 0.45, n_rows) + years * 120.0, 0)
+    work_life = rng.integers(1, 5, n_rows)
+    overtime = rng.random(n_rows) < 0.28
+    distance = rng.integers(1, 30, n_rows)
+    hire_date = pd.Timestamp("2024-12-31") - pd.to_timedelta(years * 365 + rng.integers(0, 365, n_rows), unit="D")
+    words = rng.choice(COMMENT_WORDS, size=(n_rows, 3))
+    base = {
+        "Age": age,
+        "MonthlyIncome": income,
+        "WorkLifeBalance": work_life,
+        "OverTime": np.where(overtime, "Yes", "No"),
+        "Department": rng.choice(DEPARTMENTS, n_rows, p=[0.3, 0.65, 0.05]),
+        "Education": rng.integers(1, 6, n_rows),
+        "EducationField": rng.choice(EDUCATION_FIELDS, n_rows),
+        "DistanceFromHome": distance,
+        "BusinessTravel": rng.choice(BUSINESS_TRAVEL, n_rows, p=[0.1, 0.7, 0.2]),
+        "YearsAtCompany": years,
+        "HireDate": hire_date.strftime("%Y-%m-%d"),
+        "Comment": [" ".join(row) for row in words],
+    }
+
+    # Latent score shared by all target types.
+    score = (
+        -0.04 * (age - 36)
+        - 0.00025 * (income - income.mean())
+        - 0.5 * (work_life - 2.5)
+        + 1.4 * overtime
+        + 0.03 * distance
+        + rng.normal(0.0, 0.8, n_rows)
+    )
+    if task == "binary":
+        target = np.where(rng.random(n_rows) < 1.0 / (1.0 + np.exp(-(score - 1.6))), "Yes", "No")
+    elif task == "multiclass":
+        target = np.digitize(score, np.quantile(score, [0.2, 0.45, 0.7, 0.9])) + 1
+    else:
+        target = np.round(3.0 + score + rng.normal(0.0, 0.3, n_rows), 3)
+
+    n_features = max(n_cols - 1, 1)
+    data = {name: base[name] for name in BASE_COLUMNS[:n_features]}
+    for i in range(n_features - len(data)):
+        if i % 3 == 2:
+            data[f"cat_{i}"] = rng.choice([f"level_{j}" for j in range(5 + i % 20)], n_rows)
+        else:
+            data[f"num_{i}"] = np.round(rng.normal(i % 7, 1.0 + i % 5, n_rows), 4)
+    data = pd.DataFrame(data)
+
+    if missing_ratio > 0:
+        for col in data.columns:
+            mask = rng.random(n_rows) < missing_ratio
+            if mask.any():
+                data[col] = data[col].where(~mask)
+    data[TASK_TARGETS[task]] = target
+    return data
+
+
+def write_dataset(path, n_rows, n_cols=20, task="binary", missing_ratio=0.05, seed=42):
+    """
+    Generate a synthetic dataset with make_dataset and save it as CSV.
+
+    Parameters
+        path : str
+            Destination CSV path.
+        n_rows : int
+            Number of rows.
+        n_cols : int, optional
+            Number of columns including the target, by default 20.
+        task : str, optional
+            Target type, by default "binary".
+        missing_ratio : float, optional
+            Share of missing values in every feature column, by default 0.05.
+        seed : int, optional
+            Random seed, by default 42.
+
+    Returns
+        str
+            The destination path.
+    """
+    make_dataset(n_rows, n_cols, task, missing_ratio, seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,174 @@
+import hashlib
+import io
+import json
+import os
+import os.path as osp
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.logger_config import logger
+from config.config_store import atomic_path
+
+ARTIFACT_DIR = "artifacts"
+SIDECAR_FIELDS = ("filtered_data", "correlations", "top_models", "feature_importance")
+ARTIFACT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "npz": "application/octet-stream",
+}
+# Column dtypes that Parquet stores natively; anything else is JSON-encoded.
+NATIVE_DTYPES = {"string", "floating", "integer", "mixed-integer-float", "boolean", "empty"}
+HASH_BLOCK_SIZE = 1024 ** 2
+# Hex digits of the content digest appended to sidecar file names.
+ARTIFACT_DIGEST_CHARS = 16
+
+
+def is_artifact(value):
+    """
+    Check whether a configuration value is a reference to a sidecar file.
+
+    Parameters
+        value : object
+            Configuration value.
+
+    Returns
+        bool
+            True if the value is an artifact reference.
+    """
+    return isinstance(value, dict) and {"artifact", "path", "sha256"} <= set(value)
+
+
+def save_artifact(artifact_dir, name, value):
+    """
+    Write a large configuration table to a sidecar file.
+
+    Correlation matrices ({method: list of row dicts}) are stored as float
+    matrices in a NumPy .npz archive; every other table ({column: {index: value}}
+    like DataFrame.to_dict(), or {row: {field: value}} for filtered_data) is
+    stored as Parquet. The file is named <name>-<digest>.<format> after its
+    content, so runs that share a directory never overwrite each other's
+    tables, and an identical table is written only once.
+
+    Parameters
+        artifact_dir : str
+            Directory where the sidecar file is written.
+        name : str
+            Configuration key of the table, used as the file name prefix.
+        value : dict
+            Table to store.
+
+    Returns
+        dict
+            Artifact reference with the keys 'artifact' (format), 'path' and 'sha256'.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    buffer = io.BytesIO()
+    if name == "correlations":
+        _save_matrices(buffer, value)
+        artifact = "npz"
+    else:
+        orient = "index" if name == "filtered_data" else "columns"
+        _save_table(buffer, pd.DataFrame.from_dict(value, orient=orient), orient == "index")
+        artifact = "parquet"
+
+    payload = buffer.getvalue()
+    sha256 = hashlib.sha256(payload).hexdigest()
+    path = osp.join(artifact_dir, f"{name}-{sha256[:ARTIFACT_DIGEST_CHARS]}.{artifact}")
+    if not osp.exists(path) or file_sha256(path) != sha256:
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+
+    ref = {"artifact": artifact, "path": path, "sha256": sha256}
+    logger.info(f"Saved {name} to sidecar file: {path}")
+    return ref
+
+
+def load_artifact(ref):
+    """
+    Load a table from a sidecar file and verify its checksum.
+
+    Parameters
+        ref : dict
+            Artifact reference returned by save_artifact.
+
+    Returns
+        dict
+            The table in the same layout it was saved in.
+    """
+    path = ref["path"]
+    if file_sha256(path) != ref["sha256"]:
+        raise ValueError(f"Checksum mismatch for artifact: {path}")
+    if ref["artifact"] == "npz":
+        return _load_matrices(path)
+    return _load_table(path)
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 digest of a file without reading it into memory at once.
+
+    Parameters
+        path : str
+            Path to the file.
+
+    Returns
+        str
+            Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save_matrices(f, correlations):
+    arrays = {}
+    for method, records in correlations.items():
+        frame = pd.DataFrame.from_records(records or [])
+        arrays[f"{method}.columns"] = np.asarray(frame.columns, dtype=str)
+        arrays[f"{method}.values"] = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+    np.savez(f, **arrays)
+
+
+def _load_matrices(path):
+    with np.load(path, allow_pickle=False) as archive:
+        methods = [key[:-len(".columns")] for key in archive.files if key.endswith(".columns")]
+        correlations = {}
+        for method in methods:
+            columns = archive[f"{method}.columns"].tolist()
+            frame = pd.DataFrame(archive[f"{method}.values"], columns=columns)
+            correlations[method] = _to_records(frame)
+    return correlations
+
+
+def _save_table(f, frame, by_row):
+    json_columns = []
+    for col in frame.columns:
+        if pd.api.types.infer_dtype(frame[col], skipna=True) not in NATIVE_DTYPES:
+            frame[col] = [None if _is_null(v) else json.dumps(v) for v in frame[col]]
+            json_columns.append(col)
+    frame.columns = frame.columns.astype(str)
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"artifact"] = json.dumps({"by_row": by_row, "json_columns": json_columns}).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), f)
+
+
+def _load_table(path):
+    table = pq.read_table(path)
+    info = json.loads(table.schema.metadata[b"artifact"])
+    frame = table.to_pandas()
+    for col in info["json_columns"]:
+        frame[col] = [None if v is None else json.loads(v) for v in frame[col]]
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient="index" if info["by_row"] else "dict")
+
+
+def _to_records(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
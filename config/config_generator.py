@@ -1,43 +1,115 @@
 import json
 from utils.logger_config import logger
-import pandas as pd
 import os.path as osp
 from datetime import datetime, timezone, timedelta
 from omegaconf import OmegaConf
-from ydata_profiling import ProfileReport
+import os
+from config.eda_profiler import profile_data, sample_rows, apply_exact_fields, redundant_columns
+from config.sketch_profiler import profile_csv, ERROR_BOUNDS
+from config.run_context import RunContext
+from config.config_store import config_lock, run_workspace, write_json
+from config.artifact_store import save_artifact
+from config.update_config import convert_numpy_types
+from data.dataset_handle import open_dataset
+from data.content_store import (
+    MANIFEST_FILENAME,
+    cache_key,
+    content_dir,
+    load_manifest,
+    save_manifest,
+)
 from utils.analysis_feature import identify_categorical_features
+from utils.instrumentation import stage
 
+EDA_ENGINES = ["auto", "native", "ydata", "sketch"]
+SKETCH_MIN_BYTES = 1024 ** 3
+EDA_DIR = "eda"
 
-def generate_config(data_path):
+
+def generate_config(
+    data_path,
+    eda_engine="auto",
+    eda_report=False,
+    correlations=False,
+    row_budget=None,
+    target=None,
+    run_id=None,
+    content_hash=None,
+    columnar_path=None,
+    dominance_threshold=None,
+):
     """
     Generate configuration files for model training and update user settings.
 
     This function loads the dataset from the given path, performs exploratory
-    data analysis (EDA) using ydata_profiling, and generates two configuration
-    files:
+    data analysis (EDA) and generates two configuration files:
       - A user configuration file for web communication.
       - A model configuration file for internal server use.
-    It also saves an HTML report of the EDA.
+    The "native" engine computes the EDA statistics with vectorized pandas
+    operations; the "ydata" engine runs a full ydata_profiling report; the
+    "sketch" engine profiles the CSV chunk by chunk in parallel workers with
+    mergeable sketches without loading it, and the dataset is then not
+    returned. "auto" picks "sketch" for files of at least SKETCH_MIN_BYTES
+    and "native" otherwise.
+    The HTML report of the EDA is only rendered here when eda_report is True;
+    otherwise it can be rendered later with generate_eda_report, e.g. in a
+    background worker, at the eda_html_path recorded in the user config.
+    With a row_budget, datasets with more rows are profiled on a (stratified)
+    sample; exact values are kept for the fields that need them and the
+    sampling details are recorded as eda_sampling in the model config.
+    With a run_id, all files of the run are written to their own workspace
+    (<dirname(data_path)>/runs/<run_id>) so that concurrent runs on datasets
+    in the same directory do not overwrite each other's configuration.
+    With a content_hash, the EDA results and the HTML report are stored once
+    in the shared directory of that content and reused by every later run on
+    identical data, whatever its path.
 
     Parameters
         data_path : str
             Path to the input CSV data file.
+        eda_engine : str, optional
+            EDA engine to use ('auto', 'native', 'ydata' or 'sketch'),
+            by default "auto".
+        eda_report : bool, optional
+            Whether to render the ydata_profiling HTML report, by default False.
+        correlations : bool, optional
+            Whether the native engine computes the all-pairs "auto" correlation
+            matrix. Feature selection only needs the target row, which is
+            computed later by target_associations, by default False.
+        row_budget : int, optional
+            Maximum number of rows profiled by the native and ydata engines.
+            None profiles every row, by default None.
+        target : str, optional
+            Column to stratify the sample on, by default None.
+        run_id : str, optional
+            Identifier of the run (e.g. the inform id) used as the workspace
+            name, by default None (write next to the data file).
+        content_hash : str, optional
+            Content hash of the dataset used to share EDA results, by default None.
+        columnar_path : str, optional
+            Path to a columnar copy of the dataset to read instead of the CSV,
+            by default None.
+        dominance_threshold : float, optional
+            Also drop columns whose most frequent value covers at least this
+            share of the rows. None only drops all-null, constant and duplicate
+            columns, because a rare-event target would otherwise be dropped,
+            by default None.
 
     Returns
         tuple
             A tuple containing:
                 - model_config_path (str): Path to the generated model configuration file.
                 - user_config_path (str): Path to the generated user configuration file.
-                - data (pd.DataFrame): Loaded dataset.
+                - data (pd.DataFrame or None): Loaded dataset, None for the sketch
+                  engine or when shared EDA results were reused.
     """
-    save_path = osp.dirname(data_path)
+    if eda_engine not in EDA_ENGINES:
+        raise ValueError(f"Invalid eda_engine. Choose from {EDA_ENGINES}.")
+    if eda_engine == "auto":
+        eda_engine = "sketch" if os.path.getsize(data_path) >= SKETCH_MIN_BYTES else "native"
 
-    try:
-        data = pd.read_csv(data_path)
-        logger.info(f"Data loaded from {data_path}")
-    except Exception as e:
-        logger.error(f"Failed to load data: {e}")
-        return
+    save_path = run_workspace(data_path, run_id)
+    dataset = open_dataset(data_path, columnar_path=columnar_path)
 
     # Create a timestamp using KST (UTC+9)
     kst = timezone(timedelta(hours=9))
@@ -48,28 +120,48 @@ def generate_config(data_path):
     model_config_filename = "model_config.json"
     eda_html_filename = "EDA_analysis.html"
 
+    shared_dir = content_dir(content_hash) if content_hash else None
     user_config_path = osp.join(save_path, user_config_filename)
     model_config_path = osp.join(save_path, model_config_filename)
-    eda_html_path = osp.join(save_path, eda_html_filename)
-
-    # Drop columns with only a single unique value.
-    for col in data.columns:
-        if len(data[col].unique()) == 1:
-            data.drop(columns=[col], inplace=True)
-
-    # Generate EDA report and save as HTML.
-    profile = ProfileReport(data, explorative=True)
-    profile.to_file(eda_html_path)
-
-    # Convert the EDA report to an OmegaConf object.
-    original_eda_str = profile.to_json()
-    original_eda_dict = json.loads(original_eda_str)
-    original_eda = OmegaConf.create(original_eda_dict)
+    eda_html_path = osp.join(shared_dir or save_path, eda_html_filename)
 
-    # Filter the EDA results.
-    filtered_data = _extract_filtered_eda(original_eda)
-    correlations = original_eda.get("correlations")
-    categorical_feature = identify_categorical_features(filtered_data)
+    eda_options = {
+        "eda_engine": eda_engine,
+        "eda_report": eda_report,
+        "correlations": correlations,
+        "row_budget": row_budget,
+        "target": target,
+        "dominance_threshold": dominance_threshold,
+    }
+    with stage("eda") as record:
+        if shared_dir is None:
+            eda = _run_eda(dataset, eda_html_path=eda_html_path, **eda_options)
+        else:
+            # Identical content is profiled once; later runs reuse the stored result.
+            eda_dir = osp.join(shared_dir, EDA_DIR, cache_key(
+                {key: value for key, value in eda_options.items() if key != "eda_report"}
+            ))
+            os.makedirs(eda_dir, exist_ok=True)
+            with config_lock(osp.join(eda_dir, MANIFEST_FILENAME)):
+                eda = load_manifest(eda_dir)
+                if eda is not None:
+                    logger.info(f"Reusing EDA results of identical data: {eda_dir}")
+                    record["cached"] = True
+                    eda["data"] = None
+                    if eda_report and not osp.exists(eda_html_path):
+                        generate_eda_report(data_path, eda_html_path, dataset.columnar_path)
+                else:
+                    eda = _run_eda(dataset, eda_html_path=eda_html_path, **eda_options)
+                    if eda is not None:
+                        _share_eda(eda_dir, eda)
+        if eda is not None:
+            record["cols"] = len(eda["features"])
+            if eda["data"] is not None:
+                record["rows"] = len(eda["data"])
+    if eda is None:
+        return
+    data = eda["data"]
+    features = eda["features"]
 
     config = OmegaConf.create({})
 
@@ -79,50 +171,244 @@ def generate_config(data_path):
         OmegaConf.create({
             "model_config_path": model_config_path,
             "eda_html_path": eda_html_path,
-            "features": list(data.columns)
+            "features": features
         })
     )
 
-    with open(user_config_path, "w", encoding="utf-8") as f:
-        json.dump(
-            OmegaConf.to_container(user_config, resolve=True),
-            f,
-            indent=4,
-            ensure_ascii=False
-        )
+    write_json(user_config_path, OmegaConf.to_container(user_config, resolve=True))
 
-    model_config = OmegaConf.merge(
-        config,
-        OmegaConf.create({
-            "data_path": data_path,
-            "save_path": save_path,
-            "features": list(data.columns),
-            "filtered_data": filtered_data,
-            "correlations": correlations,
-            "correlations_result": None,
-            "final_features": None,
-            "categorical_features": categorical_feature,
-            "model_result": {},
-            "top_models": {},
-            "feature_importance": {},
-        })
-    )
-
-    with open(model_config_path, "w", encoding="utf-8") as f:
-        json.dump(
-            OmegaConf.to_container(model_config, resolve=True),
-            f,
-            indent=4,
-            ensure_ascii=False
-        )
+    # Large tables (filtered_data, correlations) are written to sidecar files.
+    model_config = RunContext.from_dict({
+        "data_path": data_path,
+        "save_path": save_path,
+        "content_hash": content_hash,
+        "columnar_path": dataset.columnar_path,
+        "features": features,
+        "eda_engine": eda_engine,
+        "eda_error_bounds": ERROR_BOUNDS if eda_engine == "sketch" else {},
+        "eda_sampling": eda["sampling"],
+        "filtered_data": eda["filtered_data"],
+        "correlations": eda["correlations"],
+        "target_correlations": {},
+        "correlations_result": None,
+        "final_features": None,
+        "categorical_features": eda["categorical_features"],
+        "dropped_columns": eda["dropped_columns"],
+        "model_result": {},
+        "top_models": {},
+        "feature_importance": {},
+    })
+    model_config.flush(model_config_path)
 
     logger.info(f"User config saved: {user_config_path}")
     logger.info(f"Model config saved: {model_config_path}")
-    logger.info(f"EDA HTML saved: {eda_html_path}")
+    if eda_report:
+        logger.info(f"EDA HTML saved: {eda_html_path}")
 
     return model_config_path, user_config_path, data
 
 
+def _run_eda(
+    dataset,
+    eda_engine,
+    eda_report,
+    correlations,
+    row_budget,
+    target,
+    eda_html_path,
+    dominance_threshold=None,
+):
+    """
+    Profile a dataset with the selected EDA engine.
+
+    Parameters
+        dataset : DatasetHandle
+            Handle of the dataset to profile.
+        eda_engine : str
+            EDA engine ('native', 'ydata' or 'sketch').
+        eda_report : bool
+            Whether to render the ydata_profiling HTML report.
+        correlations : bool
+            Whether the native engine computes the all-pairs correlation matrix.
+        row_budget : int or None
+            Maximum number of rows profiled by the native and ydata engines.
+        target : str or None
+            Column to stratify the sample on.
+        eda_html_path : str
+            Path where the HTML report is saved.
+        dominance_threshold : float, optional
+            Dominance threshold for near-constant columns, by default None.
+
+    Returns
+        dict or None
+            EDA results with the keys data, features, sampling, filtered_data,
+            correlations, categorical_features and dropped_columns, or None if
+            the data could not be loaded.
+    """
+    data_path = dataset.path
+    data = None
+    if eda_engine != "sketch":
+        try:
+            data = dataset.data
+        except Exception as e:
+            logger.error(f"Failed to load data: {e}")
+            return
+
+    if eda_engine == "sketch":
+        filtered_data = profile_csv(data_path, columnar_path=dataset.columnar_path)
+        # Drop columns with only a single unique value (or only missing values).
+        dropped_columns = {
+            "all_null": [col for col, info in filtered_data.items() if info["n_distinct"] == 0],
+            "constant": [
+                col for col, info in filtered_data.items()
+                if info["n_distinct"] == 1 and info["p_missing"] == 0 and col != target
+            ],
+            "near_constant": [],
+            "duplicate": {},
+        }
+        dropped = set(dropped_columns["all_null"]) | set(dropped_columns["constant"])
+        filtered_data = {col: info for col, info in filtered_data.items() if col not in dropped}
+        features = list(filtered_data.keys())
+        correlations = None
+        if eda_report:
+            generate_eda_report(data_path, eda_html_path, dataset.columnar_path)
+    else:
+        data, dropped_columns = _drop_redundant_columns(data, dominance_threshold, target)
+        features = list(data.columns)
+
+    sample, sampling = (data, None) if data is None else sample_rows(data, row_budget, target)
+    if sampling:
+        logger.info(
+            f"Profiling {sampling['n_sampled']} of {sampling['n_rows']} rows "
+            f"({sampling['method']} sample)"
+        )
+
+    profile = None
+    if eda_engine == "ydata" or (eda_report and data is not None):
+        from ydata_profiling import ProfileReport
+
+        profile = ProfileReport(sample, explorative=True)
+
+    if eda_report and profile is not None:
+        # Generate EDA report and save as HTML.
+        profile.to_file(eda_html_path)
+
+    if eda_engine == "ydata":
+        # Convert the EDA report to an OmegaConf object.
+        original_eda_str = profile.to_json()
+        original_eda_dict = json.loads(original_eda_str)
+        original_eda = OmegaConf.create(original_eda_dict)
+
+        # Filter the EDA results.
+        filtered_data = _extract_filtered_eda(original_eda)
+        correlations = original_eda.get("correlations")
+        if correlations is not None:
+            correlations = OmegaConf.to_container(correlations, resolve=True)
+    elif eda_engine == "native":
+        filtered_data, correlations = profile_data(sample, correlations=correlations)
+    if sampling:
+        sampling["estimated_fields"] = apply_exact_fields(filtered_data, data)
+        if correlations:
+            sampling["estimated_fields"].append("correlations")
+    categorical_feature = identify_categorical_features(filtered_data)
+
+    return {
+        "data": data,
+        "features": features,
+        "sampling": sampling,
+        "filtered_data": filtered_data,
+        "correlations": correlations,
+        "categorical_features": categorical_feature,
+        "dropped_columns": dropped_columns,
+    }
+
+
+def _share_eda(eda_dir, eda):
+    """
+    Store EDA results in the shared directory of the dataset content.
+
+    The large tables are written as sidecar files and replaced in eda by their
+    references, so every run on the same content points to the same files.
+
+    Parameters
+        eda_dir : str
+            Directory of the cached EDA result.
+        eda : dict
+            EDA results returned by _run_eda; updated in place.
+    """
+    for key in ["filtered_data", "correlations"]:
+        if eda[key]:
+            eda[key] = save_artifact(eda_dir, key, convert_numpy_types(eda[key]))
+    save_manifest(eda_dir, convert_numpy_types(
+        {key: value for key, value in eda.items() if key != "data"}
+    ))
+
+
+def generate_eda_report(data_path, eda_html_path, columnar_path=None):
+    """
+    Render the ydata_profiling HTML report of a dataset.
+
+    This is the deferred counterpart of generate_config(..., eda_report=True)
+    and is meant to run in a separate process once the configuration files
+    have been generated.
+
+    Parameters
+        data_path : str
+            Path to the input CSV data file.
+        eda_html_path : str
+            Path where the HTML report is saved.
+        columnar_path : str, optional
+            Path to a columnar copy of the dataset, by default None.
+
+    Returns
+        str
+            The path to the saved HTML report.
+    """
+    from ydata_profiling import ProfileReport
+
+    data, _ = _drop_redundant_columns(open_dataset(data_path, columnar_path=columnar_path).data)
+    profile = ProfileReport(data, explorative=True)
+    profile.to_file(eda_html_path)
+    logger.info(f"EDA HTML saved: {eda_html_path}")
+    return eda_html_path
+
+
+def _drop_redundant_columns(data, dominance_threshold=None, target=None):
+    """
+    Drop all-null, constant, near-constant and duplicate columns at once.
+
+    The input is left untouched because it may be shared through a dataset handle.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to clean.
+        dominance_threshold : float, optional
+            Dominance threshold for near-constant columns, by default None.
+        target : str, optional
+            Column that is never dropped, by default None.
+
+    Returns
+        tuple
+            A tuple containing:
+                - data (pd.DataFrame): The dataset without redundant columns.
+                - dropped_columns (dict): Dropped columns by reason, as
+                  returned by redundant_columns.
+    """
+    dropped_columns = redundant_columns(
+        data, dominance_threshold, keep=[target] if target else None
+    )
+    dropped = (
+        dropped_columns["all_null"]
+        + dropped_columns["constant"]
+        + dropped_columns["near_constant"]
+        + list(dropped_columns["duplicate"])
+    )
+    if dropped:
+        logger.info(f"Dropping redundant columns: {dropped_columns}")
+        data = data.drop(columns=dropped)
+    return data, dropped_columns
+
+
 def _extract_filtered_eda(config):
     """
     Extract and filter relevant EDA information from the full report.
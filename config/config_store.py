@@ -0,0 +1,125 @@
+import fcntl
+import json
+import os
+import os.path as osp
+import tempfile
+from contextlib import contextmanager
+
+RUNS_DIR = "runs"
+RUN_REPORT_FILENAME = "run_report.json"
+LOCK_SUFFIX = ".lock"
+FILE_MODE = 0o644
+
+
+def run_workspace(data_path, run_id=None):
+    """
+    Return the directory where a pipeline run writes its files, creating it.
+
+    Each run (inform) gets its own workspace under <dirname(data_path)>/runs/,
+    so pipelines on datasets in the same upload directory never share a
+    configuration file. Without a run_id the upload directory itself is used.
+
+    Parameters
+        data_path : str
+            Path to the input CSV data file.
+        run_id : str, optional
+            Identifier of the run, e.g. the inform id, by default None.
+
+    Returns
+        str
+            Path to the workspace directory.
+    """
+    workspace = osp.dirname(data_path)
+    if run_id is not None:
+        workspace = osp.join(workspace, RUNS_DIR, str(run_id))
+        os.makedirs(workspace, exist_ok=True)
+    return workspace
+
+
+def is_run_workspace(path):
+    """
+    Check whether a directory is a per-run workspace created by run_workspace.
+
+    Parameters
+        path : str
+            Directory path.
+
+    Returns
+        bool
+            True if the directory is located directly under a runs directory.
+    """
+    return osp.basename(osp.dirname(osp.normpath(path))) == RUNS_DIR
+
+
+@contextmanager
+def config_lock(path, shared=False):
+    """
+    Hold an advisory file lock on a configuration file.
+
+    The lock is taken on a separate <path>.lock file, because the
+    configuration file itself is replaced on every write.
+
+    Parameters
+        path : str
+            Path to the configuration file.
+        shared : bool, optional
+            Take a shared (read) lock instead of an exclusive one, by default False.
+    """
+    with open(path + LOCK_SUFFIX, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path that replaces path once it has been written.
+
+    The temporary file is created in the same directory and renamed over the
+    destination with os.replace, so readers only ever see the old or the new
+    complete file. It is removed if writing fails.
+
+    Parameters
+        path : str
+            Destination path.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=osp.dirname(path) or ".", prefix=f".{osp.basename(path)}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        yield tmp_path
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if osp.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(path, data):
+    """
+    Atomically write a configuration dictionary as JSON.
+
+    Parameters
+        path : str
+            Destination path.
+        data : dict
+            JSON-serializable configuration.
+
+    Returns
+        str
+            The destination path.
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    return path
@@ -0,0 +1,645 @@
+import numpy as np
+import pandas as pd
+
+LOW_CATEGORICAL_THRESHOLD = 5
+CATEGORICAL_CARDINALITY_THRESHOLD = 50
+CATEGORICAL_DISTINCT_RATIO = 0.5
+CORRELATION_BINS = 10
+CORRELATION_TYPES = ["Numeric", "Categorical", "Boolean"]
+BOOLEAN_VALUES = {"true", "false", "t", "f", "yes", "no", "y", "n"}
+EXACT_DISTINCT_MAX = 1000
+# Cells of the row-hash matrix processed at once by redundant_columns.
+REDUNDANCY_BLOCK_CELLS = 2 ** 24
+
+
+def profile_data(data, correlations=True):
+    """
+    Compute the filtered EDA statistics natively with columnar pandas/NumPy operations.
+
+    The result has the same structure as the output of _extract_filtered_eda on a
+    ydata_profiling report, so it can be used as a drop-in replacement for it.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to profile.
+        correlations : bool, optional
+            Whether to compute the "auto" association matrix, by default True.
+
+    Returns
+        tuple
+            A tuple containing:
+                - filtered_data (dict): Statistics for each variable.
+                - correlations (dict or None): {"auto": [row dicts]} in the
+                  ydata_profiling layout, or None if not computed.
+    """
+    types = infer_types(data)
+    n_rows = len(data)
+    count = data.count()
+    n_distinct = data.nunique(dropna=True)
+
+    numeric_cols = [col for col, col_type in types.items() if col_type == "Numeric"]
+    numeric_stats = _numeric_statistics(data[numeric_cols]) if numeric_cols else {}
+
+    filtered_data = {}
+    for col in data.columns:
+        non_missing = int(count[col])
+        info = {
+            "type": types[col],
+            "p_missing": (n_rows - non_missing) / n_rows if n_rows else 0.0,
+            "n_distinct": int(n_distinct[col]),
+            "p_distinct": _to_native(n_distinct[col] / non_missing) if non_missing else 0.0,
+        }
+        stats = numeric_stats.get(col, {})
+        for key in ["mean", "std", "variance", "min", "max", "kurtosis", "skewness",
+                    "mad", "range", "iqr", "Q1", "Q3"]:
+            info[key] = stats.get(key)
+        filtered_data[col] = info
+
+    correlation_result = None
+    if correlations:
+        correlation_result = {"auto": association_matrix(data, types)}
+    return filtered_data, correlation_result
+
+
+def sample_rows(data, row_budget, stratify_by=None, random_state=42):
+    """
+    Draw a row sample within the budget, stratified on a column if given.
+
+    Stratified sampling keeps the class proportions of stratify_by by taking
+    the same fraction of every group (missing values form their own group).
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to sample.
+        row_budget : int or None
+            Maximum number of rows to profile; None disables sampling.
+        stratify_by : str, optional
+            Column to stratify on, typically the target, by default None.
+        random_state : int, optional
+            Random seed, by default 42.
+
+    Returns
+        tuple
+            A tuple containing:
+                - sample (pd.DataFrame): The sampled rows (data itself if it fits).
+                - sampling (dict or None): Sampling metadata, None if not sampled.
+    """
+    n_rows = len(data)
+    if not row_budget or n_rows <= row_budget:
+        return data, None
+
+    fraction = row_budget / n_rows
+    if stratify_by and stratify_by in data.columns:
+        keys = pd.Series(np.random.RandomState(random_state).rand(n_rows), index=data.index)
+        percentile = keys.groupby(data[stratify_by], dropna=False).rank(pct=True)
+        sample = data.loc[percentile <= fraction]
+        method = "stratified"
+    else:
+        sample = data.sample(n=row_budget, random_state=random_state)
+        stratify_by = None
+        method = "random"
+
+    sampling = {
+        "method": method,
+        "stratify_by": stratify_by,
+        "n_rows": n_rows,
+        "n_sampled": len(sample),
+        "fraction": len(sample) / n_rows,
+    }
+    return sample, sampling
+
+
+def apply_exact_fields(filtered_data, data):
+    """
+    Replace sample-based statistics with exact full-data values where cheap.
+
+    p_missing, min, max and range are recomputed on the full data, as well as
+    n_distinct / p_distinct for columns with at most EXACT_DISTINCT_MAX distinct
+    values in the sample. For the other columns n_distinct is counted over the
+    full column with a HyperLogLog DistinctSketch, whose relative error is
+    given in sketch_profiler.ERROR_BOUNDS.
+
+    Parameters
+        filtered_data : dict
+            Statistics computed on a sample; updated in place.
+        data : pd.DataFrame
+            The full dataset.
+
+    Returns
+        list
+            Names of the fields that remain estimates.
+    """
+    # sketch_profiler imports this module, so the sketch is imported here.
+    from config.sketch_profiler import estimate_distinct
+
+    n_rows = len(data)
+    count = data.count()
+    numeric_cols = [col for col, info in filtered_data.items() if info["type"] == "Numeric"]
+    low_cardinality = [
+        col for col, info in filtered_data.items()
+        if info["n_distinct"] <= EXACT_DISTINCT_MAX
+    ]
+    n_distinct = data[low_cardinality].nunique(dropna=True) if low_cardinality else {}
+    minimum = data[numeric_cols].min() if numeric_cols else {}
+    maximum = data[numeric_cols].max() if numeric_cols else {}
+
+    estimated = ["mean", "std", "variance", "kurtosis", "skewness", "mad", "iqr", "Q1", "Q3"]
+    for col, info in filtered_data.items():
+        non_missing = int(count[col])
+        info["p_missing"] = (n_rows - non_missing) / n_rows if n_rows else 0.0
+        if col in low_cardinality:
+            info["n_distinct"] = int(n_distinct[col])
+        else:
+            info["n_distinct"] = estimate_distinct(data[col], numeric=col in numeric_cols)
+        info["p_distinct"] = info["n_distinct"] / non_missing if non_missing else 0.0
+        if col in numeric_cols:
+            info["min"] = _to_native(minimum[col])
+            info["max"] = _to_native(maximum[col])
+            info["range"] = _to_native(maximum[col] - minimum[col])
+
+    if len(low_cardinality) < len(filtered_data):
+        estimated += ["n_distinct", "p_distinct"]
+    return estimated
+
+
+def redundant_columns(data, dominance_threshold=None, keep=None):
+    """
+    Find all-null, constant, near-constant and duplicate columns in one pass.
+
+    Every column is mapped to a vector of 64-bit keys once (the float64 bit
+    pattern of numeric columns, a row hash for the others). A column is
+    constant when its smallest and largest key are equal; missing values count
+    as a value, as in len(series.unique()). Only when a dominance threshold is
+    given are the keys of the remaining columns sorted, which gives the share
+    of the most frequent value of all of them at once. Columns with the same
+    key fingerprint are checked with Series.equals and reported as duplicates
+    of the first such column.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to inspect.
+        dominance_threshold : float, optional
+            Share of rows above which a column whose most frequent value reaches
+            it is reported as near-constant. None only reports exact constants,
+            by default None.
+        keep : list of str, optional
+            Columns that are never reported (e.g. the target), by default None.
+
+    Returns
+        dict
+            Dictionary with the keys:
+                - all_null (list): Columns with only missing values.
+                - constant (list): Columns with a single (non-missing) value.
+                - near_constant (list): Columns dominated by one value.
+                - duplicate (dict): Duplicate column -> column it duplicates.
+    """
+    keep = set(keep or [])
+    result = {"all_null": [], "constant": [], "near_constant": [], "duplicate": {}}
+    n_rows = len(data)
+    if n_rows == 0 or data.shape[1] == 0:
+        return result
+
+    columns = list(data.columns)
+    all_null = data.isna().all().to_numpy()
+
+    # Random weights make the fingerprint depend on the order of the rows.
+    weights = np.random.default_rng(0).integers(1, 2 ** 63, size=n_rows, dtype=np.uint64) | np.uint64(1)
+    dominance = np.empty(len(columns))
+    fingerprints = np.empty(len(columns), dtype=np.uint64)
+    block = max(1, REDUNDANCY_BLOCK_CELLS // n_rows)
+    for start in range(0, len(columns), block):
+        keys = _column_keys(data.iloc[:, start:start + block])
+        stop = start + len(keys)
+        with np.errstate(over="ignore"):
+            # Byte-swapped keys put the varying low bits of float64 values on top
+            # before the multiplication mixes them.
+            fingerprints[start:stop] = (keys.byteswap() * weights).sum(axis=1)
+        share = (keys.min(axis=1) == keys.max(axis=1)).astype(np.float64)
+        if dominance_threshold is not None:
+            # Only columns that are not constant need the sort.
+            varying = np.flatnonzero(share < 1.0)
+            if len(varying):
+                share[varying] = _max_run_share(np.sort(keys[varying], axis=1))
+        dominance[start:stop] = share
+
+    for col, is_null, share in zip(columns, all_null, dominance):
+        if col in keep:
+            continue
+        if is_null:
+            result["all_null"].append(col)
+        elif share == 1.0:
+            result["constant"].append(col)
+        elif dominance_threshold is not None and share >= dominance_threshold:
+            result["near_constant"].append(col)
+
+    dropped = set(result["all_null"]) | set(result["constant"]) | set(result["near_constant"])
+    groups = {}
+    for col, fingerprint in zip(columns, fingerprints.tolist()):
+        if col not in dropped:
+            groups.setdefault(fingerprint, []).append(col)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        # Keep a protected column if the group has one, otherwise the first.
+        original = next((col for col in group if col in keep), group[0])
+        for col in group:
+            if col != original and col not in keep and data[col].equals(data[original]):
+                result["duplicate"][col] = original
+
+    return result
+
+
+def _column_keys(frame):
+    """
+    Map columns to a matrix of 64-bit keys with one row per column.
+
+    Equal values get equal keys: numeric columns use the bit pattern of their
+    float64 values (with -0.0 and NaN normalized), other columns a row hash.
+    """
+    keys = np.empty((frame.shape[1], len(frame)), dtype=np.uint64)
+    numeric = np.array([pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype)
+                        for dtype in frame.dtypes], dtype=bool)
+    if numeric.all() and frame.dtypes.nunique() == 1:
+        # Single-dtype block: cast straight into the key buffer.
+        values = keys.view(np.float64)
+        np.copyto(values, frame.to_numpy().T, casting="unsafe")
+        if frame.dtypes.iloc[0].kind == "f":
+            values += 0.0
+            values[np.isnan(values)] = np.nan
+        return keys
+    if numeric.any():
+        values = np.add(frame.loc[:, numeric].to_numpy(dtype=np.float64).T, 0.0)
+        values[np.isnan(values)] = np.nan
+        keys[numeric] = values.view(np.uint64)
+    for i in np.flatnonzero(~numeric):
+        keys[i] = pd.util.hash_pandas_object(frame.iloc[:, i], index=False).to_numpy()
+    return keys
+
+
+def _max_run_share(sorted_keys):
+    """
+    Return the share of the longest run of equal keys in each row.
+
+    Parameters
+        sorted_keys : np.ndarray
+            Key matrix with one row per column, sorted along axis 1.
+
+    Returns
+        np.ndarray
+            Share of rows taken by the most frequent value of each column.
+    """
+    n_cols, n_rows = sorted_keys.shape
+    flat = sorted_keys.ravel()
+    boundary = np.empty(flat.shape, dtype=bool)
+    boundary[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=boundary[1:])
+    boundary[::n_rows] = True
+    starts = np.flatnonzero(boundary)
+    lengths = np.diff(np.append(starts, flat.size))
+    first_run = np.searchsorted(starts, np.arange(n_cols) * n_rows)
+    return np.maximum.reduceat(lengths, first_run) / n_rows
+
+
+def infer_types(data):
+    """
+    Infer ydata_profiling-style variable types for every column.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to inspect.
+
+    Returns
+        dict
+            Mapping of column name to one of "Numeric", "Categorical", "Boolean",
+            "DateTime", "Text" or "Unsupported".
+    """
+    return {col: _infer_type(data[col]) for col in data.columns}
+
+
+def _infer_type(series):
+    """
+    Infer the variable type of a single column.
+
+    Parameters
+        series : pd.Series
+            Column to inspect.
+
+    Returns
+        str
+            The inferred variable type.
+    """
+    values = series.dropna()
+    if pd.api.types.is_bool_dtype(series):
+        return "Boolean"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "DateTime"
+    n_distinct = values.nunique()
+    if pd.api.types.is_numeric_dtype(series):
+        if n_distinct == 2 and set(values.unique()) <= {0, 1}:
+            return "Boolean"
+        if n_distinct <= LOW_CATEGORICAL_THRESHOLD:
+            return "Categorical"
+        return "Numeric"
+    if not (
+        pd.api.types.is_object_dtype(series)
+        or pd.api.types.is_string_dtype(series)
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    ):
+        return "Unsupported"
+
+    uniques = pd.Series(values.unique()).astype(str).str.strip().str.lower()
+    if n_distinct <= 2 and len(uniques) and uniques.isin(BOOLEAN_VALUES).all():
+        return "Boolean"
+    if n_distinct <= CATEGORICAL_CARDINALITY_THRESHOLD or (
+        len(values) and n_distinct / len(values) < CATEGORICAL_DISTINCT_RATIO
+    ):
+        return "Categorical"
+    sample = values.astype(str).head(1000)
+    parsed = pd.to_datetime(sample, errors="coerce")
+    if parsed.notna().mean() > 0.9:
+        return "DateTime"
+    return "Text"
+
+
+def _numeric_statistics(numeric):
+    """
+    Compute the numeric statistics of all numeric columns at once.
+
+    Parameters
+        numeric : pd.DataFrame
+            Numeric columns of the dataset.
+
+    Returns
+        dict
+            Mapping of column name to its statistics.
+    """
+    quantiles = numeric.quantile([0.25, 0.5, 0.75])
+    median = quantiles.loc[0.5]
+    columns = {
+        "mean": numeric.mean(),
+        "std": numeric.std(),
+        "variance": numeric.var(),
+        "min": numeric.min(),
+        "max": numeric.max(),
+        "kurtosis": numeric.kurt(),
+        "skewness": numeric.skew(),
+        "mad": (numeric - median).abs().median(),
+        "Q1": quantiles.loc[0.25],
+        "Q3": quantiles.loc[0.75],
+    }
+    columns["range"] = columns["max"] - columns["min"]
+    columns["iqr"] = columns["Q3"] - columns["Q1"]
+    stats = pd.DataFrame(columns)
+    return {
+        col: {key: _to_native(value) for key, value in row.items()}
+        for col, row in stats.iterrows()
+    }
+
+
+def association_matrix(data, types):
+    """
+    Compute the "auto" association matrix used by ydata_profiling.
+
+    Numeric pairs use Spearman correlation; pairs involving a categorical or
+    boolean column use Cramér's V, with numeric columns discretized into
+    quantile bins.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to analyse.
+        types : dict
+            Variable types from infer_types.
+
+    Returns
+        list
+            One dict per column (in column order) mapping every column to its
+            association value.
+    """
+    columns = [col for col in data.columns if types[col] in CORRELATION_TYPES]
+    if not columns:
+        return []
+    numeric_cols = [col for col in columns if types[col] == "Numeric"]
+    matrix = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+
+    if len(numeric_cols) > 1:
+        spearman = data[numeric_cols].rank().corr()
+        matrix.loc[numeric_cols, numeric_cols] = spearman.to_numpy()
+
+    codes = {col: encode_levels(data[col], types[col]) for col in columns}
+    for i, col_a in enumerate(columns):
+        for col_b in columns[i + 1:]:
+            if types[col_a] == "Numeric" and types[col_b] == "Numeric":
+                continue
+            value = cramers_v(*codes[col_a], *codes[col_b])
+            matrix.loc[col_a, col_b] = matrix.loc[col_b, col_a] = value
+
+    matrix = matrix.fillna(0.0)
+    return [
+        {col: float(value) for col, value in row.items()}
+        for _, row in matrix.iterrows()
+    ]
+
+
+def target_associations(data, target, filtered_data, method="spearman", columns=None):
+    """
+    Compute the association of every column with the target in O(n·p).
+
+    Numeric pairs use the absolute Pearson or Spearman correlation, numeric
+    versus categorical pairs use the correlation ratio and categorical pairs
+    use Cramér's V, so only the single target row of the "auto" matrix is
+    computed.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to analyse.
+        target : str
+            Name of the target column.
+        filtered_data : dict
+            Filtered EDA statistics providing the variable type of each column.
+        method : str, optional
+            Correlation for numeric pairs ('pearson' or 'spearman'),
+            by default "spearman".
+        columns : list, optional
+            Columns to score, by default every column of data.
+
+    Returns
+        dict
+            Mapping of column name to association strength in [0, 1], sorted in
+            descending order with the target itself first.
+    """
+    if columns is None:
+        columns = list(data.columns)
+    else:
+        columns = [col for col in data.columns if col in set(columns)]
+    types = {
+        col: filtered_data[col]["type"] if col in filtered_data else _infer_type(data[col])
+        for col in set(columns) | {target}
+    }
+    columns = [
+        col for col in columns
+        if col != target and types[col] in CORRELATION_TYPES
+    ]
+    numeric_cols = [col for col in columns if types[col] == "Numeric"]
+    categorical_cols = [col for col in columns if types[col] != "Numeric"]
+    associations = {}
+
+    if types[target] == "Numeric":
+        y = data[target].astype(float)
+        if numeric_cols:
+            numeric = data[numeric_cols]
+            if method == "spearman":
+                numeric, y = numeric.rank(), y.rank()
+            associations.update(numeric.corrwith(y).abs().to_dict())
+        for col in categorical_cols:
+            associations[col] = correlation_ratio(*encode_levels(data[col], types[col]), y.to_numpy())
+    else:
+        target_codes = encode_levels(data[target], types[target])
+        for col in numeric_cols:
+            associations[col] = correlation_ratio(*target_codes, data[col].to_numpy(dtype=float))
+        for col in categorical_cols:
+            associations[col] = cramers_v(*target_codes, *encode_levels(data[col], types[col]))
+
+    associations = {col: _to_native(value) or 0.0 for col, value in associations.items()}
+    ranked = sorted(associations.items(), key=lambda x: x[1], reverse=True)
+    return {target: 1.0, **dict(ranked)}
+
+
+def correlation_ratio(codes, n_levels, values):
+    """
+    Compute the correlation ratio (eta) between a categorical and a numeric column.
+
+    Parameters
+        codes : np.ndarray
+            Level codes of the categorical column (-1 for missing).
+        n_levels : int
+            Number of levels of the categorical column.
+        values : np.ndarray
+            Values of the numeric column.
+
+    Returns
+        float
+            Correlation ratio in [0, 1].
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    if not valid.any() or n_levels < 2:
+        return 0.0
+    codes, values = codes[valid], values[valid]
+    counts = np.bincount(codes, minlength=n_levels)
+    sums = np.bincount(codes, weights=values, minlength=n_levels)
+    mean = values.mean()
+    total = ((values - mean) ** 2).sum()
+    if total == 0:
+        return 0.0
+    present = counts > 0
+    between = (counts[present] * (sums[present] / counts[present] - mean) ** 2).sum()
+    return float(np.sqrt(between / total))
+
+
+def encode_levels(series, col_type, bins=CORRELATION_BINS):
+    """
+    Encode a column as integer levels for contingency tables.
+
+    Parameters
+        series : pd.Series
+            Column to encode.
+        col_type : str
+            Variable type of the column.
+        bins : int, optional
+            Number of quantile bins for numeric columns, by default CORRELATION_BINS.
+
+    Returns
+        tuple
+            A tuple containing:
+                - codes (np.ndarray): Level index per row, -1 for missing values.
+                - n_levels (int): Number of levels.
+    """
+    if col_type == "Numeric":
+        binned = pd.qcut(series, q=bins, duplicates="drop")
+        codes = binned.cat.codes.to_numpy()
+        return codes, len(binned.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes, len(uniques)
+
+
+def cramers_v(codes_a, n_a, codes_b, n_b):
+    """
+    Compute Cramér's V between two integer-encoded columns.
+
+    Columns with more than CATEGORICAL_CARDINALITY_THRESHOLD levels keep their
+    most frequent levels and pool the rest into one, so the contingency table
+    stays small.
+
+    Parameters
+        codes_a : np.ndarray
+            Level codes of the first column (-1 for missing).
+        n_a : int
+            Number of levels of the first column.
+        codes_b : np.ndarray
+            Level codes of the second column (-1 for missing).
+        n_b : int
+            Number of levels of the second column.
+
+    Returns
+        float
+            Cramér's V in [0, 1].
+    """
+    valid = (codes_a >= 0) & (codes_b >= 0)
+    n = int(valid.sum())
+    if n == 0 or n_a < 2 or n_b < 2:
+        return 0.0
+    codes_a, n_a = _cap_levels(codes_a, n_a, CATEGORICAL_CARDINALITY_THRESHOLD)
+    codes_b, n_b = _cap_levels(codes_b, n_b, CATEGORICAL_CARDINALITY_THRESHOLD)
+    table = np.bincount(
+        codes_a[valid].astype(np.int64) * n_b + codes_b[valid], minlength=n_a * n_b
+    ).reshape(n_a, n_b)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    if min(table.shape) < 2:
+        return 0.0
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / n / (min(table.shape) - 1)))
+
+
+def _cap_levels(codes, n_levels, max_levels):
+    """
+    Keep the max_levels - 1 most frequent levels and pool the others into one.
+
+    Parameters
+        codes : np.ndarray
+            Level codes (-1 for missing).
+        n_levels : int
+            Number of levels.
+        max_levels : int
+            Maximum number of levels returned.
+
+    Returns
+        tuple
+            A tuple containing:
+                - codes (np.ndarray): Remapped level codes, -1 for missing values.
+                - n_levels (int): Number of levels.
+    """
+    if n_levels <= max_levels:
+        return codes, n_levels
+    counts = np.bincount(codes[codes >= 0], minlength=n_levels)
+    mapping = np.full(n_levels, max_levels - 1, dtype=np.int64)
+    mapping[np.argsort(-counts, kind="stable")[:max_levels - 1]] = np.arange(max_levels - 1)
+    return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1), max_levels
+
+
+def _to_native(value):
+    """
+    Convert a NumPy/pandas scalar to a JSON-friendly Python value.
+
+    Parameters
+        value : any
+            Scalar to convert.
+
+    Returns
+        float, int or None
+            Native Python value, with NaN converted to None.
+    """
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os.path as osp
+import pickle
+from dataclasses import dataclass, field, fields
+from utils.logger_config import logger
+from config.update_config import convert_numpy_types
+from config.config_store import config_lock, write_json
+from config.artifact_store import (
+    ARTIFACT_DIR,
+    SIDECAR_FIELDS,
+    is_artifact,
+    load_artifact,
+    save_artifact,
+)
+
+
+@dataclass
+class RunContext:
+    """
+    Typed in-memory model configuration shared by the pipeline stages.
+
+    The stages read and update this object instead of loading and rewriting
+    model_config.json every time; the file is only written by flush(). It
+    supports the dict-style access (config["key"], config.get) used by the
+    stages, and keys that are not declared as fields are kept in extra so no
+    information from existing configuration files is lost.
+    The large tables in SIDECAR_FIELDS are written to sidecar files next to
+    the configuration on flush() and only referenced (path and checksum) from
+    the JSON; they are loaded lazily the first time a stage reads them.
+    A digest of every dict or list value is taken when a stage first reads it,
+    so flush() also writes values edited in place
+    (config["model_result"]["x"] = ...), but not values that were only read.
+    """
+
+    data_path: str = None
+    save_path: str = None
+    content_hash: str = None
+    columnar_path: str = None
+    features: list = field(default_factory=list)
+    eda_engine: str = None
+    eda_error_bounds: dict = field(default_factory=dict)
+    eda_sampling: dict = None
+    filtered_data: dict = field(default_factory=dict)
+    correlations: dict = None
+    target_correlations: dict = field(default_factory=dict)
+    correlations_result: dict = None
+    final_features: list = None
+    categorical_features: list = field(default_factory=list)
+    dropped_columns: dict = field(default_factory=dict)
+    target_feature: str = None
+    controllable_feature: list = field(default_factory=list)
+    necessary_feature: list = field(default_factory=list)
+    limited_feature: int = None
+    task: str = None
+    model: dict = field(default_factory=dict)
+    model_path: str = None
+    model_result: dict = field(default_factory=dict)
+    top_models: dict = field(default_factory=dict)
+    feature_importance: dict = field(default_factory=dict)
+    optimization: dict = None
+    extra: dict = field(default_factory=dict)
+    path: str = field(default=None, repr=False)
+    dirty: bool = field(default=False, repr=False)
+    changed: set = field(default_factory=set, repr=False)
+    artifacts: dict = field(default_factory=dict, repr=False)
+    snapshots: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a context from an existing model_config.json file.
+
+        Parameters
+            path : str
+                Path to the model configuration file.
+
+        Returns
+            RunContext
+                The loaded context.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        context = cls.from_dict(data)
+        context.path = path
+        logger.info(f"Loaded configuration from: {path}")
+        return context
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a context from a configuration dictionary.
+
+        Parameters
+            data : dict
+                Configuration values; unknown keys are kept in extra.
+
+        Returns
+            RunContext
+                The created context.
+        """
+        context = cls()
+        for key, value in data.items():
+            context[key] = value
+        context.dirty = False
+        context.changed.clear()
+        return context
+
+    def __getitem__(self, key):
+        if key not in _FIELD_NAMES:
+            value = self.extra[key]
+        else:
+            value = getattr(self, key)
+            if is_artifact(value):
+                # Lazily load the sidecar file; keep the reference while unchanged.
+                self.artifacts[key] = value
+                value = load_artifact(value)
+                setattr(self, key, value)
+        if isinstance(value, (dict, list)) and key not in self.changed and key not in self.snapshots:
+            # The caller may edit the value in place; flush() compares digests.
+            self.snapshots[key] = _digest(value)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_NAMES:
+            setattr(self, key, value)
+            self.artifacts.pop(key, None)
+        else:
+            self.extra[key] = value
+        self.snapshots.pop(key, None)
+        self.dirty = True
+        self.changed.add(key)
+
+    def __contains__(self, key):
+        return key in _FIELD_NAMES or key in self.extra
+
+    def get(self, key, default=None):
+        """
+        Return the value of a key, or default if it is unset.
+        """
+        if key in _FIELD_NAMES:
+            value = self[key]
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def update(self, config_updates):
+        """
+        Merge updates into the context like OmegaConf.merge.
+
+        Nested dictionaries are merged recursively; other values are replaced.
+
+        Parameters
+            config_updates : dict
+                Configuration updates.
+
+        Returns
+            RunContext
+                The updated context.
+        """
+        for key, value in convert_numpy_types(config_updates).items():
+            current = self.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                value = _merge(current, value)
+            self[key] = value
+        return self
+
+    def artifact_ref(self, key):
+        """
+        Return the sidecar file reference of a large table, writing it if needed.
+
+        Parameters
+            key : str
+                One of SIDECAR_FIELDS.
+
+        Returns
+            dict or None
+                The artifact reference, or None if the table is empty.
+        """
+        ref = self._sidecar(key, getattr(self, key))
+        return ref if is_artifact(ref) else None
+
+    def to_dict(self):
+        """
+        Return the configuration as a plain dictionary.
+
+        Tables that have not been loaded yet are returned as artifact references.
+        """
+        data = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name in _FIELD_NAMES
+        }
+        data.update(self.extra)
+        return data
+
+    def flush(self, path=None, force=False):
+        """
+        Write the context to disk if it has changed since the last flush.
+
+        The file is replaced atomically under the configuration file lock.
+        When the file the context was loaded from is rewritten, only the keys
+        set or edited in place since the last flush are written over its
+        current content, so values stored meanwhile by other writers (e.g. a
+        background job) are kept.
+
+        Parameters
+            path : str, optional
+                Destination path, by default the path the context was loaded from.
+            force : bool, optional
+                Write even if nothing changed, by default False.
+
+        Returns
+            str
+                The path of the configuration file.
+        """
+        path = path or self.path
+        for key, digest in self.snapshots.items():
+            if _digest(self[key]) != digest:
+                self.artifacts.pop(key, None)
+                self.dirty = True
+                self.changed.add(key)
+        if not (self.dirty or force) and path == self.path:
+            return path
+        data = self.to_dict()
+        for key in SIDECAR_FIELDS:
+            data[key] = self._sidecar(key, data[key], path)
+        with config_lock(path):
+            if path == self.path and osp.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    current = json.load(f)
+                current.update({key: data[key] for key in self.changed})
+                data = current
+            write_json(path, convert_numpy_types(data))
+        logger.info(f"Updated configuration saved to: {path}")
+        self.path = path
+        self.dirty = False
+        for key in self.changed | set(self.snapshots):
+            value = self[key] if key in self else None
+            self.snapshots.pop(key, None)
+            if isinstance(value, (dict, list)):
+                self.snapshots[key] = _digest(value)
+        self.changed.clear()
+        return path
+
+    def _sidecar(self, key, value, path=None):
+        if not value or is_artifact(value):
+            return value
+        if key not in self.artifacts:
+            save_path = self.save_path or osp.dirname(path or self.path)
+            artifact_dir = osp.join(save_path, ARTIFACT_DIR)
+            self.artifacts[key] = save_artifact(artifact_dir, key, convert_numpy_types(value))
+        return self.artifacts[key]
+
+
+_FIELD_NAMES = frozenset(
+    f.name for f in fields(RunContext)
+    if f.name not in ("extra", "path", "dirty", "changed", "artifacts", "snapshots")
+)
+
+
+def resolve_context(config):
+    """
+    Return a RunContext for a configuration path or an existing context.
+
+    Stages accept either form; when they are given a path they own the loaded
+    context and must flush it themselves.
+
+    Parameters
+        config : str or RunContext
+            Path to the model configuration file or an in-memory context.
+
+    Returns
+        tuple
+            A tuple containing:
+                - context (RunContext): The run context.
+                - owned (bool): True if the context was loaded from a path.
+    """
+    if isinstance(config, RunContext):
+        return config, False
+    return RunContext.load(config), True
+
+
+def _digest(value):
+    try:
+        payload = json.dumps(value, default=str).encode()
+    except TypeError:
+        # Keys JSON cannot encode (e.g. tuples).
+        payload = pickle.dumps(value)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _merge(base, updates):
+    merged = dict(base)
+    for key, value in updates.items():
+        if isinstance(merged.get(key), dict) and isinstance(value, dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
@@ -0,0 +1,490 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from data.columnar import iter_chunks
+from config.eda_profiler import (
+    LOW_CATEGORICAL_THRESHOLD,
+    CATEGORICAL_CARDINALITY_THRESHOLD,
+    CATEGORICAL_DISTINCT_RATIO,
+    _infer_type,
+    _to_native,
+)
+
+CHUNK_SIZE = 200000
+DIGEST_COMPRESSION = 1000
+HLL_PRECISION = 14
+EXACT_DISTINCT_LIMIT = 1024
+
+# Documented error bounds of the sketch-based statistics.
+#   - n_distinct / p_distinct: exact up to EXACT_DISTINCT_LIMIT distinct values,
+#     then HyperLogLog with a relative standard error of 1.04 / sqrt(2 ** p).
+#   - Q1 / Q3 / iqr / mad: a t-digest centroid spans at most pi / compression
+#     of the rank around the median (less towards the tails), so the
+#     interpolated rank error is below half of that.
+#   - count, p_missing, min, max, range: exact.
+#   - mean, std, variance, skewness, kurtosis: exact up to floating point error.
+ERROR_BOUNDS = {
+    "n_distinct": float(1.04 / np.sqrt(2 ** HLL_PRECISION)),
+    "quantile_rank": float(np.pi / (2 * DIGEST_COMPRESSION)),
+}
+
+
+class MomentSketch:
+    """
+    Mergeable accumulator of count, min, max and the first four central moments.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """
+        Add a batch of non-missing values.
+
+        Parameters
+            values : np.ndarray
+                Float values without NaN.
+        """
+        if len(values) == 0:
+            return
+        other = MomentSketch()
+        other.n = len(values)
+        other.mean = float(values.mean())
+        delta = values - other.mean
+        other.m2 = float((delta ** 2).sum())
+        other.m3 = float((delta ** 3).sum())
+        other.m4 = float((delta ** 4).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other):
+        """
+        Merge another moment sketch into this one (Pébay's pairwise formulas).
+
+        Parameters
+            other : MomentSketch
+                Sketch to merge.
+        """
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+        m3 = (
+            self.m3 + other.m3
+            + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+            + 3 * delta_n * (n_a * other.m2 - n_b * self.m2)
+        )
+        m4 = (
+            self.m4 + other.m4
+            + delta * delta_n ** 3 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2)
+            + 6 * delta_n ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2)
+            + 4 * delta_n * (n_a * other.m3 - n_b * self.m3)
+        )
+        self.n = n
+        self.mean += delta_n * n_b
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else None
+
+    @property
+    def skewness(self):
+        """Sample skewness with the same bias correction as pandas.Series.skew."""
+        n = self.n
+        if n < 3 or self.m2 == 0:
+            return None
+        g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return float(np.sqrt(n * (n - 1)) / (n - 2) * g1)
+
+    @property
+    def kurtosis(self):
+        """Excess kurtosis with the same bias correction as pandas.Series.kurt."""
+        n = self.n
+        if n < 4 or self.m2 == 0:
+            return None
+        g2 = n * self.m4 / self.m2 ** 2 - 3
+        return float((n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * g2 + 6))
+
+
+class QuantileSketch:
+    """
+    Merging t-digest with the arcsine scale function.
+
+    Centroids are re-clustered with a vectorized pass after every update or
+    merge, so the digest keeps at most compression / 2 + 1 centroids. See
+    ERROR_BOUNDS for the resulting rank error.
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        """
+        Add a batch of non-missing values.
+
+        Parameters
+            values : np.ndarray
+                Float values without NaN.
+        """
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        """
+        Merge another digest into this one.
+
+        Parameters
+            other : QuantileSketch
+                Digest to merge.
+        """
+        if len(other.means):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1) + self.compression / 4
+        bins = np.floor(k).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q, lower=None, upper=None):
+        """
+        Estimate the q-quantile.
+
+        Parameters
+            q : float
+                Quantile in [0, 1].
+            lower : float, optional
+                Exact minimum used to anchor the interpolation.
+            upper : float, optional
+                Exact maximum used to anchor the interpolation.
+
+        Returns
+            float or None
+                Estimated quantile, or None for an empty digest.
+        """
+        if not len(self.means):
+            return None
+        positions, means = self._anchors(lower, upper)
+        return float(np.interp(q * self.weights.sum(), positions, means))
+
+    def cdf(self, x, lower=None, upper=None):
+        """
+        Estimate the fraction of values less than or equal to x.
+
+        Parameters
+            x : float or np.ndarray
+                Value(s) to evaluate.
+
+        Returns
+            float or np.ndarray
+                Estimated cumulative distribution.
+        """
+        positions, means = self._anchors(lower, upper)
+        return np.interp(x, means, positions) / self.weights.sum()
+
+    def _anchors(self, lower, upper):
+        cumulative = np.cumsum(self.weights)
+        positions = cumulative - self.weights / 2
+        means = self.means
+        if lower is not None:
+            positions, means = np.r_[0.0, positions], np.r_[lower, means]
+        if upper is not None:
+            positions, means = np.r_[positions, cumulative[-1]], np.r_[means, upper]
+        return positions, means
+
+
+class DistinctSketch:
+    """
+    Distinct counter that is exact for small cardinalities and switches to
+    HyperLogLog (2 ** precision registers) once EXACT_DISTINCT_LIMIT is exceeded.
+    """
+
+    def __init__(self, precision=HLL_PRECISION, exact_limit=EXACT_DISTINCT_LIMIT):
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.exact = np.empty(0, dtype=np.uint64)
+        self.registers = None
+
+    def update(self, hashes):
+        """
+        Add a batch of 64-bit value hashes.
+
+        Parameters
+            hashes : np.ndarray
+                uint64 hashes of the non-missing values.
+        """
+        if self.registers is None:
+            self.exact = np.union1d(self.exact, hashes)
+            if len(self.exact) > self.exact_limit:
+                self.registers = np.zeros(2 ** self.precision, dtype=np.uint8)
+                self._add_registers(self.exact)
+                self.exact = None
+        else:
+            self._add_registers(hashes)
+
+    def merge(self, other):
+        """
+        Merge another distinct sketch into this one.
+
+        Parameters
+            other : DistinctSketch
+                Sketch to merge.
+        """
+        if other.registers is None:
+            self.update(other.exact)
+            return
+        if self.registers is None:
+            exact = self.exact
+            self.registers = other.registers.copy()
+            self.exact = None
+            self._add_registers(exact)
+        else:
+            np.maximum(self.registers, other.registers, out=self.registers)
+
+    def _add_registers(self, hashes):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        bit_length = np.where(
+            high > 0,
+            32 + np.floor(np.log2(np.maximum(high, 1))) + 1,
+            np.where(low > 0, np.floor(np.log2(np.maximum(low, 1))) + 1, 0),
+        )
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self):
+        """
+        Return the (estimated) number of distinct values.
+
+        Returns
+            int
+                Exact count below the exact limit, HyperLogLog estimate above it.
+        """
+        if self.registers is None:
+            return int(len(self.exact))
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+def estimate_distinct(series, numeric=False):
+    """
+    Count the distinct non-missing values of a column with a DistinctSketch.
+
+    Parameters
+        series : pd.Series
+            Column to count.
+        numeric : bool, optional
+            Whether the values are hashed as numbers, by default False.
+
+    Returns
+        int
+            Exact count up to EXACT_DISTINCT_LIMIT, HyperLogLog estimate above it.
+    """
+    values = pd.to_numeric(series, errors="coerce") if numeric else series
+    present = values.dropna()
+    array = present.to_numpy(dtype=np.float64) if numeric else present.astype(str).to_numpy(dtype=object)
+    sketch = DistinctSketch()
+    sketch.update(np.unique(pd.util.hash_array(array)))
+    return sketch.estimate()
+
+
+class ColumnSketch:
+    """
+    Mergeable summary of one column: missing count plus moment, quantile and
+    distinct sketches.
+    """
+
+    def __init__(self, numeric):
+        self.numeric = numeric
+        self.count = 0
+        self.missing = 0
+        self.distinct = DistinctSketch()
+        self.moments = MomentSketch() if numeric else None
+        self.digest = QuantileSketch() if numeric else None
+
+    def update(self, series):
+        values = pd.to_numeric(series, errors="coerce") if self.numeric else series
+        present = values.dropna()
+        self.count += len(series)
+        self.missing += len(series) - len(present)
+        if self.numeric:
+            array = present.to_numpy(dtype=np.float64)
+            self.moments.update(array)
+            self.digest.update(array)
+        else:
+            array = present.astype(str).to_numpy(dtype=object)
+        self.distinct.update(np.unique(pd.util.hash_array(array)))
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.digest.merge(other.digest)
+
+
+def profile_csv(data_path, chunk_size=CHUNK_SIZE, n_jobs=None, columnar_path=None):
+    """
+    Profile a CSV file chunk by chunk with mergeable sketches.
+
+    The file is never loaded as a whole: chunks are summarized in parallel
+    worker processes and the per-column sketches are merged at the end. The
+    chunks are read from the columnar copy of the CSV if there is one. See
+    ERROR_BOUNDS for the accuracy of the approximate fields.
+
+    Parameters
+        data_path : str
+            Path to the CSV file.
+        chunk_size : int, optional
+            Number of rows per chunk, by default CHUNK_SIZE.
+        n_jobs : int, optional
+            Number of worker processes, by default the number of CPUs.
+        columnar_path : str, optional
+            Path to a columnar copy of the CSV to read instead, by default None.
+
+    Returns
+        dict
+            filtered_data with the same fields as profile_data.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    reader = iter_chunks(data_path, chunk_size, columnar_path)
+    first = next(reader)
+    provisional = {col: _infer_type(first[col]) for col in first.columns}
+    numeric = [col for col, col_type in provisional.items()
+               if col_type in ["Numeric", "Categorical", "Boolean"]
+               and pd.api.types.is_numeric_dtype(first[col])]
+
+    sketches = _sketch_chunk(first, numeric)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = set()
+        for chunk in reader:
+            if len(pending) >= 2 * n_jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _merge_results(sketches, done)
+            pending.add(executor.submit(_sketch_chunk, chunk, numeric))
+        _merge_results(sketches, wait(pending).done)
+
+    return {
+        col: _summarize(sketch, _final_type(provisional[col], sketch))
+        for col, sketch in sketches.items()
+    }
+
+
+def _sketch_chunk(chunk, numeric):
+    sketches = {col: ColumnSketch(col in numeric) for col in chunk.columns}
+    for col, sketch in sketches.items():
+        sketch.update(chunk[col])
+    return sketches
+
+
+def _merge_results(sketches, futures):
+    for future in futures:
+        for col, sketch in future.result().items():
+            sketches[col].merge(sketch)
+
+
+def _final_type(provisional, sketch):
+    """
+    Refine the type inferred on the first chunk with the global distinct count.
+    """
+    n_distinct = sketch.distinct.estimate()
+    non_missing = sketch.count - sketch.missing
+    if provisional in ["Numeric", "Categorical"] and sketch.numeric:
+        return "Categorical" if n_distinct <= LOW_CATEGORICAL_THRESHOLD else "Numeric"
+    if provisional in ["Categorical", "Text"]:
+        if n_distinct <= CATEGORICAL_CARDINALITY_THRESHOLD or (
+            non_missing and n_distinct / non_missing < CATEGORICAL_DISTINCT_RATIO
+        ):
+            return "Categorical"
+        return "Text"
+    return provisional
+
+
+def _summarize(sketch, col_type):
+    """
+    Turn a merged column sketch into the filtered_data fields.
+    """
+    non_missing = sketch.count - sketch.missing
+    n_distinct = sketch.distinct.estimate()
+    info = {
+        "type": col_type,
+        "p_missing": sketch.missing / sketch.count if sketch.count else 0.0,
+        "n_distinct": n_distinct,
+        "p_distinct": min(n_distinct / non_missing, 1.0) if non_missing else 0.0,
+    }
+    stats = {}
+    if col_type == "Numeric" and sketch.moments.n:
+        moments, digest = sketch.moments, sketch.digest
+        bounds = {"lower": moments.min, "upper": moments.max}
+        q1 = digest.quantile(0.25, **bounds)
+        median = digest.quantile(0.5, **bounds)
+        q3 = digest.quantile(0.75, **bounds)
+        variance = moments.variance
+        stats = {
+            "mean": moments.mean,
+            "std": np.sqrt(variance) if variance is not None else None,
+            "variance": variance,
+            "min": moments.min,
+            "max": moments.max,
+            "kurtosis": moments.kurtosis,
+            "skewness": moments.skewness,
+            "mad": _digest_mad(digest, median, bounds),
+            "range": moments.max - moments.min,
+            "iqr": q3 - q1,
+            "Q1": q1,
+            "Q3": q3,
+        }
+    for key in ["mean", "std", "variance", "min", "max", "kurtosis", "skewness",
+                "mad", "range", "iqr", "Q1", "Q3"]:
+        info[key] = _to_native(stats.get(key))
+    return info
+
+
+def _digest_mad(digest, median, bounds, iterations=60):
+    """
+    Estimate the median absolute deviation from a digest by bisection on its CDF.
+    """
+    low, high = 0.0, max(bounds["upper"] - median, median - bounds["lower"])
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        covered = digest.cdf(median + mid, **bounds) - digest.cdf(median - mid, **bounds)
+        if covered < 0.5:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
@@ -1,5 +1,5 @@
-import json
 from utils.logger_config import logger
+from config.config_store import config_lock, write_json
 from omegaconf import OmegaConf
 import numpy as np
 
@@ -30,34 +30,40 @@ def update_config(config_path, config_updates):
     """
     Load a configuration file, merge it with updates, and write the updated configuration.
 
+    The read-merge-write runs under an exclusive file lock and the file is
+    replaced atomically, so concurrent writers do not lose updates and readers
+    never see a half-written file. If an in-memory RunContext is given instead
+    of a path, the updates are merged into it and nothing is written until the
+    context is flushed.
+
     Parameters
-        config_path : str
-            Path to the configuration file.
+        config_path : str or RunContext
+            Path to the configuration file, or the run context.
         config_updates : dict
             Dictionary of configuration updates.
 
     Returns
-        str
-            The path to the updated configuration file.
+        str or RunContext
+            The path to the updated configuration file, or the updated context.
     """
-    try:
-        config = OmegaConf.load(config_path)
-        logger.info(f"Loaded configuration from: {config_path}")
-    except FileNotFoundError:
-        logger.warning("Configuration file not found.")
-    
-    config_updates = convert_numpy_types(config_updates)
-    updated_config = OmegaConf.merge(config, OmegaConf.create(config_updates))
-    
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(
-            OmegaConf.to_container(updated_config, resolve=True),
-            f,
-            indent=4,
-            ensure_ascii=False
-        )
+    from config.run_context import RunContext
+
+    if isinstance(config_path, RunContext):
+        return config_path.update(config_updates)
+
+    with config_lock(config_path):
+        try:
+            config = OmegaConf.load(config_path)
+            logger.info(f"Loaded configuration from: {config_path}")
+        except FileNotFoundError:
+            logger.warning("Configuration file not found.")
+
+        config_updates = convert_numpy_types(config_updates)
+        updated_config = OmegaConf.merge(config, OmegaConf.create(config_updates))
+
+        write_json(config_path, OmegaConf.to_container(updated_config, resolve=True))
         logger.info(f"Updated configuration saved to: {config_path}")
-    
+
     return config_path
 
 
@@ -0,0 +1,182 @@
+import os.path as osp
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from config.config_store import atomic_path
+from utils.logger_config import logger
+
+PARQUET_SUFFIX = ".parquet"
+ARROW_SUFFIX = ".arrow"
+PARQUET_COMPRESSION = "zstd"
+ROW_GROUP_SIZE = 200000
+# Arrow type of each column kind found while scanning the CSV in chunks.
+COLUMN_KIND_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "bool": pa.bool_(),
+    "string": pa.string(),
+}
+
+
+def convert_to_parquet(data_path, parquet_path=None, compression=PARQUET_COMPRESSION):
+    """
+    Write a typed, compressed Parquet copy of a CSV file without loading it.
+
+    The CSV is streamed twice in chunks of ROW_GROUP_SIZE rows, so memory does
+    not grow with the file. The first pass infers the type of every column
+    from all chunks, as pd.read_csv would from the whole file: integers, with
+    floats if any chunk has a fraction or a missing value, booleans, and
+    strings for every other column (mixed columns are kept as their text).
+    The second pass writes each chunk as a row group with that schema.
+
+    Parameters
+        data_path : str
+            Path to the CSV data file.
+        parquet_path : str, optional
+            Destination path, by default <name>.parquet next to the CSV.
+        compression : str, optional
+            Parquet compression codec, by default PARQUET_COMPRESSION.
+
+    Returns
+        dict
+            Dictionary with the keys:
+                - columnar_path (str): Path to the Parquet file.
+                - schema (dict): Arrow type name of each column.
+                - n_rows (int): Number of rows.
+    """
+    parquet_path = parquet_path or osp.splitext(data_path)[0] + PARQUET_SUFFIX
+    kinds = {col: set() for col in pd.read_csv(data_path, nrows=0).columns}
+    for chunk in pd.read_csv(data_path, chunksize=ROW_GROUP_SIZE):
+        for col in chunk.columns:
+            kinds[col].add(_column_kind(chunk[col]))
+    column_types = {col: _unify_kinds(found) for col, found in kinds.items()}
+    schema = pa.schema([(col, COLUMN_KIND_TYPES[kind]) for col, kind in column_types.items()])
+    text_columns = {col: str for col, kind in column_types.items() if kind == "string"}
+
+    n_rows = 0
+    with atomic_path(parquet_path) as tmp_path:
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            for chunk in pd.read_csv(data_path, chunksize=ROW_GROUP_SIZE, dtype=text_columns):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                n_rows += len(chunk)
+    logger.info(f"Columnar copy saved: {parquet_path} ({n_rows} rows)")
+
+    return {
+        "columnar_path": parquet_path,
+        "schema": {field.name: str(field.type) for field in schema},
+        "n_rows": n_rows,
+    }
+
+
+def _column_kind(series):
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int"
+    if pd.api.types.is_float_dtype(series):
+        return "empty" if series.isna().all() else "float"
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    return {"boolean": "bool", "empty": "empty"}.get(inferred, "string")
+
+
+def _unify_kinds(kinds):
+    empty = "empty" in kinds
+    kinds = set(kinds) - {"empty"}
+    if not kinds or kinds <= {"int", "float"}:
+        # Missing values turn integer columns into floats, as in pd.read_csv.
+        return "int" if kinds == {"int"} and not empty else "float"
+    if kinds == {"bool"}:
+        return "bool"
+    return "string"
+
+
+def find_columnar(data_path):
+    """
+    Return the up-to-date columnar copy of a CSV file, if there is one.
+
+    A <name>.parquet or <name>.arrow file next to the CSV is used when it is
+    not older than the CSV; Parquet is preferred.
+
+    Parameters
+        data_path : str
+            Path to the CSV data file.
+
+    Returns
+        str or None
+            Path to the columnar copy, or None.
+    """
+    stem = osp.splitext(data_path)[0]
+    for suffix in [PARQUET_SUFFIX, ARROW_SUFFIX]:
+        path = stem + suffix
+        if osp.exists(path) and osp.getmtime(path) >= osp.getmtime(data_path):
+            return path
+    return None
+
+
+def read_columnar(path, columns=None):
+    """
+    Read a Parquet or Arrow IPC file with memory mapping.
+
+    Parameters
+        path : str
+            Path to the columnar file.
+        columns : list of str, optional
+            Columns to read, by default all columns.
+
+    Returns
+        pd.DataFrame
+            The requested columns.
+    """
+    if path.endswith(PARQUET_SUFFIX):
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def columnar_names(path):
+    """
+    Return the column names of a Parquet or Arrow IPC file from its schema.
+
+    Parameters
+        path : str
+            Path to the columnar file.
+
+    Returns
+        list of str
+            Column names.
+    """
+    if path.endswith(PARQUET_SUFFIX):
+        return pq.read_schema(path, memory_map=True).names
+    return feather.read_table(path, columns=[], memory_map=True).schema.names
+
+
+def iter_chunks(data_path, chunk_size, columnar_path=None):
+    """
+    Iterate over a dataset in chunks of rows.
+
+    Batches are read from the columnar copy if there is one, and with
+    pd.read_csv(chunksize=...) otherwise.
+
+    Parameters
+        data_path : str
+            Path to the CSV data file.
+        chunk_size : int
+            Number of rows per chunk.
+        columnar_path : str, optional
+            Path to the columnar copy, by default the one found by find_columnar.
+
+    Yields
+        pd.DataFrame
+            The next chunk.
+    """
+    columnar_path = columnar_path or find_columnar(data_path)
+    if columnar_path is None:
+        yield from pd.read_csv(data_path, chunksize=chunk_size)
+    elif columnar_path.endswith(PARQUET_SUFFIX):
+        for batch in pq.ParquetFile(columnar_path, memory_map=True).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        for batch in feather.read_table(columnar_path, memory_map=True).to_batches(max_chunksize=chunk_size):
+            yield batch.to_pandas()
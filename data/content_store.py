@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import os.path as osp
+import shutil
+import pandas as pd
+from config.artifact_store import file_sha256
+from config.config_store import write_json
+from utils.logger_config import logger
+
+CONTENT_DIR = "shared"
+# One content root for the node, independent of where each copy was uploaded.
+CONTENT_ROOT = os.environ.get("AUTOML_CONTENT_ROOT", osp.join(osp.expanduser("~"), ".automl", CONTENT_DIR))
+MANIFEST_FILENAME = "manifest.json"
+COLUMNAR_FILENAME = "data.parquet"
+
+
+def content_hash(data_path):
+    """
+    Compute the content fingerprint of a dataset file.
+
+    The file is hashed in fixed-size blocks, so large exports are never read
+    into memory at once.
+
+    Parameters
+        data_path : str
+            Path to the data file.
+
+    Returns
+        str
+            SHA-256 hex digest of the file content.
+    """
+    return file_sha256(data_path)
+
+
+def content_dir(digest, root=None):
+    """
+    Return the content-addressed directory shared by all copies of a dataset.
+
+    The directory depends on the content hash only, so copies of the same
+    data uploaded to different directories share one EDA and model cache.
+
+    Parameters
+        digest : str
+            Content hash of the dataset.
+        root : str, optional
+            Content root, by default CONTENT_ROOT (environment variable
+            AUTOML_CONTENT_ROOT).
+
+    Returns
+        str
+            Path to <root>/<digest>.
+    """
+    shared_dir = osp.join(root or CONTENT_ROOT, digest)
+    os.makedirs(shared_dir, exist_ok=True)
+    return shared_dir
+
+
+def cache_key(settings):
+    """
+    Return a short, stable key for a dictionary of settings.
+
+    Parameters
+        settings : dict
+            JSON-serializable settings that determine a cached result.
+
+    Returns
+        str
+            The first 16 hex digits of the SHA-256 of the canonical JSON.
+    """
+    canonical = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def frame_digest(data):
+    """
+    Return a fingerprint of the content of a DataFrame.
+
+    Parameters
+        data : pd.DataFrame
+            DataFrame to fingerprint.
+
+    Returns
+        str
+            SHA-256 hex digest of the column names, dtypes and row hashes.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in data.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(directory):
+    """
+    Load the manifest of a cached result.
+
+    Parameters
+        directory : str
+            Directory of the cached result.
+
+    Returns
+        dict or None
+            The manifest, or None if the result has not been cached yet.
+    """
+    path = osp.join(directory, MANIFEST_FILENAME)
+    if not osp.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(directory, manifest):
+    """
+    Atomically write the manifest of a cached result.
+
+    The manifest is written last, so a result is only visible to other runs
+    once all of its files exist.
+
+    Parameters
+        directory : str
+            Directory of the cached result.
+        manifest : dict
+            JSON-serializable description of the result.
+
+    Returns
+        str
+            Path to the manifest file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return write_json(osp.join(directory, MANIFEST_FILENAME), manifest)
+
+
+def is_shared(path, root=None):
+    """
+    Check whether a path lies in the shared content directories.
+
+    Parameters
+        path : str
+            Path to a file or directory.
+        root : str, optional
+            Content root, by default CONTENT_ROOT.
+
+    Returns
+        bool
+            True if path is inside the content root.
+    """
+    root = osp.abspath(root or CONTENT_ROOT)
+    return osp.commonpath([root, osp.abspath(path)]) == root
+
+
+def release_content(digest, root=None):
+    """
+    Remove the shared directory of a dataset content.
+
+    Call this only once the last dataset with this content hash is deleted.
+
+    Parameters
+        digest : str
+            Content hash of the dataset.
+        root : str, optional
+            Content root, by default CONTENT_ROOT.
+    """
+    shared_dir = osp.join(root or CONTENT_ROOT, digest)
+    if osp.isdir(shared_dir):
+        shutil.rmtree(shared_dir, ignore_errors=True)
+        logger.info(f"Removed shared artifacts: {shared_dir}")
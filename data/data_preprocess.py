@@ -1,14 +1,32 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from omegaconf import OmegaConf
 from sklearn.impute import SimpleImputer, KNNImputer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import (
     RobustScaler,
     LabelEncoder,
     StandardScaler,
     PowerTransformer,
 )
+from scipy import sparse
+from config.run_context import resolve_context
+
+TEXT_HASH_FEATURES = 2 ** 12
+TEXT_SVD_COMPONENTS = 8
+TEXT_SVD_FIT_ROWS = 50000
+TEXT_CHUNK_SIZE = 10000
+
+CATEGORICAL_MAX_LEVELS = 50
+CATEGORICAL_RARE_MIN_COUNT = 10
+TARGET_ENCODING_FOLDS = 5
+TARGET_ENCODING_SMOOTHING = 20
+RARE_LEVEL = "__rare__"
+MISSING_LEVEL = "__missing__"
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
 
 
 class DataPreprocessor:
@@ -17,17 +35,24 @@ class DataPreprocessor:
     missing value imputation, and feature-specific processing.
     """
 
-    def __init__(self, df, config):
+    def __init__(self, df, config, train_index=None):
         """
         Parameters
             df : pd.DataFrame
                 The original dataset.
-            config : dict or OmegaConf
+            config : dict, OmegaConf or RunContext
                 Configuration containing preprocessing information, such as filtered_data.
+            train_index : pd.Index, optional
+                Index of the rows the model will be trained on (see split_index).
+                Target encodings are fit on these rows only; without it,
+                high-cardinality columns are frequency encoded.
         """
         self.data = df
         self.data_info = config["filtered_data"]
+        self.target = config.get("target_feature")
+        self.controllable = list(config.get("controllable_feature") or [])
         self.decoders = {}
+        self.train_index = train_index
 
     def remove_outliers(self, col):
         """
@@ -50,13 +75,19 @@ class DataPreprocessor:
                 self.decoders[col] = {"outliers": robust_scaler}
         return self.data
 
-    def handle_missing_values(self, col, strategy="mean"):
+    def handle_missing_values(self, cols, strategy="mean"):
         """
-        Handle missing values in the specified column.
+        Handle missing values in the specified columns in a single pass.
+
+        Rows with missing values in columns whose missing ratio is below 0.03
+        are removed with one combined mask, and the remaining columns are
+        imputed block-wise: numeric columns together, non-numeric columns per
+        dtype so each keeps its dtype. Columns without any value, which the
+        imputers would drop, are filled with 0 (numeric) or MISSING_LEVEL.
 
         Parameters
-            col : str
-                Name of the column.
+            cols : list
+                Names of the columns to process.
             strategy : str, optional
                 Strategy for imputation ('mean', 'median', 'mode', 'knn'),
                 by default "mean".
@@ -65,23 +96,50 @@ class DataPreprocessor:
             pd.DataFrame
                 DataFrame with missing values handled.
         """
-        feature = self.data_info[col]
-        missing_ratio = feature["p_missing"]
-        if missing_ratio < 0.03:
-            self.data = self.data.dropna(subset=[col])
-        else:
-            if strategy in ["mean", "median", "mode"]:
-                if feature["type"] == "Numeric":
-                    imputer = SimpleImputer(strategy=strategy)
-                else:
-                    imputer = SimpleImputer(strategy="most_frequent")
-            elif strategy == "knn":
+        if strategy not in ["mean", "median", "mode", "knn"]:
+            raise ValueError(
+                "Invalid strategy. Choose from 'mean', 'median', 'mode', 'knn'."
+            )
+
+        drop_cols, numeric_cols, other_cols = [], [], []
+        for col in cols:
+            feature = self.data_info[col]
+            if feature["p_missing"] < 0.03:
+                drop_cols.append(col)
+            elif feature["type"] == "Numeric":
+                numeric_cols.append(col)
+            else:
+                other_cols.append(col)
+
+        if drop_cols:
+            mask = self.data[drop_cols].notna().all(axis=1)
+            if not mask.all():
+                self.data = self.data.take(np.flatnonzero(mask.to_numpy()))
+
+        empty = self.data[numeric_cols + other_cols].isna().all()
+        for col in empty.index[empty]:
+            self.data[col] = 0.0 if col in numeric_cols else MISSING_LEVEL
+        numeric_cols = [col for col in numeric_cols if not empty[col]]
+        other_cols = [col for col in other_cols if not empty[col]]
+
+        if numeric_cols:
+            if strategy == "knn":
                 imputer = KNNImputer(n_neighbors=3)
+            elif strategy == "mode":
+                imputer = SimpleImputer(strategy="most_frequent")
             else:
-                raise ValueError(
-                    "Invalid strategy. Choose from 'mean', 'median', 'mode', 'knn'."
-                )
-            self.data[[col]] = imputer.fit_transform(self.data[[col]])
+                imputer = SimpleImputer(strategy=strategy)
+            self.data[numeric_cols] = imputer.fit_transform(self.data[numeric_cols])
+        dtype_groups = {}
+        for col in other_cols:
+            dtype_groups.setdefault(self.data[col].dtype, []).append(col)
+        for dtype, group in dtype_groups.items():
+            imputer = SimpleImputer(strategy="most_frequent")
+            filled = pd.DataFrame(
+                imputer.fit_transform(self.data[group]), index=self.data.index, columns=group
+            )
+            # Object columns may hold bools or ints once their NaNs are filled.
+            self.data[group] = filled.infer_objects() if dtype == object else filled.astype(dtype)
         return self.data
 
     def process_column(self, col):
@@ -110,18 +168,152 @@ class DataPreprocessor:
 
         return self.data
 
-    def _categorical_features(self, col):
+    def _categorical_features(self, col, max_levels=CATEGORICAL_MAX_LEVELS, encoding="target"):
         """
-        Process a categorical column using label encoding.
+        Process a categorical column based on its cardinality.
+
+        Columns with at most max_levels distinct values (as reported by
+        n_distinct in filtered_data), the target and controllable features keep
+        compact label codes. Columns above the threshold have rare levels
+        bucketed and are replaced by frequency or out-of-fold target encoding.
+        Target encoding is fit on the rows of the later training split only
+        (see train_index), so test labels never leak into the features.
 
         Parameters
             col : str
                 Name of the column.
+            max_levels : int, optional
+                Maximum number of distinct values for label encoding,
+                by default CATEGORICAL_MAX_LEVELS.
+            encoding : str, optional
+                Encoding for high-cardinality columns ('target' or 'frequency').
+                Target encoding falls back to frequency encoding when the
+                target is missing or multiclass, or the training split is
+                unknown, by default "target".
+        """
+        n_distinct = self.data_info[col].get("n_distinct") or 0
+        if n_distinct <= max_levels or col == self.target or col in self.controllable:
+            if not np.issubdtype(self.data[col].dtype, np.integer):
+                le = LabelEncoder()
+                codes = le.fit_transform(self.data[col])
+                self.data[col] = codes.astype(np.min_scalar_type(max(len(le.classes_) - 1, 0)))
+                self.decoders[col] = {"encoder": le}
+            return
+
+        counts = self.data[col].value_counts()
+        rare = counts.index[counts < CATEGORICAL_RARE_MIN_COUNT]
+        levels = self.data[col].where(~self.data[col].isin(rare), RARE_LEVEL)
+
+        y = self._encoding_target() if encoding == "target" and self.train_index is not None else None
+        if y is None:
+            mapping = levels.value_counts(normalize=True)
+            self.data[col] = levels.map(mapping).astype(np.float32)
+            default = 0.0
+            method = "frequency"
+        else:
+            train_mask = self.data.index.isin(self.train_index)
+            encoded, mapping, default = self._target_encode(levels, y, train_mask)
+            self.data[col] = encoded
+            method = "target"
+
+        self.decoders[col] = {
+            "high_cardinality": {
+                "method": method,
+                "mapping": mapping,
+                "rare": set(rare),
+                "default": default,
+            }
+        }
+
+    def _encoding_target(self):
+        """
+        Return the target as a numeric series usable for target encoding.
+
+        Returns
+            pd.Series or None
+                Numeric target, binary targets as 0/1 codes, or None when the
+                target is missing or multiclass.
+        """
+        if not self.target or self.target not in self.data.columns:
+            return None
+        y = self.data[self.target]
+        if y.nunique() == 2:
+            return pd.Series(pd.factorize(y, sort=True)[0], index=y.index, dtype=np.float64)
+        if self.data_info.get(self.target, {}).get("type") == "Numeric":
+            return y.astype(np.float64)
+        return None
+
+    @staticmethod
+    def _target_encode(
+        levels, y, train_mask=None, n_folds=TARGET_ENCODING_FOLDS, smoothing=TARGET_ENCODING_SMOOTHING
+    ):
         """
-        if not np.issubdtype(self.data[col].dtype, np.integer):
-            le = LabelEncoder()
-            self.data[col] = le.fit_transform(self.data[col])
-            self.decoders[col] = {"encoder": le}
+        Compute smoothed out-of-fold target encoding with vectorized groupby.
+
+        Training rows get out-of-fold encodings computed from the other
+        training folds; the other rows get the mapping fit on all training rows.
+
+        Parameters
+            levels : pd.Series
+                Category values (rare levels already bucketed).
+            y : pd.Series
+                Numeric target aligned with levels.
+            train_mask : np.ndarray, optional
+                Boolean mask of the training rows, by default all rows.
+            n_folds : int, optional
+                Number of folds, by default TARGET_ENCODING_FOLDS.
+            smoothing : float, optional
+                Weight of the global mean in the smoothed estimate,
+                by default TARGET_ENCODING_SMOOTHING.
+
+        Returns
+            tuple
+                A tuple containing:
+                - encoded (np.ndarray): Out-of-fold encoding for each row.
+                - mapping (pd.Series): Training-data encoding per level for inference.
+                - prior (float): Training target mean used for unseen levels.
+        """
+        if train_mask is None:
+            train_mask = np.ones(len(levels), dtype=bool)
+        frame = pd.DataFrame({"level": levels.to_numpy(), "y": y.to_numpy()})
+        train = frame[train_mask]
+        prior = float(train["y"].mean())
+        folds = np.random.RandomState(42).permutation(len(train)) % n_folds
+
+        def smoothed(stats):
+            return (stats["sum"] + prior * smoothing) / (stats["count"] + smoothing)
+
+        encoded = np.full(len(frame), prior, dtype=np.float32)
+        train_encoded = np.full(len(train), prior, dtype=np.float32)
+        for fold in range(n_folds):
+            in_fold = folds == fold
+            stats = train[~in_fold].groupby("level")["y"].agg(["sum", "count"])
+            train_encoded[in_fold] = train.loc[in_fold, "level"].map(smoothed(stats)).fillna(prior)
+        encoded[train_mask] = train_encoded
+
+        mapping = smoothed(train.groupby("level")["y"].agg(["sum", "count"]))
+        encoded[~train_mask] = frame.loc[~train_mask, "level"].map(mapping).fillna(prior)
+        return encoded, mapping, prior
+
+    def transform_categorical(self, df):
+        """
+        Reapply the fitted high-cardinality encodings to new data.
+
+        Parameters
+            df : pd.DataFrame
+                DataFrame containing the original categorical columns.
+
+        Returns
+            pd.DataFrame
+                DataFrame with high-cardinality columns encoded.
+        """
+        for col, encoder_info in self.decoders.items():
+            if "high_cardinality" not in encoder_info or col not in df.columns:
+                continue
+            info = encoder_info["high_cardinality"]
+            levels = df[col].where(~df[col].isin(info["rare"]), RARE_LEVEL)
+            df[col] = levels.map(info["mapping"]).fillna(info["default"]).astype(np.float32)
+        return df
 
     def _numeric_features(self, col):
         """
@@ -169,15 +361,111 @@ class DataPreprocessor:
         self.data.drop(columns=[col], inplace=True)
         self.decoders[col] = {"columns": [f"{col}_year", f"{col}_month", f"{col}_day"]}
 
-    def _text_features(self, col):
+    def _text_features(
+        self,
+        col,
+        n_features=TEXT_HASH_FEATURES,
+        n_components=TEXT_SVD_COMPONENTS,
+        chunk_size=TEXT_CHUNK_SIZE,
+    ):
         """
-        Drop text columns from the dataset.
+        Replace a text column with hashed bag-of-words features.
+
+        Text is hashed chunk by chunk into a fixed-width sparse matrix, so
+        memory does not depend on the vocabulary size. When n_components is
+        set, a truncated SVD fitted on a bounded row sample reduces the
+        hashed features to a small dense block.
 
         Parameters
             col : str
                 Name of the text column.
+            n_features : int, optional
+                Width of the hashing space, by default TEXT_HASH_FEATURES.
+            n_components : int or None, optional
+                Number of SVD components; None keeps the sparse hashed
+                columns, by default TEXT_SVD_COMPONENTS.
+            chunk_size : int, optional
+                Number of rows hashed at once, by default TEXT_CHUNK_SIZE.
         """
-        self.data.drop(columns=[col], inplace=True)
+        vectorizer = HashingVectorizer(
+            n_features=n_features,
+            alternate_sign=False,
+            dtype=np.float32,
+        )
+        text = self.data[col].fillna("").astype(str)
+
+        svd = None
+        n_components = min(n_components or 0, len(text) - 1, n_features - 1)
+        if n_components > 0:
+            fit_rows = text
+            if len(text) > TEXT_SVD_FIT_ROWS:
+                fit_rows = text.sample(n=TEXT_SVD_FIT_ROWS, random_state=42)
+            svd = TruncatedSVD(n_components=n_components, random_state=42)
+            svd.fit(vectorizer.transform(fit_rows))
+            columns = [f"{col}_svd_{i}" for i in range(n_components)]
+        else:
+            columns = [f"{col}_hash_{i}" for i in range(n_features)]
+
+        text_info = {"vectorizer": vectorizer, "svd": svd, "columns": columns}
+        block = self._text_block(text, text_info, chunk_size)
+        self.data = pd.concat([self.data.drop(columns=[col]), block], axis=1)
+        self.decoders[col] = {"text": text_info}
+
+    @staticmethod
+    def _text_block(text, text_info, chunk_size=TEXT_CHUNK_SIZE):
+        """
+        Hash a text series chunk by chunk with a fitted text transform.
+
+        Parameters
+            text : pd.Series
+                Text values to transform.
+            text_info : dict
+                Fitted transform stored in decoders[col]["text"].
+            chunk_size : int, optional
+                Number of rows hashed at once, by default TEXT_CHUNK_SIZE.
+
+        Returns
+            pd.DataFrame
+                Dense SVD block, or sparse hashed columns when no SVD is used.
+        """
+        vectorizer = text_info["vectorizer"]
+        svd = text_info["svd"]
+        text = text.fillna("").astype(str)
+        chunks = []
+        for start in range(0, len(text), chunk_size):
+            hashed = vectorizer.transform(text.iloc[start:start + chunk_size])
+            chunks.append(svd.transform(hashed) if svd is not None else hashed)
+
+        if svd is not None:
+            values = np.vstack(chunks) if chunks else np.empty((0, len(text_info["columns"])))
+            return pd.DataFrame(values, index=text.index, columns=text_info["columns"])
+        matrix = sparse.vstack(chunks).tocsr() if chunks else sparse.csr_matrix(
+            (0, len(text_info["columns"])), dtype=np.float32
+        )
+        return pd.DataFrame.sparse.from_spmatrix(
+            matrix, index=text.index, columns=text_info["columns"]
+        )
+
+    def transform_text(self, df, chunk_size=TEXT_CHUNK_SIZE):
+        """
+        Reapply the fitted text transforms to new data, e.g. at inference.
+
+        Parameters
+            df : pd.DataFrame
+                DataFrame containing the original text columns.
+            chunk_size : int, optional
+                Number of rows hashed at once, by default TEXT_CHUNK_SIZE.
+
+        Returns
+            pd.DataFrame
+                DataFrame with each text column replaced by its features.
+        """
+        for col, encoder_info in self.decoders.items():
+            if "text" not in encoder_info or col not in df.columns:
+                continue
+            block = self._text_block(df[col], encoder_info["text"], chunk_size)
+            df = pd.concat([df.drop(columns=[col]), block], axis=1)
+        return df
 
     def process_features(self, strategy="mean"):
         """
@@ -192,8 +480,8 @@ class DataPreprocessor:
                 The preprocessed DataFrame.
         """
         original_columns = list(self.data.columns)
+        self.handle_missing_values(original_columns, strategy)
         for col in original_columns:
-            self.handle_missing_values(col, strategy)
             self.remove_outliers(col)
             self.process_column(col)
         return self.data
@@ -223,6 +511,8 @@ class DataPreprocessor:
             encoder_info = self.decoders[col]
 
             if feature_type in ["Categorical", "Boolean"]:
+                if "encoder" not in encoder_info:
+                    continue
                 encoder = encoder_info["encoder"]
                 df[col] = encoder.inverse_transform(df[col])
             elif feature_type == "Numeric":
@@ -254,15 +544,18 @@ class DataPreprocessor:
         return df
 
 
-def preprocessing(data, config_path):
+def preprocessing(data, config_path, train_index=None):
     """
     Preprocess the dataset based on configuration settings.
 
     Parameters
         data : pd.DataFrame
             The input dataset.
-        config_path : str
-            Path to the configuration file.
+        config_path : str or RunContext
+            Path to the configuration file, or the in-memory run context.
+        train_index : pd.Index, optional
+            Training rows from split_index; pass the same index to split_data
+            so the target encodings only see the training rows.
 
     Returns
         tuple
@@ -270,7 +563,61 @@ def preprocessing(data, config_path):
             - preprocessed_df (pd.DataFrame): The preprocessed DataFrame.
             - preprocessor (DataPreprocessor): The preprocessor object.
     """
-    config = OmegaConf.load(config_path)
-    preprocessor = DataPreprocessor(data, config)
+    config, _ = resolve_context(config_path)
+    preprocessor = DataPreprocessor(data, config, train_index)
     preprocessed_df = preprocessor.process_features()
-    return preprocessed_df, preprocessor
\ No newline at end of file
+    return preprocessed_df, preprocessor
+
+
+def split_index(data, task, target):
+    """
+    Split the row index of the dataset into train and test rows.
+
+    Call this once before preprocessing and pass the train index to both
+    preprocessing and split_data. Rows that preprocessing removes later
+    simply drop out of either side. Rows without a target value are not
+    stratified and go to the training side.
+
+    Parameters
+        data : pd.DataFrame
+            Dataset to split; its index must be kept through preprocessing.
+        task : str
+            Type of prediction task; classification splits are stratified.
+        target : str
+            Name of the target variable.
+
+    Returns
+        tuple
+            A tuple containing the train and test row indices.
+    """
+    labelled = data[target].notna()
+    stratify = None if task == "regression" else data.loc[labelled, target]
+    train_index, test_index = train_test_split(
+        data.index[labelled], test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=stratify
+    )
+    return train_index.append(data.index[~labelled]), test_index
+
+
+def split_data(data, task, target, train_index=None):
+    """
+    Split the preprocessed data into train and test sets.
+
+    Parameters
+        data : pd.DataFrame
+            Preprocessed dataset.
+        task : str
+            Type of prediction task; classification splits are stratified.
+        target : str
+            Name of the target variable.
+        train_index : pd.Index, optional
+            Training rows from split_index, as passed to preprocessing; by
+            default split_index is applied to the preprocessed data.
+
+    Returns
+        tuple
+            A tuple containing the train and test DataFrames.
+    """
+    if train_index is None:
+        train_index, _ = split_index(data, task, target)
+    train_mask = data.index.isin(train_index)
+    return data[train_mask], data[~train_mask]
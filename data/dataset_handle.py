@@ -0,0 +1,181 @@
+import os.path as osp
+import weakref
+import pandas as pd
+import pyarrow.feather as feather
+from config.config_store import atomic_path
+from data.columnar import ARROW_SUFFIX, columnar_names, find_columnar, read_columnar
+from utils.logger_config import logger
+
+# Open handles by absolute path; a handle is dropped once no stage holds it.
+_HANDLES = weakref.WeakValueDictionary()
+
+
+class DatasetHandle:
+    """
+    Dataset shared by the pipeline stages that parses the source file at most once.
+
+    The full DataFrame is loaded on first access of data. Until then, stages
+    that only need a few columns read them with usecols (or from the columnar
+    copy) instead of parsing the whole CSV. If a Parquet or Arrow IPC copy of
+    the dataset exists, all reads are served from it with memory mapping.
+    """
+
+    def __init__(self, path, data=None, columnar_path=None):
+        """
+        Parameters
+            path : str
+                Path to the CSV data file.
+            data : pd.DataFrame, optional
+                Already loaded dataset, by default None.
+            columnar_path : str, optional
+                Path to a Parquet or Arrow IPC copy of the dataset. By default
+                an up-to-date <name>.parquet or <name>.arrow file next to the
+                CSV is used.
+        """
+        self.path = path
+        self.columnar_path = columnar_path or (find_columnar(path) if path else None)
+        self._data = data
+
+    @property
+    def data(self):
+        """
+        Return the full dataset, loading it on first access.
+        """
+        if self._data is None:
+            if self.columnar_path:
+                self._data = read_columnar(self.columnar_path)
+            else:
+                self._data = pd.read_csv(self.path)
+            logger.info(f"Data loaded from {self.columnar_path or self.path}")
+        return self._data
+
+    @property
+    def loaded(self):
+        """
+        Whether the full dataset is in memory.
+        """
+        return self._data is not None
+
+    @property
+    def column_names(self):
+        """
+        Return the column names without loading the data.
+        """
+        if self._data is not None:
+            return list(self._data.columns)
+        if self.columnar_path:
+            return columnar_names(self.columnar_path)
+        return list(pd.read_csv(self.path, nrows=0).columns)
+
+    def columns(self, names):
+        """
+        Return a subset of columns, reading only those columns if the data is not loaded.
+
+        Parameters
+            names : list of str
+                Column names; names that are not in the dataset are ignored.
+
+        Returns
+            pd.DataFrame
+                The selected columns.
+        """
+        available = set(self.column_names)
+        names = [name for name in names if name in available]
+        if self._data is not None:
+            return self._data[names]
+        if self.columnar_path:
+            return read_columnar(self.columnar_path, names)
+        return pd.read_csv(self.path, usecols=names)[names]
+
+    def column(self, name):
+        """
+        Return a single column as a Series.
+
+        Parameters
+            name : str
+                Column name.
+
+        Returns
+            pd.Series
+                The column.
+        """
+        if name not in self.column_names:
+            raise KeyError(f"Column '{name}' is not present in the dataset.")
+        return self.columns([name])[name]
+
+    def cache(self, columnar_path=None):
+        """
+        Write an Arrow IPC copy of the dataset that later reads memory-map.
+
+        Parameters
+            columnar_path : str, optional
+                Destination path, by default <name>.arrow next to the CSV.
+
+        Returns
+            str
+                Path to the columnar copy.
+        """
+        columnar_path = columnar_path or osp.splitext(self.path)[0] + ARROW_SUFFIX
+        with atomic_path(columnar_path) as tmp_path:
+            feather.write_feather(self.data, tmp_path, compression="uncompressed")
+        self.columnar_path = columnar_path
+        logger.info(f"Columnar copy saved: {columnar_path}")
+        return columnar_path
+
+
+def open_dataset(path, data=None, columnar_path=None):
+    """
+    Return the shared handle of a dataset, creating it if needed.
+
+    Stages that open the same path while a handle is alive get the same
+    handle, so the file is parsed only once per pipeline run.
+
+    Parameters
+        path : str
+            Path to the CSV data file.
+        data : pd.DataFrame, optional
+            Already loaded dataset to attach to the handle, by default None.
+        columnar_path : str, optional
+            Path to a columnar copy stored elsewhere (e.g. shared by content
+            hash), by default None.
+
+    Returns
+        DatasetHandle
+            The dataset handle.
+    """
+    key = osp.abspath(path)
+    handle = _HANDLES.get(key)
+    if handle is None:
+        handle = DatasetHandle(path, data, columnar_path)
+        _HANDLES[key] = handle
+    else:
+        if data is not None and not handle.loaded:
+            handle._data = data
+        if columnar_path and not handle.columnar_path:
+            handle.columnar_path = columnar_path
+    return handle
+
+
+def as_dataset(dataset, path=None, columnar_path=None):
+    """
+    Wrap a DataFrame, a path or a handle into a DatasetHandle.
+
+    Parameters
+        dataset : DatasetHandle, pd.DataFrame, str or None
+            Dataset in any of the forms accepted by the pipeline.
+        path : str, optional
+            Path of the data file, used when dataset is a DataFrame or None.
+        columnar_path : str, optional
+            Path to a columnar copy of the data file, by default None.
+
+    Returns
+        DatasetHandle
+            The dataset handle.
+    """
+    if isinstance(dataset, DatasetHandle):
+        return dataset
+    if isinstance(dataset, str):
+        return open_dataset(dataset, columnar_path=columnar_path)
+    if path is None:
+        return DatasetHandle(None, dataset)
+    return open_dataset(path, dataset, columnar_path)
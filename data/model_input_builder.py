@@ -1,48 +1,75 @@
-import json
 import pandas as pd
-from omegaconf import OmegaConf
+from config.eda_profiler import target_associations
+from config.run_context import resolve_context
 from utils.logger_config import logger
 
 
-def feature_selection(config_path, feature_len=100):
+def feature_selection(config_path, feature_len=100, data=None):
     """
     Select features for model training based on configuration and correlation data.
 
+    Candidates are ranked by the target row of the association matrix. If it
+    is not stored yet in target_correlations and data is given, only that row
+    is computed with target_associations; otherwise the full "auto"
+    correlation matrix is scanned for it. Only the columns kept by the EDA
+    (features) are candidates, so redundant columns dropped there are never
+    selected.
+
     Parameters
-        config_path : str
-            Path to the configuration file.
+        config_path : str or RunContext
+            Path to the configuration file, or the in-memory run context.
         feature_len : int, optional
             Default maximum number of features if limited_feature is set to -1, by default 100.
+        data : pd.DataFrame, optional
+            The original dataset used to compute the target associations, by default None.
 
     Returns
         tuple or None
             If no correlation data is found, returns a tuple of (controllable features, other features);
             otherwise, updates the configuration file and returns None.
     """
-    config = OmegaConf.load(config_path)
+    config, owned = resolve_context(config_path)
     target_feature = config.get("target_feature")
-    controllable_feature = config.get("controllable_feature", [])
-    environment_feature = config.get("necessary_feature", [])
+    controllable_feature = list(config.get("controllable_feature", []))
+    environment_feature = list(config.get("necessary_feature", []))
     limited_feature = config.get("limited_feature")
     if limited_feature == -1:
         limited_feature = feature_len
     logger.info(f"총 설명변수의 개수 : {limited_feature}")
 
-    correlations_list = config.get("correlations", {}).get("auto", [])
-    if not correlations_list:
-        logger.info("correlations -> auto 항목이 비어 있습니다.")
-        controllable_final = controllable_feature
-        other_final = list(set(environment_feature) - set(controllable_final))
-        return controllable_final, other_final
+    profiled = _profiled_columns(config)
+    target_correlations = (config.get("target_correlations") or {}).get(target_feature)
+    if target_correlations is None and data is not None:
+        target_correlations = target_associations(
+            data, target_feature, config["filtered_data"], columns=profiled
+        )
+        config["target_correlations"] = {target_feature: target_correlations}
 
     candidate_correlations = {}
-    for _, corr_dict in enumerate(correlations_list):
-        if corr_dict[target_feature] == 1.0:
-            for k, v in corr_dict.items():
-                candidate_correlations[k] = v
+    if target_correlations is not None:
+        candidate_correlations = dict(target_correlations)
+    else:
+        correlations_list = (config.get("correlations") or {}).get("auto", [])
+        if not correlations_list:
+            logger.info("correlations -> auto 항목이 비어 있습니다.")
+            controllable_final = controllable_feature
+            other_final = list(set(environment_feature) - set(controllable_final))
+            return controllable_final, other_final
+
+        for _, corr_dict in enumerate(correlations_list):
+            if corr_dict[target_feature] == 1.0:
+                for k, v in corr_dict.items():
+                    candidate_correlations[k] = v
 
     candidate_correlations = dict(
-        sorted(candidate_correlations.items(), key=lambda x: x[1], reverse=True)
+        sorted(
+            (
+                (k, v) for k, v in candidate_correlations.items()
+                if profiled is None or k in profiled or k == target_feature
+            ),
+            key=lambda x: x[1],
+            reverse=True,
+        )
     )
     config["correlations_result"] = candidate_correlations
 
@@ -62,22 +89,20 @@ def feature_selection(config_path, feature_len=100):
     config["final_features"] = final_features
     logger.info(f"final_features: {final_features}")
 
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(
-            OmegaConf.to_container(config, resolve=True),
-            f,
-            indent=4,
-            ensure_ascii=False,
-        )
+    if owned:
+        config.flush()
 
 
 def make_filtered_data(config_path, data):
     """
     Filter the dataset based on feature selections in the configuration.
 
+    Columns dropped as redundant by the EDA (not in features) are left out,
+    even if they are requested.
+
     Parameters
-    config_path : str
-        Path to the configuration file.
+    config_path : str or RunContext
+        Path to the configuration file, or the in-memory run context.
     data : pd.DataFrame
         The dataset to be filtered.
 
@@ -85,7 +110,7 @@ def make_filtered_data(config_path, data):
     pd.DataFrame
         A DataFrame containing only the selected features.
     """
-    config = OmegaConf.load(config_path)
+    config, _ = resolve_context(config_path)
     controllable = config.get("controllable_feature", [])
     necessary = config.get("necessary_feature", [])
     target = config.get("target_feature")
@@ -102,7 +127,22 @@ def make_filtered_data(config_path, data):
     if target:
         selected_features.add(target)
 
-    available_features = [col for col in selected_features if col in data.columns]
+    profiled = _profiled_columns(config)
+    redundant = {
+        col for col in selected_features
+        if profiled is not None and col not in profiled and col != target
+    }
+    if redundant:
+        logger.warning(f"EDA에서 제거된 중복/상수 컬럼은 제외합니다: {sorted(redundant)}")
+    available_features = [
+        col for col in selected_features if col in data.columns and col not in redundant
+    ]
     filtered_df = data[available_features].copy()
 
-    return filtered_df
\ No newline at end of file
+    return filtered_df
+
+
+def _profiled_columns(config):
+    # Columns kept by the EDA; None for configurations written without them.
+    features = config.get("features")
+    return set(features) if features else None
\ No newline at end of file
@@ -2,6 +2,7 @@ from datetime import datetime
 from ulid import ULID
 from dataset.domain.dataset import Dataset
 from dataset.domain.repository.dataset_repo import IDatasetRepository
+from dataset.infra.columnar_worker import submit_columnar_conversion
 
 class DatasetService:
     def __init__(
@@ -55,9 +56,17 @@ class DatasetService:
             path=path,
         )
 
-        self.dataset_repo.save(dataset)
+        created_dataset = self.dataset_repo.save(dataset)
 
-        return dataset
+        # 같은 내용의 변환 결과가 없으면 CSV를 백그라운드에서 Parquet으로 변환하고 완료 시 기록
+        if created_dataset.columnar_path is None:
+            submit_columnar_conversion(
+                created_dataset.path,
+                created_dataset.content_hash,
+                lambda columnar: self.dataset_repo.update_columnar(str(created_dataset.id), columnar),
+            )
+
+        return created_dataset
 
     def update_dataset(
         self,
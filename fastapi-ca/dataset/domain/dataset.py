@@ -8,4 +8,8 @@ class Dataset:
     flow_id: str | None
     name: str
     size: float
-    path: str
\ No newline at end of file
+    path: str
+    columnar_path: str | None = None
+    columnar_schema: dict | None = None
+    n_rows: int | None = None
+    content_hash: str | None = None
\ No newline at end of file
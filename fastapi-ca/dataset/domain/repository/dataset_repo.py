@@ -24,7 +24,11 @@ class IDatasetRepository(metaclass=ABCMeta):
         raise NotImplementedError
 
     @abstractmethod
-    def save(self, projct_id: str, flow_id: str | None, dataset: Dataset) -> Dataset:
+    def save(self, dataset: Dataset) -> Dataset:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_columnar(self, id: str, columnar: dict):
         raise NotImplementedError
 
     @abstractmethod
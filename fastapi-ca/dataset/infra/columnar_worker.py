@@ -0,0 +1,32 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from data.columnar import convert_to_parquet
+from data.content_store import COLUMNAR_FILENAME, content_dir
+
+logger = logging.getLogger("myapp")
+
+# 대용량 CSV의 Parquet 변환은 등록 요청과 분리된 워커 프로세스에서 실행
+_executor = ProcessPoolExecutor(
+    max_workers=1,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+def submit_columnar_conversion(data_path: str, digest: str | None, on_done):
+    # 같은 내용의 데이터셋이 공유하도록 내용 해시 디렉터리에 저장
+    parquet_path = os.path.join(content_dir(digest), COLUMNAR_FILENAME) if digest else None
+    future = _executor.submit(convert_to_parquet, data_path, parquet_path)
+
+    def _callback(future):
+        error = future.exception()
+        if error:
+            logger.error(f"Columnar conversion failed for {data_path}: {error}")
+            return
+        on_done(future.result())
+
+    future.add_done_callback(_callback)
+    return future
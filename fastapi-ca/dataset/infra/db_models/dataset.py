@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Float
+from sqlalchemy import String, Text, Float, Integer, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from database import Base
 
@@ -11,4 +11,8 @@ class Dataset(Base):
     flow_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
     name: Mapped[str] = mapped_column(Text, nullable=False)
     size: Mapped[float] = mapped_column(Float, nullable=False)
-    path: Mapped[str] = mapped_column(Text, nullable=False)
\ No newline at end of file
+    path: Mapped[str] = mapped_column(Text, nullable=False)
+    columnar_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    columnar_schema: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    n_rows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
\ No newline at end of file
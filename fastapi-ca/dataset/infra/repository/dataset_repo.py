@@ -4,6 +4,13 @@ from dataset.domain.dataset import Dataset as DatasetVO
 from dataset.domain.repository.dataset_repo import IDatasetRepository
 from dataset.infra.db_models.dataset import Dataset
 from utils.db_utils import row_to_dict
+import logging
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
+from data.content_store import content_hash, release_content
+
+logger = logging.getLogger("myapp")
 
 class DatasetRepository(IDatasetRepository):
     def get_datasets_by_project(
@@ -60,8 +67,30 @@ class DatasetRepository(IDatasetRepository):
 
         return DatasetVO(**row_to_dict(dataset))
 
-    def save(self, dataset_vo: DatasetVO):
+    def save(self, dataset_vo: DatasetVO) -> DatasetVO:
+        # 서버에서 내용 해시를 계산하고, 같은 내용의 데이터셋이 있으면 변환 결과를 공유
+        # (없으면 columnar_path 없이 저장하고, 변환은 DatasetService가 백그라운드에서 실행)
+        try:
+            dataset_vo.content_hash = content_hash(dataset_vo.path)
+        except Exception as error:
+            logger.error(f"Content hashing failed for {dataset_vo.path}: {error}")
+
         with SessionLocal() as db:
+            shared = None
+            if dataset_vo.content_hash:
+                shared = (
+                    db.query(Dataset)
+                    .filter(
+                        Dataset.content_hash == dataset_vo.content_hash,
+                        Dataset.columnar_path.isnot(None),
+                    )
+                    .first()
+                )
+            if shared and os.path.exists(shared.columnar_path):
+                dataset_vo.columnar_path = shared.columnar_path
+                dataset_vo.columnar_schema = shared.columnar_schema
+                dataset_vo.n_rows = shared.n_rows
+
             new_dataset = Dataset(
                 id=dataset_vo.id,
                 project_id=dataset_vo.project_id,
@@ -69,11 +98,35 @@ class DatasetRepository(IDatasetRepository):
                 name=dataset_vo.name,
                 size=dataset_vo.size,
                 path=dataset_vo.path,
+                columnar_path=dataset_vo.columnar_path,
+                columnar_schema=dataset_vo.columnar_schema,
+                n_rows=dataset_vo.n_rows,
+                content_hash=dataset_vo.content_hash,
             )
 
             db.add(new_dataset)
             db.commit()
 
+        return dataset_vo
+
+    def update_columnar(self, id: str, columnar: dict):
+        # 변환이 끝나기 전에 삭제된 데이터셋은 무시
+        with SessionLocal() as db:
+            dataset = (
+                db.query(Dataset)
+                .filter(Dataset.id == id)
+                .first()
+            )
+            if not dataset:
+                return
+
+            dataset.columnar_path = columnar["columnar_path"]
+            dataset.columnar_schema = columnar["schema"]
+            dataset.n_rows = columnar["n_rows"]
+
+            db.add(dataset)
+            db.commit()
+
     def update(self, flow_id: str | None, dataset_vo: DatasetVO) -> DatasetVO:
         with SessionLocal() as db:
             dataset = (
@@ -100,5 +153,12 @@ class DatasetRepository(IDatasetRepository):
             if not dataset:
                 raise HTTPException(status_code=422)
 
+            digest = dataset.content_hash
             db.delete(dataset)
-            db.commit()
\ No newline at end of file
+            db.commit()
+
+            # 같은 내용을 참조하는 마지막 데이터셋이 삭제될 때만 공유 결과물을 정리
+            if digest and not (
+                db.query(Dataset).filter(Dataset.content_hash == digest).first()
+            ):
+                release_content(digest)
\ No newline at end of file
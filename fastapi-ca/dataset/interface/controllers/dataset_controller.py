@@ -17,6 +17,10 @@ class DatasetResponse(BaseModel):
     name: str
     size: float
     path: str
+    columnar_path: str | None = None
+    columnar_schema: dict | None = None
+    n_rows: int | None = None
+    content_hash: str | None = None
 
 class CreateDatasetBody(BaseModel):
     project_id: str
@@ -2,6 +2,7 @@ from datetime import datetime
 from ulid import ULID
 from inform.domain.inform import Inform
 from inform.domain.repository.inform_repo import IInformRepository
+from inform.infra.eda_report import submit_eda_report
 
 class InformService:
     def __init__(
@@ -28,7 +29,25 @@ class InformService:
             user_config_path="",
         )
 
-        return self.inform_repo.save(inform)
+        created_inform = self.inform_repo.save(inform)
+        self.inform_repo.update_eda_status(created_inform.id, "running")
+        created_inform.eda_status = "running"
+
+        # HTML 리포트는 백그라운드에서 생성하고, 완료 여부를 Inform에 기록
+        submit_eda_report(
+            created_inform.user_config_path,
+            lambda success: self.inform_repo.update_eda_status(
+                created_inform.id, "ready" if success else "failed"
+            ),
+        )
+
+        return created_inform
+
+    def get_artifact(self, id: str, name: str) -> dict:
+        return self.inform_repo.find_artifact(id, name)
+
+    def get_run_report(self, id: str) -> dict:
+        return self.inform_repo.find_run_report(id)
 
     def update_inform(
         self,
@@ -6,4 +6,5 @@ class Inform:
     id: str
     dataset_id: str
     model_config_path: str
-    user_config_path: str
\ No newline at end of file
+    user_config_path: str
+    eda_status: str = "pending"
\ No newline at end of file
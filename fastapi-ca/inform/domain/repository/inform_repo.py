@@ -14,6 +14,18 @@ class IInformRepository(metaclass=ABCMeta):
     def save(self, dataset_id: str, inform: Inform) -> Inform:
         raise NotImplementedError
 
+    @abstractmethod
+    def update_eda_status(self, id: str, eda_status: str) -> Inform:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_artifact(self, id: str, name: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_run_report(self, id: str) -> dict:
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, dataset_id: str, id: str):
         raise NotImplementedError
\ No newline at end of file
@@ -9,4 +9,5 @@ class Inform(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     dataset_id: Mapped[str] = mapped_column(String(36), nullable=False)
     model_config_path: Mapped[str] = mapped_column(Text, nullable=False)
-    user_config_path: Mapped[str] = mapped_column(Text, nullable=False)
\ No newline at end of file
+    user_config_path: Mapped[str] = mapped_column(Text, nullable=False)
+    eda_status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
\ No newline at end of file
@@ -0,0 +1,28 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from process import process_eda_report
+
+logger = logging.getLogger("myapp")
+
+# 리포트 렌더링은 CPU를 많이 쓰므로 API 프로세스와 분리된 워커 프로세스에서 실행
+_executor = ProcessPoolExecutor(
+    max_workers=1,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+def submit_eda_report(user_config_path: str, on_done):
+    future = _executor.submit(process_eda_report, user_config_path)
+
+    def _callback(future):
+        error = future.exception()
+        if error:
+            logger.error(f"EDA report failed for {user_config_path}: {error}")
+        on_done(error is None)
+
+    future.add_done_callback(_callback)
+    return future
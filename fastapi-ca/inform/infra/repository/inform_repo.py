@@ -5,11 +5,15 @@ from inform.domain.repository.inform_repo import IInformRepository
 from inform.infra.db_models.inform import Inform
 from dataset.infra.db_models.dataset import Dataset
 from utils.db_utils import row_to_dict
-import pandas as pd
+import json
+import shutil
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../')))
 from process import process_1, process_2, process_3
+from data.dataset_handle import open_dataset
+from config.artifact_store import ARTIFACT_MEDIA_TYPES, SIDECAR_FIELDS, is_artifact
+from config.config_store import RUN_REPORT_FILENAME, is_run_workspace
 
 class InformRepository(IInformRepository):
     def find_by_id(self, id: str) -> InformVO:
@@ -46,13 +50,21 @@ class InformRepository(IInformRepository):
             if not dataset:
                 raise HTTPException(status_code=404, detail="Dataset not found")
 
-            model_config_path, user_config_path, original_df = process_1(dataset.path)
+            # Inform마다 별도의 작업 디렉터리(runs/<inform id>)에 설정 파일을 생성
+            model_config_path, user_config_path, _ = process_1(
+                dataset.path,
+                run_id=inform_vo.id,
+                cache_columnar=True,
+                content_hash=dataset.content_hash,
+                columnar_path=dataset.columnar_path,
+            )
 
             new_inform = Inform(
                 id=inform_vo.id,
                 dataset_id=inform_vo.dataset_id,
                 model_config_path=model_config_path,
                 user_config_path=user_config_path,
+                eda_status="pending",
             )
 
             db.add(new_inform)
@@ -79,10 +91,32 @@ class InformRepository(IInformRepository):
             if not dataset:
                 raise HTTPException(status_code=404, detail="Dataset not found")
 
-            model_config_path = inform.model_config_path
-            original_df = pd.read_csv(dataset.path)
+            # process_1의 핸들은 요청이 끝나면 해제되므로 요청마다 새 핸들을 연다.
+            # 컬럼형 사본(columnar_path)이 있으면 CSV 대신 그것을 읽고, 전체 데이터는 처음 사용할 때 한 번만 로드
+            model_config_path, user_config_path, model, preprocessed_df, preprocessor = process_2(
+                inform.model_config_path,
+                inform.user_config_path,
+                open_dataset(dataset.path, columnar_path=dataset.columnar_path),
+                config_updates=config_updates,
+            )
 
-            model_config_path, model, test_df, preprocessed_df, preprocessor = process_2(config_updates, model_config_path, original_df)
+            db.add(inform)
+            db.commit()
+            db.refresh(inform)
+
+            return InformVO(**row_to_dict(inform))
+
+    def update_eda_status(self, id: str, eda_status: str) -> InformVO:
+        with SessionLocal() as db:
+            inform = (
+                db.query(Inform)
+                .filter(Inform.id == id)
+                .first()
+            )
+            if not inform:
+                raise HTTPException(status_code=404, detail="Inform not found")
+
+            inform.eda_status = eda_status
 
             db.add(inform)
             db.commit()
@@ -90,6 +124,34 @@ class InformRepository(IInformRepository):
 
             return InformVO(**row_to_dict(inform))
 
+    def find_artifact(self, id: str, name: str) -> dict:
+        inform = self.find_by_id(id)
+        if name not in SIDECAR_FIELDS:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+
+        # user_config에 없는 테이블(filtered_data, correlations)은 model_config에서 찾음
+        ref = None
+        for config_path in (inform.user_config_path, inform.model_config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                ref = json.load(f).get(name)
+            if is_artifact(ref):
+                break
+        if not is_artifact(ref) or not os.path.exists(ref["path"]):
+            raise HTTPException(status_code=404, detail="Artifact not found")
+
+        return {**ref, "media_type": ARTIFACT_MEDIA_TYPES[ref["artifact"]]}
+
+    def find_run_report(self, id: str) -> dict:
+        inform = self.find_by_id(id)
+
+        # 파이프라인 단계별 실행 시간/메모리 기록은 작업 디렉터리의 run_report.json에 저장됨
+        report_path = os.path.join(os.path.dirname(inform.model_config_path), RUN_REPORT_FILENAME)
+        if not os.path.exists(report_path):
+            raise HTTPException(status_code=404, detail="Run report not found")
+
+        with open(report_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
     def delete(self, dataset_id: str, id: str):
         with SessionLocal() as db:
             inform = db.query(Inform).filter(
@@ -99,5 +161,9 @@ class InformRepository(IInformRepository):
             if not inform:
                 raise HTTPException(status_code=404, detail="Inform not found")
 
+            workspace = os.path.dirname(inform.model_config_path)
             db.delete(inform)
-            db.commit()
\ No newline at end of file
+            db.commit()
+
+        if workspace and is_run_workspace(workspace):
+            shutil.rmtree(workspace, ignore_errors=True)
\ No newline at end of file
@@ -1,8 +1,10 @@
+import os
 from dataclasses import asdict
 from dependency_injector.wiring import inject, Provide
 from datetime import datetime
 from typing import Annotated
 from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from common.auth import CurrentUser, get_current_user
 from inform.application.inform_service import InformService
@@ -15,6 +17,7 @@ class InformResponse(BaseModel):
     dataset_id: str
     model_config_path: str
     user_config_path: str
+    eda_status: str
 
 @router.post("/{dataset_id}", status_code=201)
 @inject
@@ -52,6 +55,30 @@ def get_inform_by_dataset(
 
     return InformResponse(**asdict(inform))
 
+@router.get("/{id}/artifacts/{name}")
+@inject
+def get_inform_artifact(
+    id: str,
+    name: str,
+    inform_service: InformService = Depends(Provide[Container.inform_service]),
+) -> FileResponse:
+    artifact = inform_service.get_artifact(id=id, name=name)
+
+    return FileResponse(
+        artifact["path"],
+        media_type=artifact["media_type"],
+        filename=os.path.basename(artifact["path"]),
+        headers={"X-Content-SHA256": artifact["sha256"]},
+    )
+
+@router.get("/{id}/run-report")
+@inject
+def get_inform_run_report(
+    id: str,
+    inform_service: InformService = Depends(Provide[Container.inform_service]),
+) -> dict:
+    return inform_service.get_run_report(id=id)
+
 class ConfigUpdates(BaseModel):
     target_feature: str
     controllable_feature: list[str]
@@ -4,6 +4,7 @@ import openai
 from collections import defaultdict
 from omegaconf import OmegaConf
 from config.update_config import update_config
+from config.run_context import resolve_context
 from optimization.feature_optimization import convert_to_serializable  # noqa: F401
 
 
@@ -20,8 +21,8 @@ def gpt_solution(final_dict, model_config_path, user_config_path):
     Parameters
         final_dict : dict
             Dictionary containing the optimization results.
-        model_config_path : str
-            Path to the model configuration file.
+        model_config_path : str or RunContext
+            Path to the model configuration file, or the in-memory run context.
         user_config_path : str
             Path to the user configuration file.
 
@@ -30,7 +31,7 @@ def gpt_solution(final_dict, model_config_path, user_config_path):
             The updated user configuration file path containing the GPT solution,
             or None if the task type is unknown.
     """
-    model_config = OmegaConf.load(model_config_path)
+    model_config, _ = resolve_context(model_config_path)
     user_config = OmegaConf.load(user_config_path)
     task_type = final_dict.get("task", None)
     if task_type is None:
@@ -1,19 +1,47 @@
-import pandas as pd
+import os
+import os.path as osp
+from contextlib import nullcontext
+from datetime import datetime
 from utils.logger_config import logger
-from omegaconf import OmegaConf
-import json
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, accuracy_score, f1_score
 from autogluon.tabular import TabularPredictor
-from imblearn.over_sampling import SMOTE
 from model.regression_metrics import adjusted_r2_score
+from model.resources import training_slot
+from model.evaluation import evaluate_predictor
+from model.balancing import balance_classes, balancing_settings
+from model.importance import add_feature_importance, importance_settings
+from model.inference import inference_settings, load_for_inference, optimize_for_inference, select_model
 from optimization.feature_optimization import convert_to_serializable
+from config.run_context import resolve_context
+from config.config_store import config_lock
+from config.update_config import convert_numpy_types
+from config.artifact_store import save_artifact
+from utils.instrumentation import stage
+from data.data_preprocess import split_data
+from data.content_store import (
+    MANIFEST_FILENAME,
+    cache_key,
+    content_dir,
+    frame_digest,
+    load_manifest,
+    save_manifest,
+)
 
+MODELS_DIR = "models"
 
-def automl_module(data, task, target, preset, time_to_train, config):
+
+def automl_module(data, task, target, preset, time_to_train, config, model_path=None, train_index=None):
     """
     Run AutoGluon model training.
 
+    Training waits for one of the node's training slots (see model.resources;
+    preview fits, model.tier == "preview", use the separate preview pool)
+    and passes that slot's CPUs, GPUs and per-model memory cap to fit; the
+    resource plan is stored in model_result["resources"]. After evaluation the
+    predictor is prepared for inference following the model.inference settings
+    (see model.inference.INFERENCE_DEFAULTS), with the latency before and after
+    stored in model_result["inference"].
+
     Parameters
         data : pd.DataFrame
             Preprocessed dataset.
@@ -25,8 +53,14 @@ def automl_module(data, task, target, preset, time_to_train, config):
             Quality level for the model preset.
         time_to_train : int
             Maximum training time in seconds.
-        config : dict or OmegaConf
+        config : dict or RunContext
             Configuration dictionary containing model settings.
+        model_path : str, optional
+            Directory where AutoGluon saves the models, by default a new
+            directory in the run workspace.
+        train_index : pd.Index, optional
+            Training rows from data.data_preprocess.split_index, by default
+            split_data splits the data itself.
 
     Returns
         tuple
@@ -41,12 +75,7 @@ def automl_module(data, task, target, preset, time_to_train, config):
         ValueError
             If an unsupported task type is provided.
     """
-    if task == "regression":
-        train_df, test_df = train_test_split(data, test_size=0.2, random_state=42)
-    else:
-        train_df, test_df = train_test_split(
-            data, test_size=0.2, random_state=42, stratify=data[target]
-        )
+    train_df, test_df = split_data(data, task, target, train_index)
 
     if target not in train_df.columns:
         raise KeyError(
@@ -54,36 +83,51 @@ def automl_module(data, task, target, preset, time_to_train, config):
             f"Training data columns: {list(train_df.columns)}"
         )
 
+    # Balance the classes with the strategy that fits the data size and imbalance.
+    predictor_kwargs, balancing = {}, None
     if task in ["binary", "multiclass"]:
-        X_train = train_df.drop(columns=[target])
-        y_train = train_df[target]
-        try:
-            sm = SMOTE(random_state=42)
-            X_res, y_res = sm.fit_resample(X_train, y_train)
-            train_df = pd.concat(
-                [
-                    pd.DataFrame(X_res, columns=X_train.columns),
-                    pd.DataFrame(y_res, columns=[target]),
-                ],
-                axis=1,
-            )
-            logger.info("SMOTE applied to balance the training data classes.")
-        except Exception as e:
-            logger.error(f"Error during SMOTE application: {e}")
-            pass
-
-    predictor = TabularPredictor(
-        label=target,
-        problem_type=task,
-        verbosity=2
-    ).fit(
-        train_data=train_df,
-        time_limit=time_to_train,
-        presets=preset,
-        num_gpus=1
-    )
-
-    y_pred = predictor.predict(test_df.drop(columns=[target]))
+        train_df, predictor_kwargs, balancing = balance_classes(
+            train_df, target, balancing_settings(config["model"])
+        )
+
+    # Keep the models inside the run workspace instead of ./AutogluonModels.
+    if model_path is None and config.get("save_path"):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        model_path = osp.join(config["save_path"], "AutogluonModels", f"ag-{timestamp}")
+
+    # Train with this job's share of the node instead of assuming a GPU.
+    pool = "preview" if config["model"].get("tier") == "preview" else "train"
+    with training_slot(pool=pool) as resources, stage("fit", train_df) as record:
+        record["num_cpus"], record["num_gpus"] = resources["num_cpus"], resources["num_gpus"]
+        predictor = TabularPredictor(
+            label=target,
+            problem_type=task,
+            path=model_path,
+            verbosity=2,
+            **predictor_kwargs,
+        ).fit(
+            train_data=train_df,
+            time_limit=time_to_train,
+            presets=preset,
+            num_cpus=resources["num_cpus"],
+            num_gpus=resources["num_gpus"],
+            ag_args_fit=resources["ag_args_fit"],
+        )
+
+    config["model_path"] = predictor.path
+    inference = inference_settings(config["model"])
+    with stage("select_model"):
+        selection = select_model(
+            predictor,
+            inference["max_score_loss"],
+            inference["latency_budget_ms"],
+            test_df.drop(columns=[target]),
+            inference["latency_batch_size"],
+        )
+    # One inference pass over the test set feeds the metrics, the leaderboard and the evaluation.
+    with stage("evaluate", test_df):
+        evaluation = evaluate_predictor(predictor, test_df, target)
+    y_pred = evaluation["predictions"]
 
     if task == "regression":
         mae = mean_absolute_error(test_df[target], y_pred)
@@ -94,7 +138,8 @@ def automl_module(data, task, target, preset, time_to_train, config):
         logger.info(f" - Advanced R^2: {adv_r2:.4f}")
         config["model_result"] = {
             "MAE": round(mae, 4),
-            "Advanced_R2": round(adv_r2, 4)
+            "Advanced_R2": round(adv_r2, 4),
+            "resources": resources,
         }
     elif task in ["binary", "multiclass"]:
         accuracy = float(accuracy_score(test_df[target], y_pred))
@@ -104,59 +149,123 @@ def automl_module(data, task, target, preset, time_to_train, config):
         logger.info(f" - F1 Score: {f1:.4f}")
         config["model_result"] = {
             "accuracy": round(accuracy, 4),
-            "f1_score": round(f1, 4)
+            "f1_score": round(f1, 4),
+            "resources": resources,
+            "balancing": balancing,
         }
     else:
         raise ValueError(f"Unsupported task type: {task}")
 
-    leaderboard = predictor.leaderboard(test_df, silent=True)
+    leaderboard = evaluation["leaderboard"]
     logger.info(f"LeaderBoard Result:\n{leaderboard}")
     config["top_models"] = leaderboard.to_dict()
-
-    feature_importance = predictor.feature_importance(test_df)
-    logger.info(f"Feature Importance:\n{feature_importance}")
     logger.info("==============================================================")
-    config["feature_importance"] = feature_importance.to_dict()
 
-    evaluation = predictor.evaluate(test_df)
-    logger.info(f"Evaluation Results:\n{evaluation}")
+    with stage("inference_profile", test_df):
+        profile = optimize_for_inference(predictor, test_df, target, inference)
+    config["model_result"] = {**config["model_result"], "inference": {"selection": selection, **profile}}
+
+    logger.info(f"Evaluation Results:\n{evaluation['scores']}")
     logger.info("==============================================================")
 
     return predictor, test_df, config
 
 
-def train_model(data, config_path):
+def train_model(data, config_path, latency_budget_ms=None, latency_batch_size=None, train_index=None):
     """
     Execute the AutoML pipeline with AutoGluon.
 
+    Permutation feature importance follows the model.importance settings (see
+    model.importance.IMPORTANCE_DEFAULTS). In 'sync' mode it is computed before
+    returning; in 'background' mode model_result['feature_importance'] is marked
+    'pending' and the caller starts model.importance.submit_feature_importance
+    once the configuration has been flushed.
+
     Parameters
         data : pd.DataFrame
             Preprocessed dataset.
-        config_path : str
-            Path to the configuration file (in OmegaConf format) containing keys such as
-            'task', 'target_feature', 'model_quality', and 'time_to_train'.
+        config_path : str or RunContext
+            Path to the configuration file, or the in-memory run context, containing
+            keys such as 'task', 'target_feature', 'model_quality', and 'time_to_train'.
+        latency_budget_ms : float, optional
+            Inference budget in milliseconds per row; overrides
+            model.inference.latency_budget_ms. The most accurate model or
+            weighted ensemble that fits it becomes the best model, and the
+            choice with its measured latency is stored in
+            model_result['inference']['selection'].
+        latency_batch_size : int, optional
+            Rows per prediction call the budget applies to; overrides
+            model.inference.latency_batch_size.
+        train_index : pd.Index, optional
+            Training rows from data.data_preprocess.split_index, the same
+            index the data was preprocessed with; the remaining rows form
+            the test set.
 
     Returns
         tuple :
             - model (TabularPredictor): The trained AutoGluon model.
             - test_df (pd.DataFrame): Test dataset used for evaluation.
     """
-    config = OmegaConf.load(config_path)
+    config, owned = resolve_context(config_path)
+    overrides = {"latency_budget_ms": latency_budget_ms, "latency_batch_size": latency_batch_size}
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    if overrides:
+        config.update({"model": {"inference": overrides}})
     model_config = config["model"]
     task = config["task"]
     target = config["target_feature"]
     selected_quality = model_config["model_quality"]
     time_to_train = model_config["time_to_train"]
     preset = f"{selected_quality}_quality"
+    importance = importance_settings(model_config)
+
+    # Runs on identical data with identical settings share one trained model.
+    shared_dir = None
+    if config.get("content_hash"):
+        shared_dir = osp.join(
+            content_dir(config["content_hash"]),
+            MODELS_DIR,
+            cache_key({
+                "data": frame_digest(data),
+                "task": task,
+                "target": target,
+                "model_quality": selected_quality,
+                "time_to_train": time_to_train,
+                "inference": inference_settings(model_config),
+                "balancing": balancing_settings(model_config),
+            }),
+        )
+        os.makedirs(shared_dir, exist_ok=True)
+
     try:
-        model, test_df, config = automl_module(data, task, target, selected_quality, time_to_train, config)
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(
-                OmegaConf.to_container(config, resolve=True),
-                f,
-                indent=4,
-                ensure_ascii=False
-            )
+        with config_lock(osp.join(shared_dir, MANIFEST_FILENAME)) if shared_dir else nullcontext():
+            manifest = load_manifest(shared_dir) if shared_dir else None
+            if manifest is not None:
+                logger.info(f"Reusing the model trained on identical data: {manifest['model_path']}")
+                model = load_for_inference(
+                    TabularPredictor.load(manifest["model_path"]), inference_settings(model_config)
+                )
+                _, test_df = split_data(data, task, target, train_index)
+                config.update({key: manifest[key] for key in ["model_path", "model_result"]})
+                config["top_models"] = manifest["top_models"]
+                config["feature_importance"] = manifest["feature_importance"]
+            else:
+                model, test_df, config = automl_module(
+                    data, task, target, selected_quality, time_to_train, config,
+                    model_path=osp.join(shared_dir, "AutogluonModels") if shared_dir else None,
+                    train_index=train_index,
+                )
+                # Importances of an earlier run of this context belong to another model.
+                config["feature_importance"] = {}
+            if not config["feature_importance"]:
+                if importance["mode"] == "sync":
+                    add_feature_importance(model, test_df, config, importance)
+                else:
+                    config["model_result"] = {**config["model_result"], "feature_importance": {"status": "pending"}}
+            if shared_dir and not (manifest and manifest["feature_importance"]):
+                _share_model(shared_dir, config)
+        if owned:
+            config.flush()
         logger.info("AutoGluon model class labels:")
         logger.info(model.class_labels)
         logger.info("==========================================")
@@ -164,4 +273,27 @@ def train_model(data, config_path):
         logger.error(f"Model training failed: {e}")
         return
 
-    return model, test_df
\ No newline at end of file
+    return model, test_df
+
+
+def _share_model(shared_dir, config):
+    """
+    Record a trained model in the shared directory of the dataset content.
+
+    Parameters
+        shared_dir : str
+            Directory of the cached model.
+        config : RunContext
+            Run context holding the training results; the leaderboard and the
+            feature importance are replaced by references to the shared files;
+            an empty feature importance (still pending) is recorded as empty.
+    """
+    for key in ["top_models", "feature_importance"]:
+        if config[key]:
+            config[key] = save_artifact(shared_dir, key, config[key])
+    save_manifest(shared_dir, convert_numpy_types({
+        "model_path": config["model_path"],
+        "model_result": config["model_result"],
+        "top_models": config["top_models"],
+        "feature_importance": config["feature_importance"],
+    }))
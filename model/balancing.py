@@ -0,0 +1,201 @@
+import time
+import tracemalloc
+import warnings
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from utils.logger_config import logger
+from utils.instrumentation import stage
+
+# Defaults of model.balancing in the model configuration.
+BALANCING_DEFAULTS = {
+    "strategy": "auto",
+    "imbalance_threshold": 1.5,
+    "smote_max_rows": 50000,
+    "smote_sample_rows": 10000,
+    "undersample_min_rows": 10000,
+    "undersample_ratio": 1.0,
+}
+BALANCING_STRATEGIES = ("auto", "none", "sample_weight", "undersample", "smote")
+SMOTE_NEIGHBORS = 5
+BALANCING_SEED = 42
+
+
+def balancing_settings(model_config):
+    """
+    Return the class balancing settings of a model configuration.
+
+    Parameters
+        model_config : dict
+            The 'model' section of the model configuration; its optional
+            'balancing' entry overrides BALANCING_DEFAULTS.
+
+    Returns
+        dict
+            The settings with every key of BALANCING_DEFAULTS.
+
+    Raises
+        ValueError
+            If an unsupported strategy is configured.
+    """
+    settings = dict(BALANCING_DEFAULTS)
+    settings.update({k: v for k, v in (model_config.get("balancing") or {}).items() if v is not None})
+    if settings["strategy"] not in BALANCING_STRATEGIES:
+        raise ValueError(f"Unsupported balancing strategy: {settings['strategy']}")
+    return settings
+
+
+def choose_strategy(counts, settings):
+    """
+    Choose a balancing strategy from the dataset size and the class imbalance.
+
+    Nearly balanced data is left as is. Small data is oversampled with SMOTE
+    (see _bounded_smote), large data whose smallest class alone has enough
+    rows is undersampled, and other large data is balanced with sample
+    weights, which copy nothing.
+
+    Parameters
+        counts : pd.Series
+            Number of training rows per class.
+        settings : dict
+            Settings returned by balancing_settings.
+
+    Returns
+        str
+            One of "none", "sample_weight", "undersample" or "smote".
+    """
+    if settings["strategy"] != "auto":
+        return settings["strategy"]
+    if counts.max() / counts.min() < settings["imbalance_threshold"]:
+        return "none"
+    if counts.sum() <= settings["smote_max_rows"]:
+        return "smote"
+    if counts.min() >= settings["undersample_min_rows"]:
+        return "undersample"
+    return "sample_weight"
+
+
+def balance_classes(train_df, target, settings):
+    """
+    Balance the classes of a classification training set.
+
+    Parameters
+        train_df : pd.DataFrame
+            Training dataset including the target column.
+        target : str
+            Name of the target variable.
+        settings : dict
+            Settings returned by balancing_settings.
+
+    Returns
+        tuple
+            A tuple containing:
+                - train_df (pd.DataFrame): The balanced training dataset.
+                - predictor_kwargs (dict): Extra TabularPredictor arguments
+                  (sample_weight="balance_weight" for the sample_weight strategy).
+                - summary (dict): Strategy actually applied, imbalance ratio,
+                  rows before and after, seconds, memory_mb (peak memory
+                  allocated while balancing, traced with tracemalloc),
+                  peak_rss_growth_mb (growth of the process's peak RSS) and
+                  result_mb (size of the balanced data); if SMOTE failed and
+                  sample weights were used instead, also the error.
+    """
+    counts = train_df[target].value_counts()
+    strategy = choose_strategy(counts, settings)
+    predictor_kwargs = {}
+    error = None
+    rows_before = len(train_df)
+    start = time.perf_counter()
+    # Trace allocations unless another caller already does.
+    tracing = not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+
+    with stage("balancing", train_df) as record:
+        if strategy == "smote":
+            try:
+                train_df = _bounded_smote(
+                    train_df, target, settings["smote_max_rows"], settings["smote_sample_rows"]
+                )
+            except Exception as e:
+                logger.error(f"Error during SMOTE application: {e}; using sample weights instead")
+                error = str(e)
+                strategy = "sample_weight"
+        if strategy == "sample_weight":
+            predictor_kwargs["sample_weight"] = "balance_weight"
+        elif strategy == "undersample":
+            train_df = _undersample(train_df, target, int(counts.min() * settings["undersample_ratio"]))
+        record["strategy"] = strategy
+        traced_peak = tracemalloc.get_traced_memory()[1] if tracing else None
+        if tracing:
+            tracemalloc.stop()
+
+    summary = {
+        "strategy": strategy,
+        "imbalance_ratio": round(float(counts.max() / counts.min()), 4),
+        "rows_before": rows_before,
+        "rows_after": len(train_df),
+        "seconds": round(time.perf_counter() - start, 3),
+        "memory_mb": round(traced_peak / 1024 ** 2, 2) if traced_peak is not None else None,
+        "peak_rss_growth_mb": record["peak_rss_growth_mb"],
+        "result_mb": round(train_df.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+    }
+    if error:
+        summary["error"] = error
+    logger.info(
+        f"Class balancing '{strategy}' (imbalance {summary['imbalance_ratio']}): "
+        f"{rows_before} -> {len(train_df)} rows in {summary['seconds']:.2f}s, "
+        f"peak {summary['memory_mb']} MB allocated, result {summary['result_mb']} MB"
+    )
+    return train_df, predictor_kwargs, summary
+
+
+def _undersample(train_df, target, rows_per_class):
+    rows_per_class = max(rows_per_class, 1)
+    parts = [
+        group.sample(n=min(len(group), rows_per_class), random_state=BALANCING_SEED)
+        for _, group in train_df.groupby(target)
+    ]
+    return pd.concat(parts).sample(frac=1.0, random_state=BALANCING_SEED)
+
+
+def _bounded_smote(train_df, target, max_rows, sample_rows):
+    """
+    Oversample the minority classes with SMOTE on a bounded subsample.
+
+    Every real row is kept and only the synthetic rows are capped, so the
+    result has at most max_rows rows; minority classes share the budget by
+    their deficit. The neighbour graph of each class is built on at most
+    sample_rows of its rows, so for larger classes the neighbours are
+    approximate (nearest within the subsample) and the cost of SMOTE does
+    not grow with the data.
+    """
+    counts = train_df[target].value_counts()
+    deficits = counts.max() - counts
+    budget = max_rows - len(train_df)
+    if budget <= 0:
+        raise ValueError(f"{len(train_df)} rows leave no room for synthetic rows (smote_max_rows={max_rows})")
+    scale = min(1.0, budget / deficits.sum())
+    synthetic = {label: int(deficits[label] * scale) for label in counts.index if deficits[label] * scale >= 1}
+    if not synthetic:
+        return train_df
+
+    sample = pd.concat(
+        group.sample(n=min(len(group), sample_rows), random_state=BALANCING_SEED)
+        for _, group in train_df.groupby(target)
+    )
+    sample_counts = sample[target].value_counts()
+    X_sample = sample.drop(columns=[target])
+    k_neighbors = min(SMOTE_NEIGHBORS, int(sample_counts[list(synthetic)].min()) - 1)
+    sm = SMOTE(
+        sampling_strategy={label: int(sample_counts[label]) + n for label, n in synthetic.items()},
+        random_state=BALANCING_SEED,
+        k_neighbors=k_neighbors,
+    )
+    with warnings.catch_warnings():
+        # The targets exceed the subsampled majority class on purpose.
+        warnings.simplefilter("ignore", UserWarning)
+        X_res, y_res = sm.fit_resample(X_sample, sample[target])
+    # fit_resample appends the synthetic rows after the input rows.
+    new_rows = pd.DataFrame(X_res[len(sample):], columns=X_sample.columns)
+    new_rows[target] = pd.Series(y_res[len(sample):]).to_numpy()
+    return pd.concat([train_df, new_rows[train_df.columns]], ignore_index=True)
@@ -0,0 +1,83 @@
+import time
+import numpy as np
+import pandas as pd
+from utils.logger_config import logger
+
+
+def evaluate_predictor(predictor, test_df, target):
+    """
+    Evaluate every trained model on the test set in a single inference pass.
+
+    The test set goes through the feature generators once, and all models
+    predict from the transformed features in one predict_multi /
+    predict_proba_multi call, in which stacker models reuse the predictions of
+    their base models. The test score of each model, the predictions of the
+    best model and its full evaluation are all derived from these cached
+    predictions instead of calling predict, leaderboard and evaluate on the
+    raw test set one after another.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        test_df : pd.DataFrame
+            Test dataset including the target column.
+        target : str
+            Name of the target variable.
+
+    Returns
+        dict
+            Dictionary with the keys:
+                - predictions (pd.Series): Predictions of the best model.
+                - pred_proba (pd.DataFrame or None): Class probabilities of the
+                  best model, None for regression.
+                - leaderboard (pd.DataFrame): predictor.leaderboard() with a
+                  score_test column, sorted by it.
+                - scores (dict): evaluate_predictions of the best model,
+                  including the auxiliary metrics.
+                - features (pd.DataFrame): The transformed test features.
+                - inference_s (float): Duration of the inference pass.
+    """
+    y_true = test_df[target]
+    start = time.perf_counter()
+    features = predictor.transform_features(test_df.drop(columns=[target]))
+    models = predictor.get_model_names()
+    is_classification = predictor.problem_type in ["binary", "multiclass"]
+    if is_classification:
+        model_outputs = predictor.predict_proba_multi(features, models=models, transform_features=False)
+    else:
+        model_outputs = predictor.predict_multi(features, models=models, transform_features=False)
+    inference_s = time.perf_counter() - start
+
+    metric = predictor.eval_metric.name
+    scores_test = {
+        model: predictor.evaluate_predictions(y_true, output, silent=True, auxiliary_metrics=False)[metric]
+        for model, output in model_outputs.items()
+    }
+    best = predictor.get_model_best()
+    if is_classification:
+        pred_proba = model_outputs[best]
+        predictions = pd.Series(
+            np.asarray(predictor.get_pred_from_proba(pred_proba)), index=y_true.index, name=target
+        )
+    else:
+        pred_proba = None
+        predictions = model_outputs[best]
+    scores = predictor.evaluate_predictions(
+        y_true, model_outputs[best], silent=True, auxiliary_metrics=True
+    )
+
+    leaderboard = predictor.leaderboard(silent=True)
+    leaderboard.insert(1, "score_test", leaderboard["model"].map(scores_test))
+    leaderboard = leaderboard.sort_values(
+        ["score_test", "score_val"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+    logger.info(f"Evaluated {len(models)} models on {len(test_df)} test rows in {inference_s:.2f}s (single pass)")
+
+    return {
+        "predictions": predictions,
+        "pred_proba": pred_proba,
+        "leaderboard": leaderboard,
+        "scores": scores,
+        "features": features,
+        "inference_s": round(inference_s, 4),
+    }
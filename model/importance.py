@@ -0,0 +1,293 @@
+import os.path as osp
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+from utils.logger_config import logger
+from model.resources import training_slot
+from config.artifact_store import ARTIFACT_DIR, save_artifact
+from config.config_store import config_lock
+from config.update_config import convert_numpy_types, update_config
+from utils.instrumentation import run_report, run_report_path, stage
+from data.content_store import MANIFEST_FILENAME, load_manifest, save_manifest
+
+# Defaults of model.importance in the model configuration.
+IMPORTANCE_DEFAULTS = {
+    "mode": "sync",
+    "subsample_size": 5000,
+    "num_shuffle_sets": 5,
+    "features": "selected",
+    "confidence_level": 0.95,
+    "num_workers": None,
+}
+IMPORTANCE_MODES = ("sync", "background")
+IMPORTANCE_MAX_WORKERS = 4
+IMPORTANCE_SEED = 42
+
+# Predictor loaded once by every worker process of the pool.
+_worker_predictor = None
+
+
+def importance_settings(model_config):
+    """
+    Return the feature importance settings of a model configuration.
+
+    Parameters
+        model_config : dict
+            The 'model' section of the model configuration; its optional
+            'importance' entry overrides IMPORTANCE_DEFAULTS.
+
+    Returns
+        dict
+            The settings with every key of IMPORTANCE_DEFAULTS.
+
+    Raises
+        ValueError
+            If an unsupported mode is configured.
+    """
+    settings = dict(IMPORTANCE_DEFAULTS)
+    settings.update({k: v for k, v in (model_config.get("importance") or {}).items() if v is not None})
+    if settings["mode"] not in IMPORTANCE_MODES:
+        raise ValueError(f"Unsupported feature importance mode: {settings['mode']}")
+    return settings
+
+
+def importance_features(predictor, config, features="selected"):
+    """
+    Select the features whose importance is computed.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        config : dict or RunContext
+            Model configuration with controllable_feature and final_features.
+        features : str or list, optional
+            "selected" for the controllable and final features, "all" for every
+            feature of the predictor, or an explicit list, by default "selected".
+
+    Returns
+        list
+            Feature names in the predictor's order; every feature if the
+            selection matches none of them.
+    """
+    available = list(predictor.features())
+    if features == "all":
+        return available
+    if features == "selected":
+        wanted = list(config.get("controllable_feature") or []) + list(config.get("final_features") or [])
+    else:
+        wanted = list(features)
+    selected = [f for f in available if f in set(wanted)]
+    return selected or available
+
+
+def compute_feature_importance(
+    predictor,
+    test_df,
+    features=None,
+    subsample_size=IMPORTANCE_DEFAULTS["subsample_size"],
+    num_shuffle_sets=IMPORTANCE_DEFAULTS["num_shuffle_sets"],
+    confidence_level=IMPORTANCE_DEFAULTS["confidence_level"],
+    num_workers=None,
+):
+    """
+    Compute permutation feature importance on a row subsample, in parallel.
+
+    The test set is subsampled once with a fixed seed, so every feature is
+    scored on the same rows. The features are split into chunks that are
+    shuffled in separate worker processes, each of which loads the predictor
+    from disk; with a single worker the importance is computed in-process.
+    Without an explicit num_workers the computation holds a training slot
+    (model.resources.training_slot) and uses that slot's CPUs, so it does not
+    oversubscribe the node next to concurrent trainings.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        test_df : pd.DataFrame
+            Test dataset including the target column.
+        features : list, optional
+            Features to score, by default every feature of the predictor.
+        subsample_size : int, optional
+            Maximum number of rows used, by default 5000.
+        num_shuffle_sets : int, optional
+            Number of shuffles per feature, by default 5.
+        confidence_level : float, optional
+            Level of the confidence band of each importance, by default 0.95.
+        num_workers : int, optional
+            Number of worker processes, by default the training slot's CPUs
+            capped at IMPORTANCE_MAX_WORKERS and the number of features.
+
+    Returns
+        tuple
+            A tuple containing:
+                - importance (pd.DataFrame): predictor.feature_importance output
+                  (importance, stddev, p_value, n and the p{level}_high/low
+                  confidence band), sorted by importance.
+                - summary (dict): Subsample size, total rows, number of features,
+                  shuffles, confidence level, mean confidence interval width,
+                  workers and elapsed seconds.
+    """
+    start = time.perf_counter()
+    features = list(features) if features else list(predictor.features())
+    data = test_df
+    if subsample_size and len(test_df) > subsample_size:
+        data = test_df.sample(n=subsample_size, random_state=IMPORTANCE_SEED)
+    options = {
+        "subsample_size": len(data),
+        "num_shuffle_sets": num_shuffle_sets,
+        "include_confidence_band": True,
+        "confidence_level": confidence_level,
+        "silent": True,
+    }
+
+    slot = training_slot() if num_workers is None else nullcontext()
+    with slot as plan, stage("feature_importance", data) as record:
+        if plan is not None:
+            num_workers = min(plan["num_cpus"], IMPORTANCE_MAX_WORKERS)
+        num_workers = max(1, min(num_workers, len(features)))
+        if num_workers == 1:
+            importance = predictor.feature_importance(data, features=features, **options)
+        else:
+            chunks = [list(chunk) for chunk in np.array_split(features, num_workers)]
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_worker_predictor,
+                initargs=(predictor.path,),
+            ) as executor:
+                parts = list(executor.map(_chunk_importance, [(data, chunk, options) for chunk in chunks]))
+            importance = pd.concat(parts)
+        importance = importance.sort_values("importance", ascending=False)
+        record["n_features"], record["num_workers"] = len(features), num_workers
+
+    level = "{:0.0f}".format(confidence_level * 100)
+    ci_width = importance[f"p{level}_high"] - importance[f"p{level}_low"]
+    summary = {
+        "subsample_size": len(data),
+        "total_rows": len(test_df),
+        "n_features": len(features),
+        "num_shuffle_sets": num_shuffle_sets,
+        "confidence_level": confidence_level,
+        "mean_ci_width": round(float(ci_width.mean()), 6) if ci_width.notna().any() else None,
+        "num_workers": num_workers,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+    logger.info(
+        f"Feature importance of {len(features)} features on {len(data)}/{len(test_df)} rows "
+        f"({num_shuffle_sets} shuffles, {num_workers} workers) in {summary['elapsed_s']:.2f}s; "
+        f"mean {level}% CI width {summary['mean_ci_width']}"
+    )
+    return importance, summary
+
+
+def add_feature_importance(predictor, test_df, config, settings):
+    """
+    Compute the feature importance synchronously and store it in the configuration.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        test_df : pd.DataFrame
+            Test dataset including the target column.
+        config : RunContext
+            Run context; feature_importance and model_result['feature_importance']
+            are set.
+        settings : dict
+            Settings returned by importance_settings.
+    """
+    importance, summary = compute_feature_importance(
+        predictor,
+        test_df,
+        importance_features(predictor, config, settings["features"]),
+        settings["subsample_size"],
+        settings["num_shuffle_sets"],
+        settings["confidence_level"],
+        settings["num_workers"],
+    )
+    logger.info(f"Feature Importance:\n{importance}")
+    config["feature_importance"] = importance.to_dict()
+    config["model_result"] = {**config["model_result"], "feature_importance": {"status": "done", **summary}}
+
+
+def submit_feature_importance(predictor, test_df, config, user_config_path=None):
+    """
+    Compute the feature importance in a background thread.
+
+    Call this after the run context has been flushed for the last time: the
+    thread writes the importance table to a sidecar file and merges its
+    reference and summary (model_result['feature_importance']) into the model
+    configuration file, the user configuration file and, if the model is shared
+    by identical runs, its manifest. Until then model_result['feature_importance']
+    has the status 'pending'. The thread is not a daemon, so a command-line run
+    waits for it before exiting.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        test_df : pd.DataFrame
+            Test dataset including the target column.
+        config : RunContext
+            Flushed run context of the model configuration file.
+        user_config_path : str, optional
+            Path to the user configuration file, by default not updated.
+
+    Returns
+        threading.Thread
+            The started thread.
+    """
+    settings = importance_settings(config["model"])
+    features = importance_features(predictor, config, settings["features"])
+    model_config_path = config.path
+    save_path = config["save_path"] or osp.dirname(model_config_path)
+    shared_dir = osp.dirname(predictor.path.rstrip("/"))
+    if not osp.exists(osp.join(shared_dir, MANIFEST_FILENAME)):
+        shared_dir = None
+
+    def job():
+        try:
+            with run_report(run_report_path(save_path)):
+                importance, summary = compute_feature_importance(
+                    predictor, test_df, features, settings["subsample_size"],
+                    settings["num_shuffle_sets"], settings["confidence_level"], settings["num_workers"],
+                )
+            ref = save_artifact(osp.join(save_path, ARTIFACT_DIR), "feature_importance", importance.to_dict())
+            updates = {"feature_importance": ref, "model_result": {"feature_importance": {"status": "done", **summary}}}
+        except Exception as e:
+            logger.error(f"Background feature importance failed: {e}")
+            updates = {"model_result": {"feature_importance": {"status": "failed", "error": str(e)}}}
+        for path in [model_config_path, user_config_path]:
+            if path:
+                update_config(path, updates)
+        if shared_dir and "feature_importance" in updates:
+            _share_importance(shared_dir, importance, updates["model_result"])
+
+    thread = threading.Thread(target=job, name="feature-importance")
+    thread.start()
+    logger.info("Feature importance is computed in the background.")
+    return thread
+
+
+def _share_importance(shared_dir, importance, model_result):
+    with config_lock(osp.join(shared_dir, MANIFEST_FILENAME)):
+        manifest = load_manifest(shared_dir)
+        if manifest is None or manifest.get("feature_importance"):
+            return
+        manifest["feature_importance"] = save_artifact(shared_dir, "feature_importance", importance.to_dict())
+        manifest["model_result"] = {**manifest["model_result"], **model_result}
+        save_manifest(shared_dir, convert_numpy_types(manifest))
+
+
+def _load_worker_predictor(path):
+    global _worker_predictor
+    from autogluon.tabular import TabularPredictor
+
+    _worker_predictor = TabularPredictor.load(path)
+
+
+def _chunk_importance(args):
+    data, features, options = args
+    return _worker_predictor.feature_importance(data, features=features, **options)
@@ -0,0 +1,309 @@
+import statistics
+import time
+from utils.logger_config import logger
+from data.content_store import is_shared
+
+# Defaults of model.inference in the model configuration.
+INFERENCE_DEFAULTS = {
+    "refit_full": False,
+    "prune": False,
+    "max_score_loss": 0.0,
+    "persist": True,
+    "latency_budget_ms": None,
+    "latency_batch_size": 1,
+}
+LATENCY_BATCH_SIZE = 1000
+BUDGET_REPEATS = 3
+BUDGET_ENSEMBLE_SUFFIX = "Budget"
+SINGLE_ROW_REPEATS = 20
+BATCH_REPEATS = 3
+
+
+def inference_settings(model_config):
+    """
+    Return the inference settings of a model configuration.
+
+    Parameters
+        model_config : dict
+            The 'model' section of the model configuration; its optional
+            'inference' entry overrides INFERENCE_DEFAULTS.
+
+    Returns
+        dict
+            The settings with every key of INFERENCE_DEFAULTS.
+    """
+    settings = dict(INFERENCE_DEFAULTS)
+    settings.update({k: v for k, v in (model_config.get("inference") or {}).items() if v is not None})
+    return settings
+
+
+def select_model(predictor, max_score_loss=0.0, latency_budget_ms=None, data=None, batch_size=1):
+    """
+    Set the predictor's best model to the fastest one close to the best validation score.
+
+    Models are compared on the leaderboard's validation score and pred_time_val
+    (the inference time of the model and its base models on the validation
+    data), so the test set is not used for the choice. With a latency budget,
+    only models predicted to fit it are considered: pred_time_val is calibrated
+    to milliseconds per row at batch_size by timing AutoGluon's best model on
+    rows of data, a weighted ensemble of the fitting base models is added as a
+    candidate, and the most accurate candidate whose measured latency fits the
+    budget is chosen. If no model fits, the fastest one is chosen.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        max_score_loss : float, optional
+            Largest drop of the validation score accepted for a faster model,
+            by default 0.0 (the most accurate model).
+        latency_budget_ms : float, optional
+            Inference budget in milliseconds per row, by default no budget.
+        data : pd.DataFrame, optional
+            Feature rows used to time the models; required with a budget.
+        batch_size : int, optional
+            Number of rows per prediction call the budget applies to, by default 1.
+
+    Returns
+        dict
+            Dictionary with the keys model, score_val, pred_time_val and
+            default_model (the model AutoGluon had chosen); with a budget also
+            latency_budget_ms, batch_size, estimated_ms_per_row,
+            measured_ms_per_row and within_budget.
+    """
+    default_model = predictor.get_model_best()
+    leaderboard = _inference_leaderboard(predictor)
+    budget = {}
+    if latency_budget_ms is not None:
+        leaderboard, budget = _apply_latency_budget(
+            predictor, leaderboard, default_model, latency_budget_ms, data, batch_size
+        )
+    best_score = leaderboard["score_val"].max()
+    candidates = leaderboard[leaderboard["score_val"] >= best_score - max_score_loss]
+    chosen = candidates.sort_values(["pred_time_val", "score_val"], ascending=[True, False]).iloc[0]
+    if chosen["model"] != default_model:
+        predictor.set_model_best(chosen["model"], save_trainer=True)
+        logger.info(
+            f"Selected {chosen['model']} instead of {default_model}: score_val {chosen['score_val']:.4f} "
+            f"(best {best_score:.4f}), pred_time_val {chosen['pred_time_val']:.3f}s"
+        )
+    return {
+        "model": chosen["model"],
+        "score_val": float(chosen["score_val"]),
+        "pred_time_val": float(chosen["pred_time_val"]),
+        "default_model": default_model,
+        **budget.get(chosen["model"], {}),
+    }
+
+
+def model_latency_ms(predictor, batch, model=None):
+    """
+    Measure the prediction time of one model in milliseconds per row.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        batch : pd.DataFrame
+            Feature rows predicted in one call.
+        model : str, optional
+            Model name, by default the best model.
+
+    Returns
+        float
+            Median over BUDGET_REPEATS calls after a warm-up call, per row.
+    """
+    predictor.predict(batch, model=model)
+    times = []
+    for _ in range(BUDGET_REPEATS):
+        start = time.perf_counter()
+        predictor.predict(batch, model=model)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times) / len(batch)
+
+
+def measure_latency(predictor, data):
+    """
+    Measure the prediction latency of the predictor's best model.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor.
+        data : pd.DataFrame
+            Feature rows to predict; rows are repeated if there are fewer than
+            LATENCY_BATCH_SIZE.
+
+    Returns
+        dict
+            Dictionary with the keys first_call_ms (first single-row call,
+            including lazy model loading), single_row_ms (median of
+            SINGLE_ROW_REPEATS calls), batch_ms (median time of a
+            LATENCY_BATCH_SIZE-row call) and batch_ms_per_row.
+    """
+    row = data.head(1)
+    batch = data.sample(n=LATENCY_BATCH_SIZE, replace=len(data) < LATENCY_BATCH_SIZE, random_state=0)
+
+    def timed(frame):
+        start = time.perf_counter()
+        predictor.predict(frame)
+        return (time.perf_counter() - start) * 1000.0
+
+    first_call_ms = timed(row)
+    single_row_ms = statistics.median(timed(row) for _ in range(SINGLE_ROW_REPEATS))
+    batch_ms = statistics.median(timed(batch) for _ in range(BATCH_REPEATS))
+    return {
+        "first_call_ms": round(first_call_ms, 3),
+        "single_row_ms": round(single_row_ms, 3),
+        "batch_ms": round(batch_ms, 3),
+        "batch_ms_per_row": round(batch_ms / LATENCY_BATCH_SIZE, 5),
+    }
+
+
+def optimize_for_inference(predictor, test_df, target, settings):
+    """
+    Prepare a trained predictor for fast repeated predictions.
+
+    Optionally refits the best model and its base models on all data without
+    bagging (refit_full), deletes the models that do not pay for their
+    latency, and keeps the remaining models loaded in memory. A model is
+    deleted only if the best model does not depend on it and its validation
+    score is more than max_score_loss below the best one, so every model
+    select_model could choose is kept. Models in the shared content cache are
+    never pruned, because other runs load them. The single-row and batch
+    latency is measured before and after.
+
+    Parameters
+        predictor : TabularPredictor
+            Trained AutoGluon predictor whose best model has been selected.
+        test_df : pd.DataFrame
+            Test dataset; its feature rows are used for the latency measurement.
+        target : str
+            Name of the target variable.
+        settings : dict
+            Settings returned by inference_settings.
+
+    Returns
+        dict
+            Dictionary with the keys model (final best model), refit_full,
+            deleted_models, persisted_models, latency_before and latency_after.
+    """
+    data = test_df.drop(columns=[target])
+    latency_before = measure_latency(predictor, data)
+
+    if settings["refit_full"]:
+        refit = predictor.refit_full(model=predictor.get_model_best(), set_best_to_refit_full=True)
+        logger.info(f"Refit on the full data: {refit}")
+    best = predictor.get_model_best()
+    deleted = []
+    if settings["prune"] and is_shared(predictor.path):
+        logger.info(f"Not pruning the shared model cache: {predictor.path}")
+    elif settings["prune"]:
+        leaderboard = _inference_leaderboard(predictor)
+        threshold = leaderboard["score_val"].max() - settings["max_score_loss"]
+        # Models the kept models depend on are kept by delete_models.
+        keep = [best] + leaderboard.loc[leaderboard["score_val"] >= threshold, "model"].tolist()
+        kept = set(predictor.get_model_names())
+        predictor.delete_models(models_to_keep=list(dict.fromkeys(keep)), dry_run=False)
+        deleted = sorted(kept - set(predictor.get_model_names()))
+    persisted = predictor.persist_models(models="best") if settings["persist"] else []
+
+    latency_after = measure_latency(predictor, data)
+    logger.info(
+        f"Inference profile of {best}: single row {latency_before['single_row_ms']:.1f} -> "
+        f"{latency_after['single_row_ms']:.1f} ms, {LATENCY_BATCH_SIZE} rows "
+        f"{latency_before['batch_ms']:.1f} -> {latency_after['batch_ms']:.1f} ms, "
+        f"{len(deleted)} models deleted"
+    )
+    return {
+        "model": best,
+        "refit_full": bool(settings["refit_full"]),
+        "deleted_models": deleted,
+        "persisted_models": list(persisted),
+        "latency_before": latency_before,
+        "latency_after": latency_after,
+    }
+
+
+def _inference_leaderboard(predictor):
+    leaderboard = predictor.leaderboard(silent=True)
+    return leaderboard[leaderboard["can_infer"] & leaderboard["score_val"].notna()]
+
+
+def _apply_latency_budget(predictor, leaderboard, default_model, latency_budget_ms, data, batch_size):
+    """
+    Restrict the leaderboard to the models that fit the latency budget.
+
+    Returns the restricted leaderboard and, per remaining model, the budget
+    fields of select_model.
+    """
+    batch = data.sample(n=batch_size, replace=len(data) < batch_size, random_state=0)
+    reference_ms = model_latency_ms(predictor, batch, default_model)
+    scale = reference_ms / leaderboard.set_index("model").loc[default_model, "pred_time_val"]
+
+    def estimate(frame):
+        return frame.assign(estimated_ms_per_row=frame["pred_time_val"] * scale)
+
+    leaderboard = estimate(leaderboard)
+    fitting = leaderboard[leaderboard["estimated_ms_per_row"] <= latency_budget_ms]
+    # Add the best base models while their summed latency fits, then ensemble them.
+    bases, total_ms = [], 0.0
+    for _, row in fitting[fitting["stack_level"] == 1].sort_values("score_val", ascending=False).iterrows():
+        if total_ms + row["estimated_ms_per_row"] <= latency_budget_ms:
+            bases.append(row["model"])
+            total_ms += row["estimated_ms_per_row"]
+    if len(bases) > 1:
+        predictor.fit_weighted_ensemble(base_models=bases, name_suffix=BUDGET_ENSEMBLE_SUFFIX)
+        leaderboard = estimate(_inference_leaderboard(predictor))
+        fitting = leaderboard[leaderboard["estimated_ms_per_row"] <= latency_budget_ms]
+
+    budget = {}
+    while len(fitting):
+        model = fitting.sort_values("score_val", ascending=False).iloc[0]
+        measured_ms = model_latency_ms(predictor, batch, model["model"])
+        budget[model["model"]] = {
+            "latency_budget_ms": latency_budget_ms,
+            "batch_size": batch_size,
+            "estimated_ms_per_row": round(float(model["estimated_ms_per_row"]), 5),
+            "measured_ms_per_row": round(measured_ms, 5),
+            "within_budget": measured_ms <= latency_budget_ms,
+        }
+        if measured_ms <= latency_budget_ms:
+            logger.info(
+                f"{model['model']} fits the latency budget: {measured_ms:.3f} ms/row "
+                f"(budget {latency_budget_ms} ms/row at batch size {batch_size})"
+            )
+            return fitting[fitting["model"] == model["model"]], budget
+        fitting = fitting[fitting["model"] != model["model"]]
+
+    fastest = leaderboard.sort_values("estimated_ms_per_row").iloc[[0]]
+    name = fastest["model"].iloc[0]
+    measured_ms = model_latency_ms(predictor, batch, name)
+    logger.warning(
+        f"No model fits the latency budget of {latency_budget_ms} ms/row; "
+        f"using the fastest model {name} ({measured_ms:.3f} ms/row)"
+    )
+    budget[name] = {
+        "latency_budget_ms": latency_budget_ms,
+        "batch_size": batch_size,
+        "estimated_ms_per_row": round(float(fastest["estimated_ms_per_row"].iloc[0]), 5),
+        "measured_ms_per_row": round(measured_ms, 5),
+        "within_budget": False,
+    }
+    return fastest, budget
+
+
+def load_for_inference(predictor, settings):
+    """
+    Keep the best model of a loaded predictor in memory if configured.
+
+    Parameters
+        predictor : TabularPredictor
+            Predictor loaded from disk.
+        settings : dict
+            Settings returned by inference_settings.
+
+    Returns
+        TabularPredictor
+            The same predictor.
+    """
+    if settings["persist"]:
+        predictor.persist_models(models="best")
+    return predictor
@@ -0,0 +1,215 @@
+import threading
+from utils.logger_config import logger
+from model.auto_ml import train_model
+from model.importance import add_feature_importance, importance_settings
+from config.run_context import RunContext
+from config.update_config import update_config
+from utils.instrumentation import run_report, run_report_path, stage
+
+# Defaults of model.progressive in the model configuration.
+PROGRESSIVE_DEFAULTS = {
+    "enabled": False,
+    "preview_quality": "medium",
+    "preview_time": 10,
+}
+
+
+class ModelHandle:
+    """
+    Predictor proxy whose model is replaced atomically by the full model.
+
+    Attribute access is forwarded to the current predictor, so the handle can
+    be used wherever a TabularPredictor is expected. Each attribute access may
+    see a different model once the full model is swapped in; work that must
+    use one model throughout (e.g. an optimization run) calls pin() once and
+    uses the returned predictor.
+    """
+
+    def __init__(self, predictor, tier="preview"):
+        self._lock = threading.Lock()
+        self._predictor = predictor
+        self.tier = tier
+        self.error = None
+        self.ready = threading.Event()
+
+    @property
+    def predictor(self):
+        """
+        Return the current predictor.
+        """
+        with self._lock:
+            return self._predictor
+
+    def pin(self):
+        """
+        Return the current predictor together with its tier.
+
+        Returns
+            tuple
+                A tuple containing the predictor and its tier ("preview" or "full").
+        """
+        with self._lock:
+            return self._predictor, self.tier
+
+    def swap(self, predictor, tier="full"):
+        """
+        Replace the current predictor.
+
+        Parameters
+            predictor : TabularPredictor
+                The new predictor.
+            tier : str, optional
+                Tier of the new predictor, by default "full".
+        """
+        with self._lock:
+            self._predictor = predictor
+            self.tier = tier
+        self.ready.set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until the full model is swapped in or its training has failed.
+
+        Parameters
+            timeout : float, optional
+                Maximum number of seconds to wait, by default no limit.
+
+        Returns
+            bool
+                True if training has finished, False on timeout.
+        """
+        return self.ready.wait(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.predictor, name)
+
+
+def progressive_settings(model_config):
+    """
+    Return the progressive training settings of a model configuration.
+
+    Parameters
+        model_config : dict
+            The 'model' section of the model configuration; its optional
+            'progressive' entry overrides PROGRESSIVE_DEFAULTS.
+
+    Returns
+        dict
+            The settings with every key of PROGRESSIVE_DEFAULTS; 'enabled' is
+            False when the requested training is not slower than the preview.
+    """
+    settings = dict(PROGRESSIVE_DEFAULTS)
+    settings.update({k: v for k, v in (model_config.get("progressive") or {}).items() if v is not None})
+    if (
+        model_config.get("model_quality") == settings["preview_quality"]
+        and model_config.get("time_to_train", 0) <= settings["preview_time"]
+    ):
+        settings["enabled"] = False
+    return settings
+
+
+def train_preview(data, config, settings, train_index=None):
+    """
+    Train a quick preview model with the preview preset and time limit.
+
+    The requested model settings stay in the configuration, and the preview's
+    results are stored like those of a full training, with
+    model_result['tier'] set to 'preview'. Its feature importance is left to
+    the full model. The preview fit takes a slot of the separate preview pool
+    (model.resources.training_slot), so it does not wait for full trainings,
+    including the background training of an earlier run.
+
+    Parameters
+        data : pd.DataFrame
+            Preprocessed dataset.
+        config : RunContext
+            Run context of the model configuration.
+        settings : dict
+            Settings returned by progressive_settings.
+        train_index : pd.Index, optional
+            Training rows, passed on to train_model.
+
+    Returns
+        tuple
+            A tuple containing:
+                - handle (ModelHandle): Handle of the preview model.
+                - test_df (pd.DataFrame): Test dataset.
+    """
+    requested = config["model"]
+    config["model"] = {
+        **requested,
+        "model_quality": settings["preview_quality"],
+        "time_to_train": settings["preview_time"],
+        "tier": "preview",
+        "importance": {**(requested.get("importance") or {}), "mode": "background"},
+    }
+    try:
+        model, test_df = train_model(data, config, train_index=train_index)
+    finally:
+        config["model"] = requested
+    config["model_result"] = {**config["model_result"], "tier": "preview"}
+    logger.info(f"Preview model trained ({settings['preview_quality']}_quality, {settings['preview_time']}s)")
+    return ModelHandle(model), test_df
+
+
+def submit_full_training(handle, data, config, user_config_path=None, train_index=None):
+    """
+    Train the requested model in a background thread and swap it into the handle.
+
+    Call this after the run context has been flushed for the last time. The
+    thread trains on a context loaded from the model configuration file,
+    writes the full model's results into it and, if given, the user
+    configuration file (model_result with tier 'full', top_models and
+    feature_importance), and then swaps the model into the handle. The full
+    training holds a slot of the train pool for its whole time_to_train and
+    may queue for one; preview fits of other runs are not blocked by it. The
+    thread is not a daemon, so a command-line run waits for it before exiting.
+
+    Parameters
+        handle : ModelHandle
+            Handle of the preview model.
+        data : pd.DataFrame
+            Preprocessed dataset.
+        config : RunContext
+            Flushed run context of the model configuration file.
+        user_config_path : str, optional
+            Path to the user configuration file, by default not updated.
+        train_index : pd.Index, optional
+            Training rows, passed on to train_model.
+
+    Returns
+        threading.Thread
+            The started thread.
+    """
+    model_config_path = config.path
+
+    def job():
+        context = RunContext.load(model_config_path)
+        try:
+            with run_report(run_report_path(context["save_path"])), stage("full_training", data):
+                model, test_df = train_model(data, context, train_index=train_index)
+                if context["model_result"].get("feature_importance", {}).get("status") == "pending":
+                    add_feature_importance(model, test_df, context, importance_settings(context["model"]))
+            context["model_result"] = {**context["model_result"], "tier": "full"}
+            context.flush()
+            if user_config_path:
+                update_config(user_config_path, {
+                    "model_result": context["model_result"],
+                    "top_models": context.artifact_ref("top_models"),
+                    "feature_importance": context.artifact_ref("feature_importance"),
+                })
+        except Exception as e:
+            logger.error(f"Full model training failed; keeping the preview model: {e}")
+            handle.error = str(e)
+            for path in [model_config_path, user_config_path]:
+                if path:
+                    update_config(path, {"model_result": {"tier": "preview", "full_training_error": str(e)}})
+            handle.ready.set()
+            return
+        handle.swap(model)
+        logger.info("Full model swapped in for the preview model.")
+
+    thread = threading.Thread(target=job, name="full-training")
+    thread.start()
+    logger.info("The requested model is trained in the background.")
+    return thread
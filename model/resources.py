@@ -0,0 +1,256 @@
+import fcntl
+import os
+import os.path as osp
+import tempfile
+import time
+from contextlib import contextmanager
+from utils.logger_config import logger
+
+# Number of trainings that may run at once on this node; each gets an equal share.
+# Unset, it is derived from the node size (see default_max_jobs).
+MAX_CONCURRENT_JOBS = int(os.environ["AUTOML_MAX_CONCURRENT_JOBS"]) if os.environ.get(
+    "AUTOML_MAX_CONCURRENT_JOBS"
+) else None
+# Smallest share a training should get when the slot count is derived.
+MIN_CPUS_PER_JOB = 4
+MIN_MEMORY_GB_PER_JOB = 8
+SLOTS_DIR = osp.join(tempfile.gettempdir(), "automl_training_slots")
+# Preview fits (see model.progressive) use their own pool, so they never queue
+# behind full trainings. The pool owns PREVIEW_SHARE of the node's CPUs and
+# memory and no GPUs; the train slots split the rest.
+PREVIEW_MAX_JOBS = int(os.environ.get("AUTOML_PREVIEW_MAX_JOBS", "2"))
+PREVIEW_SHARE = float(os.environ.get("AUTOML_PREVIEW_SHARE", "0.25"))
+PREVIEW_SLOTS_DIR = osp.join(tempfile.gettempdir(), "automl_preview_slots")
+SLOT_POOLS = {
+    "train": (MAX_CONCURRENT_JOBS, SLOTS_DIR),
+    "preview": (PREVIEW_MAX_JOBS, PREVIEW_SLOTS_DIR),
+}
+SLOT_POLL_SECONDS = 5
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+CGROUP_MEMORY_CURRENT = "/sys/fs/cgroup/memory.current"
+MEMINFO = "/proc/meminfo"
+
+
+def detect_resources():
+    """
+    Detect the CPUs, GPUs and memory available to this process.
+
+    CPUs are limited by the CPU affinity and the cgroup CPU quota, memory by
+    MemTotal and the cgroup memory limit. The total rather than MemAvailable
+    is what the slots share, because the memory of trainings already running
+    is not available, yet it belongs to their slots. The memory available
+    right now (MemAvailable, or the cgroup limit minus its usage) is reported
+    separately. GPUs are counted with torch (installed with AutoGluon); none
+    are reported if it is missing or CUDA_VISIBLE_DEVICES is empty.
+
+    Returns
+        dict
+            Dictionary with the keys cpus (int), gpus (int), memory_gb and
+            available_memory_gb (float or None if unknown).
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = _read_first_line(CGROUP_CPU_MAX)
+    if quota and not quota.startswith("max"):
+        limit, period = quota.split()[:2]
+        cpus = max(1, min(cpus, int(int(limit) / int(period))))
+
+    memory, available = [], []
+    meminfo = _read_meminfo()
+    if "MemTotal" in meminfo:
+        memory.append(meminfo["MemTotal"] * 1024)
+    if "MemAvailable" in meminfo:
+        available.append(meminfo["MemAvailable"] * 1024)
+    limit = _read_first_line(CGROUP_MEMORY_MAX)
+    if limit and limit.isdigit():
+        memory.append(int(limit))
+        usage = _read_first_line(CGROUP_MEMORY_CURRENT)
+        if usage and usage.isdigit():
+            available.append(max(0, int(limit) - int(usage)))
+
+    return {
+        "cpus": cpus,
+        "gpus": _count_gpus(),
+        "memory_gb": round(min(memory) / 1024 ** 3, 2) if memory else None,
+        "available_memory_gb": round(min(available) / 1024 ** 3, 2) if available else None,
+    }
+
+
+def default_max_jobs(resources=None):
+    """
+    Derive the number of concurrent trainings from the node size.
+
+    Every training gets at least MIN_CPUS_PER_JOB CPUs and
+    MIN_MEMORY_GB_PER_JOB GB of the train pool's share of the node. Operators
+    can override the result with the environment variable
+    AUTOML_MAX_CONCURRENT_JOBS.
+
+    Parameters
+        resources : dict, optional
+            Detected resources, by default the result of detect_resources().
+
+    Returns
+        int
+            Number of training slots, at least 1.
+    """
+    resources = resources or detect_resources()
+    share = _pool_share("train")
+    jobs = int(resources["cpus"] * share) // MIN_CPUS_PER_JOB
+    if resources["memory_gb"]:
+        jobs = min(jobs, int(resources["memory_gb"] * share // MIN_MEMORY_GB_PER_JOB))
+    return max(1, jobs)
+
+
+def plan_resources(slot=0, slots=1, resources=None, pool="train"):
+    """
+    Split a pool's share of the node between its slots and return one share.
+
+    The "preview" pool owns PREVIEW_SHARE of the CPUs and memory and no GPUs;
+    the "train" pool owns the rest and every GPU, so previews running next to
+    full trainings do not oversubscribe the node.
+
+    AutoGluon checks max_memory_usage_ratio against the memory available when
+    a model is fit, not against the node's total, so the ratio in ag_args_fit
+    is the slot's memory share divided by the memory available when the slot
+    is taken (at most 1). It caps each model at about memory_gb as long as the
+    other jobs' usage does not grow; AutoGluon uses it to skip models whose
+    estimated memory exceeds it, it is not a hard limit.
+
+    Parameters
+        slot : int, optional
+            Index of the training slot, by default 0.
+        slots : int, optional
+            Number of slots of the pool, by default 1.
+        resources : dict, optional
+            Detected resources, by default the result of detect_resources().
+        pool : str, optional
+            Slot pool; "train" or "preview", by default "train".
+
+    Returns
+        dict
+            Resource plan with the keys:
+                - num_cpus (int): CPU cores for this training.
+                - num_gpus (int): GPUs for this training.
+                - memory_gb (float or None): Memory share of this training.
+                - ag_args_fit (dict): Per-model arguments for TabularPredictor.fit
+                  (max_memory_usage_ratio) that cap each model at that share.
+                - slot (int), slots (int), pool (str): The slot, number of
+                  slots and pool.
+                - detected (dict): The detected resources.
+    """
+    resources = resources or detect_resources()
+    slots = max(1, slots)
+    share = _pool_share(pool)
+    num_cpus = max(1, int(resources["cpus"] * share) // slots)
+    gpus = resources["gpus"] if pool == "train" else 0
+    if gpus >= slots:
+        num_gpus = gpus // slots
+    else:
+        # Fewer GPUs than slots: the first slots get one GPU each.
+        num_gpus = 1 if slot < gpus else 0
+    memory_gb = round(resources["memory_gb"] * share / slots, 2) if resources["memory_gb"] else None
+    ratio = 1.0 / slots
+    if memory_gb and resources.get("available_memory_gb"):
+        ratio = min(1.0, memory_gb / resources["available_memory_gb"])
+
+    return {
+        "num_cpus": num_cpus,
+        "num_gpus": num_gpus,
+        "memory_gb": memory_gb,
+        "ag_args_fit": {"max_memory_usage_ratio": round(ratio, 4)},
+        "slot": slot,
+        "slots": slots,
+        "pool": pool,
+        "detected": resources,
+    }
+
+
+@contextmanager
+def training_slot(max_jobs=None, slots_dir=None, pool="train"):
+    """
+    Hold one of the node's training slots, waiting until one is free.
+
+    Slots are advisory file locks shared by all processes on the node, so at
+    most max_jobs trainings run at once and each uses its own resource share.
+    The "preview" pool is separate from the "train" pool: a quick preview fit
+    waits only for other previews, not for a full training (e.g. the
+    background training of model.progressive) holding every train slot.
+
+    Parameters
+        max_jobs : int, optional
+            Number of slots, by default that of the pool: MAX_CONCURRENT_JOBS
+            (environment variable AUTOML_MAX_CONCURRENT_JOBS, or
+            default_max_jobs() if unset) or
+            PREVIEW_MAX_JOBS (AUTOML_PREVIEW_MAX_JOBS).
+        slots_dir : str, optional
+            Directory of the slot lock files, by default that of the pool.
+        pool : str, optional
+            Slot pool; "train" or "preview", by default "train".
+
+    Yields
+        dict
+            Resource plan of the slot, as returned by plan_resources.
+    """
+    pool_jobs, pool_dir = SLOT_POOLS[pool]
+    max_jobs = max(1, max_jobs or pool_jobs or default_max_jobs())
+    slots_dir = slots_dir or pool_dir
+    os.makedirs(slots_dir, exist_ok=True)
+    waited = False
+    while True:
+        for slot in range(max_jobs):
+            f = open(osp.join(slots_dir, f"slot-{slot}.lock"), "a")
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+            try:
+                plan = plan_resources(slot, max_jobs, pool=pool)
+                logger.info(
+                    f"Training slot {slot + 1}/{max_jobs} ({pool}): {plan['num_cpus']} CPUs, "
+                    f"{plan['num_gpus']} GPUs, memory {plan['memory_gb']} GB"
+                )
+                yield plan
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                f.close()
+            return
+        if not waited:
+            logger.info(f"All {max_jobs} {pool} slots are busy; waiting for a free slot...")
+            waited = True
+        time.sleep(SLOT_POLL_SECONDS)
+
+
+def _pool_share(pool):
+    preview_share = min(max(PREVIEW_SHARE, 0.0), 1.0) if PREVIEW_MAX_JOBS > 0 else 0.0
+    return preview_share if pool == "preview" else 1.0 - preview_share
+
+
+def _count_gpus():
+    if os.environ.get("CUDA_VISIBLE_DEVICES") == "":
+        return 0
+    try:
+        import torch
+    except ImportError:
+        return 0
+    return torch.cuda.device_count() if torch.cuda.is_available() else 0
+
+
+def _read_first_line(path):
+    try:
+        with open(path, "r") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def _read_meminfo():
+    values = {}
+    try:
+        with open(MEMINFO, "r") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                values[key] = int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return values
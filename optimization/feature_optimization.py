@@ -3,9 +3,9 @@ import pandas as pd
 import numpy as np
 from .optimization import optimizeing_features
 from utils.print_feature_type import compare_features
-from omegaconf import OmegaConf
 from utils.logger_config import logger
 from config.update_config import update_config
+from config.run_context import resolve_context
 
 
 def feature_optimize(model_config_path, user_config_path, model, test_df):
@@ -15,15 +15,19 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
     This function adjusts feature values to improve model predictions.
     Depending on the task type ('regression' or 'classification') specified in
     the configuration file, it applies different optimization strategies and
-    returns a dictionary summarizing the results.
+    returns a dictionary summarizing the results. The optional optimization
+    keys sampler, batch_size and seed select the Optuna sampler and the number
+    of trials scored per model call. A progressive-training ModelHandle is
+    pinned once, so every prediction of the run comes from the same model, and
+    the tier of that model is stored with the results as model_tier.
 
     Parameters
-        model_config_path : str
-            Path to the model configuration file in OmegaConf format.
+        model_config_path : str or RunContext
+            Path to the model configuration file, or the in-memory run context.
         user_config_path : str
             Path to the user configuration file that will be updated with the results.
         model : object
-            Trained model with a predict() method.
+            Trained model with a predict() method, or a ModelHandle.
         test_df : pandas.DataFrame
             DataFrame containing test or validation data.
 
@@ -33,15 +37,21 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
                 - 'task': 'regression'
                 - 'results': List of optimization results per sample.
                 - 'average_improvement': Average improvement value.
+                - 'model_tier': Tier of the model used ('preview' or 'full').
             For classification tasks, returns a dictionary with keys:
                 - 'task': 'classification'
                 - 'target_class': The target class optimized for.
                 - 'results': List of optimization results per sample.
                 - 'count_changed_to_target': Number of samples changed to the target class.
                 - 'ratio_changed_to_target': Ratio of samples changed to the target class.
+                - 'model_tier': Tier of the model used ('preview' or 'full').
             Returns None if classification optimization cannot proceed.
     """
-    config = OmegaConf.load(model_config_path)
+    config, _ = resolve_context(model_config_path)
+    if hasattr(model, "pin"):
+        model, model_tier = model.pin()
+    else:
+        model_tier = (config.get("model_result") or {}).get("tier", "full")
     task = config.get("task")
     categorical_features = config.get("categorical_features")
     X_features = config.get("final_features")
@@ -51,6 +61,11 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
     n_trials = opt_config["n_trials"]
     target_class = opt_config["target_class"]
     feature_bounds = opt_config["opt_range"]
+    search_options = {
+        "sampler": opt_config.get("sampler"),
+        "batch_size": opt_config.get("batch_size") or 1,
+        "seed": opt_config.get("seed"),
+    }
 
     logging.info(f"Features to optimize: {list(feature_bounds.keys())}")
     logging.info(f"Feature bounds: {feature_bounds}")
@@ -78,6 +93,7 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
                     direction=direction,
                     n_trials=n_trials,
                     target_class=target_class,
+                    **search_options,
                 )
                 logging.info(f"[Regression] index={idx}")
                 logging.info(f"   Original pred:  {orig_pred}")
@@ -124,6 +140,7 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
             "task": "regression",
             "results": results_list,
             "average_improvement": float(avg_improvement),
+            "model_tier": model_tier,
         }
 
         update_config(user_config_path, final_dict)
@@ -160,6 +177,7 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
                     direction=direction,
                     n_trials=n_trials,
                     target_class=target_class,
+                    **search_options,
                 )
             except Exception as e:
                 logger.error(f"Optimization failed for index {idx}: {e}")
@@ -216,6 +234,7 @@ def feature_optimize(model_config_path, user_config_path, model, test_df):
             "results": results_list,
             "count_changed_to_target": count_changed_to_target,
             "ratio_changed_to_target": ratio,
+            "model_tier": model_tier,
         }
 
         update_config(user_config_path, final_dict)
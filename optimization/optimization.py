@@ -1,7 +1,50 @@
+import time
 import optuna
 import pandas as pd
 from autogluon.tabular import TabularPredictor
 import logging
+from utils.instrumentation import record_latencies
+
+# Samplers selectable by name in the optimization config.
+SAMPLERS = {
+    "tpe": optuna.samplers.TPESampler,
+    "random": optuna.samplers.RandomSampler,
+    "qmc": optuna.samplers.QMCSampler,
+    "cmaes": optuna.samplers.CmaEsSampler,
+}
+
+
+def make_sampler(sampler=None, seed=None, batch_size=1):
+    """
+    Create an Optuna sampler from its name.
+
+    Parameters
+        sampler : str or optuna.samplers.BaseSampler, optional
+            One of SAMPLERS, or a sampler instance that is returned as is,
+            by default "tpe" (Optuna's default).
+        seed : int, optional
+            Random seed of the sampler, by default None.
+        batch_size : int, optional
+            Number of trials asked before their results are told. TPE uses the
+            constant liar strategy when it is larger than 1, so that the trials
+            of one batch do not all suggest the same point, by default 1.
+
+    Returns
+        optuna.samplers.BaseSampler
+            The sampler.
+
+    Raises
+        ValueError
+            If the sampler name is unknown.
+    """
+    if isinstance(sampler, optuna.samplers.BaseSampler):
+        return sampler
+    sampler = sampler or "tpe"
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{sampler}'; expected one of {list(SAMPLERS)}")
+    if sampler == "tpe":
+        return optuna.samplers.TPESampler(seed=seed, constant_liar=batch_size > 1)
+    return SAMPLERS[sampler](seed=seed)
 
 
 def optimizeing_features(predictor: TabularPredictor,
@@ -11,10 +54,20 @@ def optimizeing_features(predictor: TabularPredictor,
                          task: str,
                          direction: str,
                          n_trials: int = 100,
-                         target_class: str = None):
+                         target_class: str = None,
+                         sampler=None,
+                         batch_size: int = 1,
+                         seed: int = None,
+                         callbacks: list = None):
     """
     Optimize features of a sample to maximize or minimize the target prediction.
 
+    Trials are run with Optuna's ask/tell interface: batch_size trials are
+    asked at once and scored with a single model call on a batch of rows,
+    which amortizes the per-call overhead of the predictor. The duration of
+    every trial and of every model call is added to the run report of the
+    current pipeline call.
+
     Parameters
         predictor : TabularPredictor
             Trained AutoGluon TabularPredictor model.
@@ -32,6 +85,15 @@ def optimizeing_features(predictor: TabularPredictor,
             Number of optimization trials (default is 100).
         target_class : str, optional
             Target class for binary or multiclass tasks (default is None).
+        sampler : str or optuna.samplers.BaseSampler, optional
+            Sampler name (see SAMPLERS) or instance (default is TPE).
+        batch_size : int, optional
+            Number of trials scored per model call (default is 1).
+        seed : int, optional
+            Random seed of the sampler (default is None).
+        callbacks : list of callable, optional
+            Functions called with (study, trial) after each finished trial,
+            like the callbacks of Study.optimize (default is None).
 
     Returns
         tuple
@@ -45,10 +107,14 @@ def optimizeing_features(predictor: TabularPredictor,
         raise ValueError("Direction must be either 'maximize' or 'minimize'")
     if task not in ['regression', 'binary', 'multiclass']:
         raise ValueError("Task must be one of 'regression', 'binary', or 'multiclass'")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if hasattr(predictor, "pin"):
+        # Use one model for the whole study even if a ModelHandle is swapped meanwhile.
+        predictor, _ = predictor.pin()
 
-    original_df = pd.DataFrame([original_features.to_dict()])
+    class_index = None
     if task in ['binary', 'multiclass']:
-        proba = predictor.predict_proba(original_df)
         local_target_class = target_class
         if task == 'binary':
             if local_target_class is None:
@@ -61,11 +127,17 @@ def optimizeing_features(predictor: TabularPredictor,
                 f"target_class '{local_target_class}' not found in model's class labels."
             )
         class_index = predictor.class_labels.index(local_target_class)
-        original_prediction = proba.iloc[0, class_index]
-    else:
-        original_prediction = predictor.predict(original_df).iloc[0]
 
-    def objective(trial):
+    def predict_values(rows):
+        # One model call for all rows; returns the objective value of each row.
+        df = pd.DataFrame(rows)
+        if class_index is not None:
+            return predictor.predict_proba(df).iloc[:, class_index].tolist()
+        return predictor.predict(df).tolist()
+
+    original_prediction = predict_values([original_features.to_dict()])[0]
+
+    def suggest(trial):
         modified_features = original_features.copy()
         for feature, (low, high) in feature_bounds.items():
             if feature in categorical_features:
@@ -81,26 +153,38 @@ def optimizeing_features(predictor: TabularPredictor,
                     if low > high:
                         low, high = high, low
                     low_bound, high_bound = low, high
-                modified_features[feature] = trial.suggest_uniform(
+                modified_features[feature] = trial.suggest_float(
                     feature, low_bound, high_bound
                 )
-        modified_df = pd.DataFrame([modified_features.to_dict()])
-        if task in ['binary', 'multiclass']:
-            proba = predictor.predict_proba(modified_df)
-            local_tc = target_class
-            if task == 'binary':
-                if local_tc is None:
-                    local_tc = predictor.class_labels[1]
-            else:
-                if local_tc is None:
-                    local_tc = predictor.class_labels[-1]
-            class_index_ = predictor.class_labels.index(local_tc)
-            return proba.iloc[0, class_index_]
-        else:
-            return predictor.predict(modified_df).iloc[0]
+        return modified_features.to_dict()
+
+    trial_latencies = []
+    call_latencies = []
+    study = optuna.create_study(
+        direction=direction, sampler=make_sampler(sampler, seed, batch_size)
+    )
+    optimize_start = time.perf_counter()
+    while len(trial_latencies) < n_trials:
+        batch_start = time.perf_counter()
+        trials = [study.ask() for _ in range(min(batch_size, n_trials - len(trial_latencies)))]
+        rows = [suggest(trial) for trial in trials]
+        call_start = time.perf_counter()
+        values = predict_values(rows)
+        call_latencies.append(time.perf_counter() - call_start)
+        for trial, value in zip(trials, values):
+            frozen_trial = study.tell(trial, value)
+            for callback in callbacks or []:
+                callback(study, frozen_trial)
+        trial_latencies += [(time.perf_counter() - batch_start) / len(trials)] * len(trials)
+    elapsed = time.perf_counter() - optimize_start
+    record_latencies("optimization.trial", trial_latencies)
+    record_latencies("optimization.model_call", call_latencies)
+    logging.info(
+        f"{len(trial_latencies)} trials in {elapsed:.2f}s "
+        f"({len(trial_latencies) / max(elapsed, 1e-9):.1f} trials/s, "
+        f"{len(call_latencies)} model calls, model time {sum(call_latencies):.2f}s)"
+    )
 
-    study = optuna.create_study(direction=direction)
-    study.optimize(objective, n_trials=n_trials)
     best_trial = study.best_trial
     best_features = original_features.copy()
     for feature in feature_bounds.keys():
@@ -113,4 +197,4 @@ def optimizeing_features(predictor: TabularPredictor,
         improvement = best_prediction - original_prediction
     else:
         improvement = original_prediction - best_prediction
-    return best_features.to_dict(), best_prediction, original_prediction, improvement
\ No newline at end of file
+    return best_features.to_dict(), best_prediction, original_prediction, improvement
@@ -1,23 +1,60 @@
+import os.path as osp
 from omegaconf import OmegaConf
-from config.config_generator import generate_config
+from config.config_generator import generate_config, generate_eda_report
 from config.update_config import update_config
+from config.run_context import resolve_context
+from config.config_store import config_lock
 from data.model_input_builder import feature_selection, make_filtered_data
-from data.data_preprocess import preprocessing
+from data.data_preprocess import preprocessing, split_index
+from data.dataset_handle import as_dataset, open_dataset
 from utils.determine_feature import determine_problem_type
 from utils.user_feature import user_feature
 from model.auto_ml import train_model
+from model.importance import submit_feature_importance
+from model.progressive import progressive_settings, submit_full_training, train_preview
 from optimization.feature_optimization import feature_optimize
+from utils.instrumentation import run_report, run_report_path, stage
 from utils.logger_config import logger
 from gpt import gpt_solution
 
 
-def process_1(data_path):
+def process_1(
+    data_path,
+    eda_report=False,
+    row_budget=None,
+    target=None,
+    run_id=None,
+    cache_columnar=False,
+    content_hash=None,
+    columnar_path=None,
+):
     """Load data and generate configuration files.
 
+    Stage timings are merged into run_report.json in the run workspace.
+
     Parameters
     ----------
     data_path : str
         Path to the input data.
+    eda_report : bool, optional
+        Whether to render the EDA HTML report before returning. When False the
+        report can be rendered later with process_eda_report, by default False.
+    row_budget : int, optional
+        Maximum number of rows profiled for the EDA, by default None (all rows).
+    target : str, optional
+        Target column to stratify the EDA sample on, by default None.
+    run_id : str, optional
+        Identifier of the run; its files are written to a separate workspace,
+        by default None.
+    cache_columnar : bool, optional
+        Whether to write an Arrow IPC copy of the data next to the CSV, which
+        later runs memory-map instead of parsing the CSV. Skipped when the
+        sketch EDA engine did not load the data, by default False.
+    content_hash : str, optional
+        Content hash of the dataset; EDA results and trained models are shared
+        between runs on identical data, by default None.
+    columnar_path : str, optional
+        Path to a columnar copy of the dataset, by default None.
 
     Returns
     -------
@@ -25,25 +62,84 @@ def process_1(data_path):
         A tuple containing:
             - model_config_path (str): Path to the model configuration file.
             - user_config_path (str): Path to the user configuration file.
-            - original_df (pandas.DataFrame): Loaded input data.
+            - dataset (DatasetHandle): Handle of the input data, shared with
+              the later stages so the file is parsed only once.
     """
     logger.info(f"📂 데이터 로드 시작: {data_path}")
-    model_config_path, user_config_path, original_df = generate_config(data_path)
+    with run_report() as report, stage("process_1"):
+        # generate_config reads the data through the same handle.
+        dataset = open_dataset(data_path, columnar_path=columnar_path)
+        model_config_path, user_config_path, _ = generate_config(
+            data_path,
+            eda_report=eda_report,
+            row_budget=row_budget,
+            target=target,
+            run_id=run_id,
+            content_hash=content_hash,
+            columnar_path=columnar_path,
+        )
+        report.path = run_report_path(osp.dirname(model_config_path))
+        if cache_columnar and dataset.loaded and dataset.columnar_path is None:
+            with stage("cache_columnar", dataset.data):
+                dataset.cache()
     logger.info("✅ 데이터 로드 완료")
-    return model_config_path, user_config_path, original_df
+    return model_config_path, user_config_path, dataset
+
+
+def process_eda_report(user_config_path):
+    """Render the EDA HTML report of a dataset after process_1 has returned.
+
+    A report stored in the shared directory of identical data is reused.
+
+    Parameters
+    ----------
+    user_config_path : str
+        Path to the user configuration file created by process_1.
+
+    Returns
+    -------
+    str
+        Path to the rendered HTML report.
+    """
+    user_config = OmegaConf.load(user_config_path)
+    model_config = OmegaConf.load(user_config["model_config_path"])
+    eda_html_path = user_config["eda_html_path"]
+    with config_lock(eda_html_path):
+        if model_config.get("content_hash") and osp.exists(eda_html_path):
+            logger.info("✅ 동일한 데이터의 EDA 리포트를 재사용합니다")
+            return eda_html_path
+        logger.info("📝 EDA 리포트 생성 시작...")
+        eda_html_path = generate_eda_report(
+            model_config["data_path"], eda_html_path, model_config.get("columnar_path")
+        )
+    logger.info("✅ EDA 리포트 생성 완료")
+    return eda_html_path
 
 
-def process_2(model_config_path, user_config_path, original_df):
+def process_2(model_config_path, user_config_path, dataset, config_updates=None):
     """Update configuration, preprocess data, and train the model.
 
+    The model configuration is loaded once into a RunContext that is passed to
+    every stage, and written back after training and at the end. Stage timings
+    are merged into run_report.json in the run workspace. With
+    model.importance.mode set to 'background', the feature importance is
+    computed after the configurations are written and filled into both of them
+    when it is done. With model.progressive.enabled, a quick preview model is
+    trained and published first, and the requested model is trained in the
+    background and swapped into the returned model handle when it is done.
+
     Parameters
     ----------
-    model_config_path : str
-        Path to the model configuration file.
+    model_config_path : str or RunContext
+        Path to the model configuration file, or the in-memory run context.
     user_config_path : str
         Path to the user configuration file.
-    original_df : pandas.DataFrame
-        The original input data.
+    dataset : DatasetHandle, pandas.DataFrame or None
+        Handle returned by process_1, or the original input data. The data is
+        loaded from data_path on first use if it has not been loaded yet.
+    config_updates : dict, optional
+        User settings (target, controllable/necessary features, model options)
+        merged into the model configuration, by default the demo settings.
 
     Returns
     -------
@@ -51,39 +147,78 @@ def process_2(model_config_path, user_config_path, original_df):
         A tuple containing:
             - updated model_config_path (str)
             - updated user_config_path (str)
-            - model: Trained model object.
+            - model: Trained model object, or a ModelHandle of the preview
+              model with progressive training.
             - preprocessed_df (pandas.DataFrame): Preprocessed data.
             - preprocessor: Preprocessing object.
     """
     logger.info("📊 사용자 설정을 업데이트합니다...")
-    config_updates = {
-        "target_feature": "Attrition",
-        "controllable_feature": ["MonthlyIncome", "WorkLifeBalance"],
-        "necessary_feature": ["Age", "Education", "DistanceFromHome", "OverTime"],
-        "limited_feature": 10,
-        "model": {"time_to_train": 100, "model_quality": "best"}
-    }
-    model_config_path = update_config(model_config_path, config_updates)
-    determine_problem_type(model_config_path)
-    logger.info("🎯 Feature Selection 진행 중...")
-    feature_selection(model_config_path)
-    df = make_filtered_data(model_config_path, original_df)
-    logger.info("🛠 데이터 전처리 시작...")
-    preprocessed_df, preprocessor = preprocessing(df, model_config_path)
-    logger.info("🚀 모델 학습 시작...")
-    model, _ = train_model(preprocessed_df, model_config_path)
-    logger.info("✅ 모델 학습 완료")
-    update_config_info = user_feature(df, model_config_path)
-    user_config_path = update_config(user_config_path, update_config_info)
+    if config_updates is None:
+        config_updates = {
+            "target_feature": "Attrition",
+            "controllable_feature": ["MonthlyIncome", "WorkLifeBalance"],
+            "necessary_feature": ["Age", "Education", "DistanceFromHome", "OverTime"],
+            "limited_feature": 10,
+            "model": {
+                "time_to_train": 100,
+                "model_quality": "best",
+                "progressive": {"enabled": True},
+            }
+        }
+    context, _ = resolve_context(model_config_path)
+    context.update(config_updates)
+    with run_report(run_report_path(context["save_path"])), stage("process_2"):
+        dataset = as_dataset(dataset, context["data_path"], context.get("columnar_path"))
+        with stage("determine_problem_type"):
+            determine_problem_type(context, dataset=dataset)
+        with stage("load_data") as record:
+            original_df = dataset.data
+            record["rows"], record["cols"] = original_df.shape
+        logger.info("🎯 Feature Selection 진행 중...")
+        with stage("feature_selection", original_df):
+            feature_selection(context, data=original_df)
+        with stage("make_filtered_data") as record:
+            df = make_filtered_data(context, original_df)
+            record["rows"], record["cols"] = df.shape
+        # 학습/테스트 분할은 한 번만 하고, 전처리와 모델 학습에 같은 인덱스를 사용
+        train_index, _ = split_index(df, context["task"], context["target_feature"])
+        logger.info("🛠 데이터 전처리 시작...")
+        with stage("preprocessing", df):
+            preprocessed_df, preprocessor = preprocessing(df, context, train_index)
+        logger.info("🚀 모델 학습 시작...")
+        progressive = progressive_settings(context["model"])
+        with stage("train_model", preprocessed_df):
+            if progressive["enabled"]:
+                # 미리보기 모델을 먼저 학습하고, 요청한 모델은 백그라운드에서 학습
+                model, test_df = train_preview(preprocessed_df, context, progressive, train_index)
+            else:
+                model, test_df = train_model(preprocessed_df, context, train_index=train_index)
+        model_config_path = context.flush()
+        logger.info("✅ 모델 학습 완료")
+        with stage("user_feature", df):
+            update_config_info = user_feature(df, context)
+        user_config_path = update_config(user_config_path, update_config_info)
+        model_config_path = context.flush()
+    if progressive["enabled"]:
+        logger.info("⏳ 요청한 모델을 백그라운드에서 학습합니다...")
+        submit_full_training(model, preprocessed_df, context, user_config_path, train_index)
+    elif context["model_result"].get("feature_importance", {}).get("status") == "pending":
+        logger.info("🔍 Feature Importance를 백그라운드에서 계산합니다...")
+        submit_feature_importance(model, test_df, context, user_config_path)
     return model_config_path, user_config_path, model, preprocessed_df, preprocessor
 
 
-def process_3(model_config_path, user_config_path, model, preprocessed_df, preprocessor):
+def process_3(
+    model_config_path, user_config_path, model, preprocessed_df, preprocessor, config_updates=None
+):
     """Perform feature optimization using the trained model.
 
+    Stage timings and the latency of every model call made by the optimizer
+    are merged into run_report.json in the run workspace.
+
     Parameters
-        model_config_path : str
-            Path to the model configuration file.
+        model_config_path : str or RunContext
+            Path to the model configuration file, or the in-memory run context.
         user_config_path : str
             Path to the user configuration file.
         model : object
@@ -92,6 +227,9 @@ def process_3(model_config_path, user_config_path, model, preprocessed_df, prepr
             Preprocessed data.
         preprocessor : object
             Preprocessing object used to decode the data.
+        config_updates : dict, optional
+            Optimization settings (direction, n_trials, target_class, opt_range)
+            merged into the model configuration, by default the demo settings.
 
     Returns
         tuple
@@ -100,27 +238,32 @@ def process_3(model_config_path, user_config_path, model, preprocessed_df, prepr
                 - user_config_path (str): Updated user configuration file path.
     """
     logger.info("🔍 Feature Optimization 시작...")
-    model_config = OmegaConf.load(model_config_path)
-    controllable_feature = model_config["controllable_feature"]
-    config_updates = {
-        "optimization": {
-            "direction": "maximize",
-            "n_trials": 15,
-            "target_class": 0,
-            "opt_range": {
-                "MonthlyIncome": [20, 20],
-                "WorkLifeBalance": [0, 3]
+    context, _ = resolve_context(model_config_path)
+    controllable_feature = context["controllable_feature"]
+    if config_updates is None:
+        config_updates = {
+            "optimization": {
+                "direction": "maximize",
+                "n_trials": 15,
+                "target_class": 0,
+                "opt_range": {
+                    "MonthlyIncome": [20, 20],
+                    "WorkLifeBalance": [0, 3]
+                }
             }
         }
-    }
-    model_config_path = update_config(model_config_path, config_updates)
-    logger.info("📉 데이터 디코딩 진행 중...")
-    preprocessed_df = preprocessor.decode(preprocessed_df, controllable_feature)
-    print("\n\n------------------Decoding-----------------")
-    print(preprocessed_df)
-    print("\n\n")
-    logger.info("⚡ 최적화 알고리즘 실행...")
-    final_dict = feature_optimize(model_config_path, user_config_path, model, preprocessed_df)
+    context.update(config_updates)
+    context.flush()
+    with run_report(run_report_path(context["save_path"])), stage("process_3"):
+        logger.info("📉 데이터 디코딩 진행 중...")
+        with stage("decode", preprocessed_df):
+            preprocessed_df = preprocessor.decode(preprocessed_df, controllable_feature)
+        print("\n\n------------------Decoding-----------------")
+        print(preprocessed_df)
+        print("\n\n")
+        logger.info("⚡ 최적화 알고리즘 실행...")
+        with stage("feature_optimize", preprocessed_df):
+            final_dict = feature_optimize(context, user_config_path, model, preprocessed_df)
     logger.info("✅ Feature Optimization 완료!")
     return final_dict, user_config_path
 
@@ -128,9 +271,9 @@ def process_3(model_config_path, user_config_path, model, preprocessed_df, prepr
 if __name__ == "__main__":
     data_path = "/data/ephemeral/home/level4-cv-finalproject-hackathon-cv-22-lv3/base_merged_data.csv"
     logger.info("🚀 AutoML 파이프라인 실행 시작!")
-    model_config_path, user_config_path, original_df = process_1(data_path)
+    model_config_path, user_config_path, dataset = process_1(data_path)
     model_config_path, user_config_path, model, preprocessed_df, preprocessor = process_2(
-        model_config_path, user_config_path, original_df
+        model_config_path, user_config_path, dataset
     )
     final_dict, user_config_path = process_3(
         model_config_path, user_config_path, model, preprocessed_df, preprocessor
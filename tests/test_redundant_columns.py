@@ -0,0 +1,67 @@
+"""
+Redundant columns dropped by generate_config must not reach the training data.
+
+Runs generate_config -> process_2 on a small HR-like dataset with constant,
+all-null and duplicate columns (requires AutoGluon).
+"""
+
+import os.path as osp
+import sys
+
+import pytest
+
+pytest.importorskip("autogluon.tabular")
+sys.path.append(osp.abspath(osp.join(osp.dirname(__file__), "..")))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from config.config_generator import generate_config  # noqa: E402
+from config.run_context import RunContext  # noqa: E402
+from process.process import process_2  # noqa: E402
+
+ROWS = 400
+
+
+def _write_dataset(path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "Age": rng.integers(18, 60, ROWS),
+        "MonthlyIncome": rng.normal(5000, 1000, ROWS).round(),
+        "WorkLifeBalance": rng.integers(1, 5, ROWS),
+        "Department": rng.choice(["HR", "R&D", "Sales"], ROWS),
+        "EmployeeCount": 1,
+        "Over18": "Y",
+        "StandardHours": 80,
+        "Empty": np.nan,
+    })
+    data["Attrition"] = np.where(data["MonthlyIncome"] < 4500, "Yes", "No")
+    data["IncomeCopy"] = data["MonthlyIncome"]
+    data.to_csv(path, index=False)
+
+
+def test_dropped_columns_are_absent_from_training_data(tmp_path):
+    data_path = str(tmp_path / "hr.csv")
+    _write_dataset(data_path)
+    model_config_path, user_config_path, _ = generate_config(data_path, eda_engine="native")
+
+    dropped_columns = RunContext.load(model_config_path)["dropped_columns"]
+    dropped = set(
+        dropped_columns["all_null"] + dropped_columns["constant"] + list(dropped_columns["duplicate"])
+    )
+    assert dropped == {"Empty", "EmployeeCount", "Over18", "StandardHours", "IncomeCopy"}
+
+    _, _, _, preprocessed_df, _ = process_2(
+        model_config_path,
+        user_config_path,
+        None,
+        config_updates={
+            "target_feature": "Attrition",
+            "controllable_feature": ["MonthlyIncome"],
+            "necessary_feature": ["Age"],
+            "limited_feature": -1,
+            "model": {"time_to_train": 10, "model_quality": "medium"},
+        },
+    )
+
+    assert dropped.isdisjoint(preprocessed_df.columns)
+    assert {"Age", "MonthlyIncome", "Attrition"} <= set(preprocessed_df.columns)
@@ -0,0 +1,250 @@
+import json
+import os.path as osp
+import resource
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from config.config_store import RUN_REPORT_FILENAME, config_lock, write_json
+from utils.logger_config import logger
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Report of the pipeline call running in the current context; None when nothing is recorded.
+_REPORT = ContextVar("run_report", default=None)
+kst = timezone(timedelta(hours=9))
+
+
+class RunReport:
+    """
+    Machine-readable timings of one pipeline call (process_1, process_2 or process_3).
+
+    Stages are recorded in the order they finish, each with its wall time, CPU
+    time, memory high-water mark and the size of the data it worked on. Latency
+    samples (e.g. one per model call in the optimizer) are kept separately and
+    summarized as percentiles.
+    """
+
+    def __init__(self, path=None):
+        """
+        Parameters
+            path : str, optional
+                Path of the run report file. When it is set, the report is
+                written there when run_report exits, by default None.
+        """
+        self.path = path
+        self.stages = []
+        self.latencies = {}
+        self._stack = []
+
+    def add_latencies(self, name, seconds):
+        """
+        Add latency samples of a repeated operation.
+
+        Parameters
+            name : str
+                Name of the operation, e.g. 'optimization.model_call'.
+            seconds : list of float
+                Duration of each call in seconds.
+        """
+        self.latencies.setdefault(name, []).extend(seconds)
+
+    def to_dict(self):
+        """
+        Return the report as a JSON-serializable dictionary.
+
+        Returns
+            dict
+                Dictionary with the keys 'stages' (list of stage records) and
+                'latencies' (summary per operation).
+        """
+        return {
+            "stages": list(self.stages),
+            "latencies": {name: latency_summary(values) for name, values in self.latencies.items()},
+        }
+
+    def save(self, path=None):
+        """
+        Merge the report into the run report file of the workspace.
+
+        Each pipeline call replaces all records of the top-level stages it ran
+        (e.g. every process_2/... record) and keeps the others, so the file
+        describes the latest run of every pipeline step.
+
+        Parameters
+            path : str, optional
+                Path of the run report file, by default self.path.
+
+        Returns
+            str
+                Path of the run report file.
+        """
+        path = path or self.path
+        report = self.to_dict()
+        with config_lock(path):
+            saved = {"stages": [], "latencies": {}}
+            if osp.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+            tops = {record["stage"].split("/")[0] for record in report["stages"]}
+            saved["stages"] = [
+                record for record in saved["stages"] if record["stage"].split("/")[0] not in tops
+            ]
+            saved["stages"] += report["stages"]
+            saved["latencies"].update(report["latencies"])
+            saved["updated_at"] = datetime.now(kst).isoformat()
+            write_json(path, saved)
+        logger.info(f"Run report saved: {path}")
+        return path
+
+
+@contextmanager
+def run_report(path=None):
+    """
+    Record the stages run in this context into a new RunReport.
+
+    The report is written to report.path on exit, also when the pipeline
+    call fails; the path can be set inside the block once it is known.
+
+    Parameters
+        path : str, optional
+            Path of the run report file, by default None.
+
+    Yields
+        RunReport
+            The active report.
+    """
+    report = RunReport(path)
+    token = _REPORT.set(report)
+    try:
+        yield report
+    finally:
+        _REPORT.reset(token)
+        if report.path:
+            try:
+                report.save()
+            except OSError as e:
+                logger.error(f"Failed to save run report: {e}")
+
+
+def current_report():
+    """
+    Return the report of the current context, or None.
+    """
+    return _REPORT.get()
+
+
+@contextmanager
+def stage(name, data=None):
+    """
+    Measure a pipeline stage.
+
+    Records wall time, CPU time of the process, the peak resident set size at
+    the end of the stage and how much the stage raised it, and the number of
+    rows and columns of data. Nested stages are named parent/child. Outside of
+    run_report the measurement is only logged.
+
+    Parameters
+        name : str
+            Stage name.
+        data : pd.DataFrame, optional
+            Data the stage works on; set record['rows'] and record['cols']
+            inside the block to report another size, by default None.
+
+    Yields
+        dict
+            The stage record; extra JSON-serializable fields may be added to it.
+    """
+    report = _REPORT.get()
+    if report is not None:
+        name = "/".join(report._stack + [name])
+        report._stack.append(name.rsplit("/", 1)[-1])
+    record = {"stage": name}
+    if data is not None:
+        record["rows"], record["cols"] = int(data.shape[0]), int(data.shape[1])
+
+    start_rss = _peak_rss_mb()
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    record["started_at"] = datetime.now(kst).isoformat()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException:
+        record["status"] = "failed"
+        raise
+    finally:
+        record["wall_s"] = round(time.perf_counter() - start_wall, 4)
+        record["cpu_s"] = round(time.process_time() - start_cpu, 4)
+        record["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+        record["peak_rss_growth_mb"] = round(record["peak_rss_mb"] - start_rss, 1)
+        logger.info(
+            f"[stage] {name}: {record['wall_s']:.2f}s wall, {record['cpu_s']:.2f}s CPU, "
+            f"peak RSS {record['peak_rss_mb']:.0f} MB (+{record['peak_rss_growth_mb']:.0f} MB)"
+        )
+        if report is not None:
+            report._stack.pop()
+            report.stages.append(record)
+
+
+def record_latencies(name, seconds):
+    """
+    Add latency samples to the report of the current context, if any.
+
+    Parameters
+        name : str
+            Name of the operation.
+        seconds : list of float
+            Duration of each call in seconds.
+    """
+    report = _REPORT.get()
+    if report is not None:
+        report.add_latencies(name, seconds)
+
+
+def latency_summary(seconds):
+    """
+    Summarize latency samples.
+
+    Parameters
+        seconds : list of float
+            Duration of each call in seconds.
+
+    Returns
+        dict
+            Number of calls, total seconds, and mean, percentile and maximum
+            latency in milliseconds.
+    """
+    if len(seconds) == 0:
+        return {"count": 0}
+    values = np.asarray(seconds, dtype=np.float64) * 1000.0
+    summary = {
+        "count": int(len(values)),
+        "total_s": round(float(values.sum()) / 1000.0, 4),
+        "mean_ms": round(float(values.mean()), 3),
+    }
+    for q, value in zip(LATENCY_PERCENTILES, np.percentile(values, LATENCY_PERCENTILES)):
+        summary[f"p{q}_ms"] = round(float(value), 3)
+    summary["max_ms"] = round(float(values.max()), 3)
+    return summary
+
+
+def run_report_path(save_path):
+    """
+    Return the path of the run report file in a run workspace.
+
+    Parameters
+        save_path : str
+            Workspace directory of the run.
+
+    Returns
+        str
+            Path to <save_path>/run_report.json.
+    """
+    return osp.join(save_path, RUN_REPORT_FILENAME)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
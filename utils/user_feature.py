@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from omegaconf import OmegaConf
+from config.run_context import resolve_context
 
 
 def user_feature(data, model_config_path):
@@ -10,13 +10,14 @@ def user_feature(data, model_config_path):
     Parameters
         data : pd.DataFrame
             The original dataset.
-        model_config_path : str
-            Path to the model configuration file.
+        model_config_path : str or RunContext
+            Path to the model configuration file, or the in-memory run context.
 
     Returns
         dict
             A dictionary containing task info, correlations, controllable and target
-            feature ranges, model results, leaderboard, and feature importance.
+            feature ranges, model results, and references to the sidecar files
+            of the leaderboard and feature importance.
     """
     update_config_dict = {
         "task": None,
@@ -27,15 +28,17 @@ def user_feature(data, model_config_path):
         "top_models": None,
         "feature_importance": None,
     }
-    config = OmegaConf.load(model_config_path)
+    config, _ = resolve_context(model_config_path)
     filtered_data = config["filtered_data"]
     task = config["task"]
     correlations_result = config["correlations_result"]
     controllable_feature = config["controllable_feature"]
     target_feature = config["target_feature"]
     model_result = config["model_result"]
-    top_models = config["top_models"]
-    feature_importance = config["feature_importance"]
+    # The leaderboard and importances are referenced, not copied, so the API
+    # can stream the sidecar files separately from user_config.
+    top_models = config.artifact_ref("top_models")
+    feature_importance = config.artifact_ref("feature_importance")
 
     update_config_dict["task"] = task
     update_config_dict["correlations_result"] = correlations_result